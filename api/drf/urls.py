@@ -1,5 +1,16 @@
-from django.urls import path
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
 
+from apps.imdb.views.drf import CrewViewSet, MovieViewSet, PersonViewSet, RankingViewSet, RatingViewSet, SearchViewSet
+
+router = DefaultRouter()
+router.register('movies', MovieViewSet)
+router.register('persons', PersonViewSet)
+router.register('crews', CrewViewSet)
+router.register('ratings', RatingViewSet)
+router.register('rankings', RankingViewSet)
+router.register('search', SearchViewSet, basename='search')
 
 urlpatterns = [
-]
\ No newline at end of file
+    path('', include(router.urls)),
+]
@@ -1,7 +1,7 @@
 import graphene
 from apps.imdb.views.graphql import *
 
-class Query(graphene.ObjectType):
+class Query(IMDbQuery, graphene.ObjectType):
     pass
 
-schema = graphene.Schema(query=Query)
\ No newline at end of file
+schema = graphene.Schema(query=Query)
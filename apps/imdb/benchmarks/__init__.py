@@ -0,0 +1,4 @@
+from .api import *
+from .ingest import *
+from .report import *
+from .synthetic import *
\ No newline at end of file
@@ -0,0 +1,260 @@
+import json
+import random
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from apps.imdb.models import Genre, Movie, MovieRanking, Person
+from apps.imdb.services import current_rss, peak_rss
+
+__all__ = ('ApiBenchmark', 'SCENARIOS', 'Scenario')
+
+DRF_PREFIX = '/api/drf/'
+GRAPHQL_PATH = '/api/graphql/'
+FRAMEWORKS = ('drf', 'graphql')
+PAGE_SIZE = 50
+# Distinct parameter values drawn per kind, requests cycle through them.
+POOL_SIZE = 100
+PERCENTILES = (50, 90, 95, 99)
+
+# One set of request parameters, the same for both frameworks.
+Sample = namedtuple('Sample', ('movie', 'person', 'year', 'genre', 'term'))
+# ``drf`` maps a ``Sample`` to a path below DRF_PREFIX, ``variables`` to the variables of the GraphQL ``query``.
+Scenario = namedtuple('Scenario', ('name', 'description', 'drf', 'query', 'variables'))
+
+# The GraphQL selections mirror the fields of the DRF serializers.
+MOVIE_FIELDS = '''
+fragment MovieFields on Movie {
+    id movieType title originalTitle isAdult year endYear runtimeMinutes genres
+    rating { averageRating numVotes }
+    crew { directors { id name } writers { id name } }
+    persons { id name }
+}
+'''
+SCENARIOS = (
+    Scenario(
+        'movie_detail', 'One movie with its genres, rating, crew and known-for persons.',
+        lambda sample: f'movies/{sample.movie}/',
+        'query ($id: ID!) { movie(id: $id) { ...MovieFields } }' + MOVIE_FIELDS,
+        lambda sample: {'id': sample.movie},
+    ),
+    Scenario(
+        'person_detail', 'One person with professions and known-for movies.',
+        lambda sample: f'persons/{sample.person}/',
+        'query ($id: ID!) { person(id: $id) { id name birthYear deathYear professions knownFor { id title year } } }',
+        lambda sample: {'id': sample.person},
+    ),
+    Scenario(
+        'movie_list', f'First page of {PAGE_SIZE} movies of a year, with the movie detail fields.',
+        lambda sample: f'movies/?year={sample.year or ""}&page_size={PAGE_SIZE}',
+        'query ($year: Int, $first: Int) { movies(year: $year, first: $first) { '
+        'edges { node { ...MovieFields } } pageInfo { hasNextPage endCursor } } }' + MOVIE_FIELDS,
+        lambda sample: {'year': sample.year, 'first': PAGE_SIZE},
+    ),
+    Scenario(
+        'top_rated', f'First page of {PAGE_SIZE} of the top rated movies of a genre.',
+        lambda sample: f'rankings/?genre={sample.genre or ""}&page_size={PAGE_SIZE}',
+        'query ($genre: String, $first: Int) { rankings(genre: $genre, first: $first) { edges { node { '
+        'rank movie { id title year } weightedRating averageRating numVotes genre decade } } '
+        'pageInfo { hasNextPage endCursor } } }',
+        lambda sample: {'genre': sample.genre, 'first': PAGE_SIZE},
+    ),
+    Scenario(
+        'title_search', 'Twenty best title matches of a word prefix.',
+        lambda sample: f'search/?{urlencode({"q": sample.term, "limit": 20})}',
+        'query ($q: String!) { search(q: $q, limit: 20) { movie { id title year } title region language score } }',
+        lambda sample: {'q': sample.term},
+    ),
+)
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile of the sorted ``values``.
+    """
+    if not values:
+        return None
+    return values[max(0, min(len(values), -(-len(values) * percent // 100)) - 1)]
+
+
+class ApiBenchmark:
+    """
+    Replays the ``SCENARIOS`` against the DRF and the GraphQL API of this process and measures each.
+
+    Requests go through the Django test client, the whole request/response cycle (middleware, routing, views,
+    serialization, the database) without a network or an HTTP server, so the numbers compare the frameworks and
+    not the transport. ``concurrency`` threads each with its own client and database connection issue ``requests``
+    requests per run, after ``warmup`` untimed ones. Both frameworks get the same sequence of parameters, sampled
+    from the loaded data with ``seed``.
+
+    The response cache is swapped for a dummy one unless ``response_cache`` is set, DRF responses would otherwise
+    be served from it after the first request of each URL. Peak RSS is the high-water mark of the process so far,
+    so runs are ordered by scenario, then framework, then concurrency.
+    """
+
+    def __init__(self, requests=200, warmup=20, concurrency=(1, ), seed=0, response_cache=False, scenarios=None):
+        self.requests = requests
+        self.warmup = warmup
+        self.concurrency = tuple(concurrency)
+        self.seed = seed
+        self.response_cache = response_cache
+        self.scenarios = [scenario for scenario in SCENARIOS if not scenarios or scenario.name in scenarios]
+        self.samples = []
+
+    def run(self, progress=None):
+        """
+        Returns the list of run results, calling ``progress`` with each one as it finishes.
+        """
+        self.samples = self.sample()
+        if not self.samples:
+            raise ValueError('The database holds no movies to benchmark.')
+        # Request metrics would add their own overhead and a log line per request to the measurements.
+        overrides = {
+            'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+            'IMDB_METRICS': {**getattr(settings, 'IMDB_METRICS', {}), 'ENABLED': False},
+        }
+        if not self.response_cache:
+            overrides['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        results = []
+        with override_settings(**overrides):
+            for scenario in self.scenarios:
+                for framework in FRAMEWORKS:
+                    for concurrency in self.concurrency:
+                        result = self.measure(scenario, framework, concurrency)
+                        results.append(result)
+                        if progress:
+                            progress(result)
+        return results
+
+    def sample(self):
+        """
+        Draws the request parameters: ids, years and genres spread over the loaded data and words of its titles.
+        """
+        rng = random.Random(self.seed)
+        movies = self.spread(Movie, rng)
+        persons = self.spread(Person, rng)
+        if not movies or not persons:
+            return []
+        years = sorted(set(Movie.objects.filter(pk__in=movies, year__isnull=False).values_list('year', flat=True)))
+        genres = list(
+            Genre.objects.filter(pk__in=MovieRanking.objects.values('genre')).order_by('code').values_list(
+                'code', flat=True,
+            )
+        )
+        titles = Movie.objects.filter(pk__in=movies).order_by('pk').values_list('title', flat=True)
+        terms = sorted({word.lower() for title in titles for word in title.split() if word.isalpha()})
+        pools = [
+            [Movie(pk=pk).tconst for pk in movies], [Person(pk=pk).nconst for pk in persons],
+            years or [None], genres or [None], terms or ['a'],
+        ]
+        for pool in pools:
+            rng.shuffle(pool)
+        return [Sample(*(pool[i % len(pool)] for pool in pools)) for i in range(POOL_SIZE)]
+
+    @staticmethod
+    def spread(model, rng):
+        """
+        Returns up to ``POOL_SIZE`` primary keys of ``model``, each the first at or after a random point of the key
+        range, one index seek each however large the table.
+        """
+        queryset = model.objects.order_by('pk').values_list('pk', flat=True)
+        first, last = queryset.first(), queryset.last()
+        if first is None:
+            return []
+        keys = set()
+        for _ in range(POOL_SIZE):
+            keys.add(queryset.filter(pk__gte=rng.randint(first, last)).first())
+        return sorted(keys)
+
+    def measure(self, scenario, framework, concurrency):
+        send = self.send_drf if framework == 'drf' else self.send_graphql
+        for i in range(self.warmup):
+            send(Client(), scenario, self.samples[i % len(self.samples)])
+        connections.close_all()
+
+        latencies, queries, errors = [], [], []
+        counter = iter(range(self.requests))
+        lock = threading.Lock()
+
+        def worker():
+            client = Client()
+            try:
+                while True:
+                    with lock:
+                        i = next(counter, None)
+                    if i is None:
+                        return
+                    sample = self.samples[i % len(self.samples)]
+                    with CaptureQueriesContext(connections['default']) as captured:
+                        start = time.perf_counter()
+                        response = send(client, scenario, sample)
+                        elapsed = time.perf_counter() - start
+                    with lock:
+                        latencies.append(elapsed)
+                        queries.append(len(captured))
+                        if not self.succeeded(response):
+                            errors.append(i)
+            finally:
+                connections.close_all()
+
+        rss_start = current_rss()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - start
+        rss_end = current_rss()
+
+        latencies.sort()
+        return {
+            'scenario': scenario.name,
+            'framework': framework,
+            'concurrency': concurrency,
+            'requests': len(latencies),
+            'errors': len(errors),
+            'seconds': round(seconds, 3),
+            'throughput': round(len(latencies) / seconds, 2) if seconds else None,
+            'latency_ms': {
+                'mean': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+                **{
+                    f'p{percent}': round(percentile(latencies, percent) * 1000, 3) if latencies else None
+                    for percent in PERCENTILES
+                },
+                'max': round(latencies[-1] * 1000, 3) if latencies else None,
+            },
+            'queries': {
+                'mean': round(sum(queries) / len(queries), 2) if queries else None,
+                'max': max(queries, default=None),
+            },
+            'rss_mb': {
+                'start': round(rss_start / 2 ** 20, 1) if rss_start else None,
+                'end': round(rss_end / 2 ** 20, 1) if rss_end else None,
+                'peak': round(peak_rss() / 2 ** 20, 1),
+            },
+        }
+
+    @staticmethod
+    def send_drf(client, scenario, sample):
+        return client.get(DRF_PREFIX + scenario.drf(sample), HTTP_ACCEPT='application/json')
+
+    @staticmethod
+    def send_graphql(client, scenario, sample):
+        return client.post(
+            GRAPHQL_PATH,
+            json.dumps({'query': scenario.query, 'variables': scenario.variables(sample)}),
+            content_type='application/json',
+            HTTP_ACCEPT='application/json',
+        )
+
+    @staticmethod
+    def succeeded(response):
+        # GraphQL reports resolver errors in the body of a 200 response.
+        return response.status_code == 200 and 'errors' not in json.loads(response.content)
@@ -0,0 +1,114 @@
+from django.core.management.color import no_style
+from django.db import connection
+
+from apps.imdb.models import Akas, Crew, Episode, LoadCheckpoint, Movie, MovieRanking, Person, Principal, Rating
+from apps.imdb.services import IMDbLoader, IngestProfile
+from apps.imdb.services.imdb_loader import DATASETS, LOADED_DATASETS
+
+__all__ = ('IngestBenchmark', )
+
+INGEST_MODELS = (
+    Movie, Movie.genres.through, Person, Person.movies.through, Person.professions.through, Rating, Crew,
+    Crew.directors.through, Crew.writers.through, Akas, Episode, Principal, MovieRanking, LoadCheckpoint,
+)
+# Largest accepted drop of rows per second. Unchanged code measures within about 20% of its baseline on a quiet
+# machine, the total within about 10%.
+THRESHOLD = 0.25
+# Datasets loading faster than this are compared but not gated, a few scheduling hiccups swing their throughput by
+# tens of percent. The total is always gated.
+MIN_GATED_SECONDS = 1.0
+
+
+class IngestBenchmark:
+    """
+    Times every ``load_*`` method of ``IMDbLoader`` on the dataset files of ``path``, on the default database.
+
+    The datasets are loaded in order into empty tables, ``repeat`` times, the tables are emptied after every
+    round. Each dataset reports its best round: rows per second and where its time went (``IngestProfile`` stages).
+    ``compare`` checks a report against a baseline recorded on the same files and database backend.
+    """
+
+    def __init__(self, path, repeat=1):
+        self.path = path
+        self.repeat = repeat
+
+    @staticmethod
+    def is_empty():
+        return not any(model.objects.exists() for model in INGEST_MODELS)
+
+    @staticmethod
+    def empty():
+        tables = [model._meta.db_table for model in INGEST_MODELS]
+        # SQLite deletes in no particular order, its foreign keys are only enforced again once the tables are empty.
+        with connection.constraint_checks_disabled(), connection.cursor() as cursor:
+            for sql in connection.ops.sql_flush(no_style(), tables, reset_sequences=True, allow_cascade=True):
+                cursor.execute(sql)
+
+    def run(self, progress=None):
+        """
+        Returns the best round of each dataset, by dataset name, calling ``progress`` with every timed round.
+        """
+        if not self.is_empty():
+            raise ValueError('The IMDb tables are not empty, benchmark an empty, migrated database.')
+        best = {}
+        for round_number in range(1, self.repeat + 1):
+            try:
+                for dataset in LOADED_DATASETS:
+                    result = self.measure(dataset)
+                    if progress:
+                        progress(round_number, dataset, result)
+                    if dataset not in best or result['seconds'] < best[dataset]['seconds']:
+                        best[dataset] = result
+            finally:
+                self.empty()
+        return best
+
+    def measure(self, dataset):
+        file_name, _ = DATASETS[dataset]
+        profile = IngestProfile()
+        with profile.active():
+            getattr(IMDbLoader, f'load_{dataset}')(f'{self.path}/{file_name}')
+        summary = profile.datasets[dataset]
+        return {
+            'rows': summary['rows'],
+            'seconds': summary['seconds'],
+            'rows_per_second': summary['rows_per_second'],
+            'queries': summary['queries']['total'],
+            'stages': {stage: round(ms / 1000, 4) for stage, ms in summary['stages_ms'].items()},
+        }
+
+    @staticmethod
+    def totals(results):
+        rows = sum(result['rows'] for result in results.values())
+        seconds = sum(result['seconds'] for result in results.values())
+        return {
+            'rows': rows,
+            'seconds': round(seconds, 4),
+            'rows_per_second': round(rows / seconds, 1) if seconds else None,
+        }
+
+    @classmethod
+    def compare(cls, results, baseline, threshold=THRESHOLD, min_seconds=MIN_GATED_SECONDS):
+        """
+        Returns the comparison of ``results`` with the ``baseline`` results, by dataset and ``total``, and the
+        names of those whose rows per second dropped by more than the ``threshold`` fraction. Datasets measured in
+        less than ``min_seconds``, now or in the baseline, are not gated.
+        """
+        current = {**results, 'total': cls.totals(results)}
+        reference = {**baseline, 'total': cls.totals(baseline)}
+        comparison, regressions = {}, []
+        for name, result in current.items():
+            if name not in reference or not reference[name]['rows_per_second']:
+                continue
+            change = result['rows_per_second'] / reference[name]['rows_per_second'] - 1
+            gated = name == 'total' or min(result['seconds'], reference[name]['seconds']) >= min_seconds
+            comparison[name] = {
+                'rows_per_second': result['rows_per_second'],
+                'baseline_rows_per_second': reference[name]['rows_per_second'],
+                'change': round(change, 4),
+                'gated': gated,
+                'regression': gated and change < -threshold,
+            }
+            if comparison[name]['regression']:
+                regressions.append(name)
+        return comparison, regressions
@@ -0,0 +1,52 @@
+import json
+import os
+import platform
+from datetime import datetime, timezone
+from importlib import metadata
+
+from django.db import connection
+
+__all__ = ('BenchmarkReport', )
+
+PACKAGES = ('Django', 'djangorestframework', 'graphene-django', 'graphql-core')
+
+
+class BenchmarkReport:
+    """
+    Machine readable benchmark results: a JSON document with the environment the numbers were measured in.
+    """
+
+    @classmethod
+    def environment(cls):
+        return {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'packages': {package: cls.version(package) for package in PACKAGES},
+            'database': {
+                'vendor': connection.vendor,
+                'version': '.'.join(map(str, connection.get_database_version())),
+            },
+        }
+
+    @staticmethod
+    def version(package):
+        try:
+            return metadata.version(package)
+        except metadata.PackageNotFoundError:
+            return None
+
+    @classmethod
+    def write(cls, path, **sections):
+        """
+        Writes ``sections`` with the creation time and the environment to ``path`` and returns the report.
+        """
+        report = {
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'environment': cls.environment(),
+            **sections,
+        }
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2)
+            file.write('\n')
+        return report
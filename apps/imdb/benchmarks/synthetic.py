@@ -0,0 +1,190 @@
+import gzip
+import io
+import os
+import random
+
+from apps.imdb.models import Genre, Profession
+
+__all__ = ('SyntheticDataset', )
+
+NULL = '\\N'
+WORDS = (
+    'night', 'day', 'love', 'war', 'city', 'dark', 'last', 'first', 'house', 'river', 'king', 'queen', 'road',
+    'blood', 'star', 'dream', 'ghost', 'summer', 'winter', 'storm', 'secret', 'island', 'lost', 'empire', 'silent',
+    'golden', 'broken', 'wild', 'iron', 'shadow', 'heart', 'fire', 'stone', 'sea', 'mountain', 'garden', 'return',
+    'journey', 'game', 'train', 'murder', 'angel', 'devil', 'world', 'moon', 'sun', 'time', 'memory', 'hunter', 'song',
+)
+FIRST_NAMES = (
+    'Anna', 'Ben', 'Clara', 'David', 'Elena', 'Frank', 'Grace', 'Hugo', 'Ines', 'Jack', 'Karin', 'Liam', 'Maria',
+    'Noah', 'Olga', 'Paul', 'Rosa', 'Sam', 'Tessa', 'Victor', 'Wanda', 'Yuki', 'Zoe',
+)
+LAST_NAMES = (
+    'Adams', 'Berg', 'Costa', 'Dubois', 'Evans', 'Fischer', 'Garcia', 'Hansen', 'Ito', 'Jensen', 'Kowalski', 'Lopez',
+    'Moreau', 'Novak', 'Olsen', 'Petrov', 'Rossi', 'Schmidt', 'Tanaka', 'Walsh',
+)
+# (code, weight) of the generated title types, close to the mix of the real dataset.
+TITLE_TYPES = (
+    ('movie', 40), ('short', 10), ('tvSeries', 6), ('tvEpisode', 30), ('tvMovie', 5), ('video', 7),
+    ('tvMiniSeries', 2),
+)
+REGIONS = ('US', 'GB', 'DE', 'FR', 'ES', 'IT', 'JP', 'BR', NULL)
+LANGUAGES = ('en', 'de', 'fr', 'es', 'it', 'ja', 'pt', NULL)
+CATEGORIES = ('actor', 'actress', 'director', 'writer', 'producer', 'composer', 'cinematographer', 'self')
+
+HEADERS = {
+    'title.basics.tsv.gz': (
+        'tconst', 'titleType', 'primaryTitle', 'originalTitle', 'isAdult', 'startYear', 'endYear', 'runtimeMinutes',
+        'genres',
+    ),
+    'name.basics.tsv.gz': ('nconst', 'primaryName', 'birthYear', 'deathYear', 'primaryProfession', 'knownForTitles'),
+    'title.ratings.tsv.gz': ('tconst', 'averageRating', 'numVotes'),
+    'title.crew.tsv.gz': ('tconst', 'directors', 'writers'),
+    'title.akas.tsv.gz': (
+        'titleId', 'ordering', 'title', 'region', 'language', 'types', 'attributes', 'isOriginalTitle',
+    ),
+    'title.episode.tsv.gz': ('tconst', 'parentTconst', 'seasonNumber', 'episodeNumber'),
+    'title.principals.tsv.gz': ('tconst', 'ordering', 'nconst', 'category', 'job', 'characters'),
+}
+
+
+def tconst(number):
+    return f'tt{number:07d}'
+
+
+def nconst(number):
+    return f'nm{number:07d}'
+
+
+class SyntheticDataset:
+    """
+    Deterministic IMDb datasets (``.tsv.gz`` in the format of https://datasets.imdbws.com) of ``scale`` titles.
+
+    The same ``scale`` and ``seed`` always give byte for byte the same files: every file draws from its own seeded
+    random generator and the gzip headers carry no timestamp. There are as many persons as titles; a title has up to
+    four alternate titles and eight principals, 70% of the titles are rated, with votes spread log-normally so about
+    one in twenty qualifies for the rankings. Type, genre and profession codes are those the models map.
+    """
+
+    def __init__(self, scale, seed=0):
+        if scale < 1:
+            raise ValueError('The scale is the number of titles, at least 1.')
+        self.scale = scale
+        self.seed = seed
+        types, weights = zip(*TITLE_TYPES)
+        self.types = self.random('types').choices(types, weights, k=scale)
+        self.series = [number for number, title_type in enumerate(self.types, 1) if title_type == 'tvSeries']
+
+    def random(self, name):
+        return random.Random(f'{self.seed}:{name}')
+
+    def write(self, path):
+        """
+        Writes the seven dataset files to the directory ``path`` and returns their paths.
+        """
+        os.makedirs(path, exist_ok=True)
+        generators = {
+            'title.basics.tsv.gz': self.titles,
+            'name.basics.tsv.gz': self.persons,
+            'title.ratings.tsv.gz': self.ratings,
+            'title.crew.tsv.gz': self.crew,
+            'title.akas.tsv.gz': self.akas,
+            'title.episode.tsv.gz': self.episodes,
+            'title.principals.tsv.gz': self.principals,
+        }
+        paths = []
+        for file_name, rows in generators.items():
+            paths.append(os.path.join(path, file_name))
+            self.write_file(paths[-1], HEADERS[file_name], rows(self.random(file_name)))
+        return paths
+
+    @staticmethod
+    def write_file(file_path, header, rows):
+        with open(file_path, 'wb') as raw, \
+                gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=6, mtime=0) as compressed, \
+                io.TextIOWrapper(compressed, encoding='utf-8', newline='\n') as file:
+            file.write('\t'.join(header) + '\n')
+            for row in rows:
+                file.write('\t'.join(row) + '\n')
+
+    def sample(self, rng, low, high):
+        """
+        Returns between ``low`` and ``high`` distinct title (or person) numbers.
+        """
+        return rng.sample(range(1, self.scale + 1), min(rng.randint(low, high), self.scale))
+
+    @staticmethod
+    def title(rng):
+        return ' '.join(rng.sample(WORDS, rng.randint(1, 4))).title()
+
+    def titles(self, rng):
+        genres = [code for _, code in Genre.choices]
+        for number, title_type in enumerate(self.types, 1):
+            title = self.title(rng)
+            year = rng.randint(1900, 2024)
+            series = title_type in ('tvSeries', 'tvMiniSeries')
+            yield (
+                tconst(number), title_type, title, title if rng.random() < 0.8 else self.title(rng),
+                '1' if rng.random() < 0.02 else '0',
+                str(year) if rng.random() < 0.95 else NULL,
+                str(min(year + rng.randint(0, 10), 2024)) if series and rng.random() < 0.5 else NULL,
+                str(rng.randint(5, 40) if title_type in ('short', 'tvEpisode') else rng.randint(60, 180))
+                if rng.random() < 0.8 else NULL,
+                ','.join(rng.sample(genres, rng.randint(1, 3))) if rng.random() < 0.95 else NULL,
+            )
+
+    def persons(self, rng):
+        professions = [code for _, code in Profession.choices]
+        for number in range(1, self.scale + 1):
+            birth_year = rng.randint(1880, 2005)
+            yield (
+                nconst(number), f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                str(birth_year) if rng.random() < 0.6 else NULL,
+                str(birth_year + rng.randint(20, 95)) if rng.random() < 0.15 else NULL,
+                ','.join(rng.sample(professions, rng.randint(1, 3))),
+                ','.join(map(tconst, self.sample(rng, 1, 4))),
+            )
+
+    def ratings(self, rng):
+        for number in range(1, self.scale + 1):
+            if rng.random() < 0.7:
+                votes = max(5, int(rng.lognormvariate(6, 2.5)))
+                yield tconst(number), f'{min(10.0, max(1.0, rng.triangular(1, 10, 7))):.1f}', str(votes)
+
+    def crew(self, rng):
+        for number in range(1, self.scale + 1):
+            directors = map(nconst, self.sample(rng, 1, 2))
+            writers = map(nconst, self.sample(rng, 0, 3))
+            yield (
+                tconst(number),
+                ','.join(directors) if rng.random() < 0.9 else NULL,
+                ','.join(writers) or NULL,
+            )
+
+    def akas(self, rng):
+        for number in range(1, self.scale + 1):
+            for ordering in range(1, rng.randint(1, 4) + 1):
+                yield (
+                    tconst(number), str(ordering), self.title(rng), rng.choice(REGIONS), rng.choice(LANGUAGES),
+                    'original' if ordering == 1 else rng.choice(('imdbDisplay', 'alternative', NULL)),
+                    NULL, '1' if ordering == 1 else '0',
+                )
+
+    def episodes(self, rng):
+        if not self.series:
+            return
+        for number, title_type in enumerate(self.types, 1):
+            if title_type == 'tvEpisode':
+                yield (
+                    tconst(number), tconst(rng.choice(self.series)),
+                    str(rng.randint(1, 10)) if rng.random() < 0.9 else NULL,
+                    str(rng.randint(1, 24)) if rng.random() < 0.9 else NULL,
+                )
+
+    def principals(self, rng):
+        for number in range(1, self.scale + 1):
+            for ordering in range(1, rng.randint(1, 8) + 1):
+                category = rng.choice(CATEGORIES)
+                yield (
+                    tconst(number), str(ordering), nconst(rng.randint(1, self.scale)), category, NULL,
+                    f'["{rng.choice(FIRST_NAMES)}"]' if category in ('actor', 'actress', 'self') else NULL,
+                )
@@ -0,0 +1,131 @@
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.imdb.benchmarks import SCENARIOS, ApiBenchmark, BenchmarkReport, SyntheticDataset
+from apps.imdb.models import Akas, Crew, Episode, Movie, MovieRanking, Person, Principal, Rating
+from apps.imdb.services import IMDbLoader
+
+COUNTED_MODELS = (Movie, Person, Rating, Crew, Akas, Episode, Principal, MovieRanking)
+
+
+class Command(BaseCommand):
+    help = """
+        Benchmarks the DRF API against the GraphQL API on synthetic IMDb data.
+
+        This command generates synthetic IMDb datasets, loads them with the IMDb loader, then replays the same
+        scenarios (movie detail, person detail, movie list, top rated, title search) against api/drf/ and
+        api/graphql/ at each concurrency level. Latency percentiles, throughput, database queries per request and
+        resident memory of every run are written to a JSON report. Nothing leaves the machine.
+
+        Usage:
+            python manage.py benchmark_api --scale <titles> --output <report.json>
+
+        Arguments:
+            --scale     Number of synthetic titles to generate and load (default: 10000).
+            --seed      Seed of the generated data and of the request parameters (default: 0).
+            --data      Directory for the generated dataset files (default: a temporary directory, removed after).
+            --no-load   Benchmark the data already in the database instead of generating and loading any.
+            --requests  Timed requests per scenario, framework and concurrency level (default: 200).
+            --warmup    Untimed requests before each run (default: 20).
+            --concurrency
+                        Comma separated numbers of concurrent clients, one run each (default: 1,4).
+            --scenario  Run only this scenario, can be repeated.
+            --response-cache
+                        Keep the configured response cache, measuring cache hits instead of the API.
+            --output    Path of the JSON report (default: api-benchmark.json).
+
+        Example:
+            python manage.py benchmark_api --scale 50000 --concurrency 1,8,32 --output reports/api.json
+
+        Notes:
+            - Without --no-load the database must hold no movies, run it against an empty, migrated database.
+            - The clients are threads of this process calling the WSGI handler directly, the numbers exclude the
+              HTTP server and the network but include middleware, routing, views, serialization and the database.
+            - With SQLite, concurrent clients only share reads; use PostgreSQL for numbers meant for production.
+            - Queries are counted per request on the connection of its client thread. Without --response-cache the
+              cached DRF views read the dataset version from the database, one query per request.
+            - Peak RSS is the high-water mark of the process so far, runs are ordered scenario by scenario.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=10000, help='Number of synthetic titles.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+        parser.add_argument('--data', type=str, help='Directory for the generated dataset files.')
+        parser.add_argument('--no-load', action='store_true', help='Benchmark the data already loaded.')
+        parser.add_argument('--requests', type=int, default=200, help='Timed requests per run.')
+        parser.add_argument('--warmup', type=int, default=20, help='Untimed requests before each run.')
+        parser.add_argument('--concurrency', type=str, default='1,4', help='Comma separated concurrency levels.')
+        parser.add_argument(
+            '--scenario', action='append', choices=[scenario.name for scenario in SCENARIOS], help='Scenario to run.',
+        )
+        parser.add_argument('--response-cache', action='store_true', help='Keep the response cache.')
+        parser.add_argument('--output', type=str, default='api-benchmark.json', help='Path of the JSON report.')
+
+    def handle(self, *args, **options):
+        try:
+            concurrency = [int(level) for level in options['concurrency'].split(',')]
+        except ValueError:
+            raise CommandError('--concurrency must be a comma separated list of numbers.')
+        if not concurrency or min(concurrency) < 1:
+            raise CommandError('--concurrency levels must be at least 1.')
+        if options['requests'] < 1 or options['warmup'] < 0:
+            raise CommandError('--requests must be at least 1 and --warmup at least 0.')
+
+        dataset = {'scale': None, 'seed': options['seed'], 'load_seconds': None}
+        if not options['no_load']:
+            if Movie.objects.exists():
+                raise CommandError('The database already holds movies, migrate an empty database or pass --no-load.')
+            dataset.update(scale=options['scale'], load_seconds=self.load(options))
+        dataset['rows'] = {model.__name__: model.objects.count() for model in COUNTED_MODELS}
+
+        benchmark = ApiBenchmark(
+            requests=options['requests'],
+            warmup=options['warmup'],
+            concurrency=concurrency,
+            seed=options['seed'],
+            response_cache=options['response_cache'],
+            scenarios=options['scenario'],
+        )
+        try:
+            results = benchmark.run(progress=self.report_run)
+        except ValueError as e:
+            raise CommandError(str(e))
+        BenchmarkReport.write(
+            options['output'],
+            dataset=dataset,
+            settings={
+                'requests': options['requests'],
+                'warmup': options['warmup'],
+                'concurrency': concurrency,
+                'response_cache': options['response_cache'],
+            },
+            scenarios={scenario.name: scenario.description for scenario in benchmark.scenarios},
+            results=results,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Report written to {options["output"]}'))
+
+    def load(self, options):
+        path = options['data'] or tempfile.mkdtemp(prefix='imdb-benchmark-')
+        try:
+            self.stdout.write(f'Generating {options["scale"]} titles into {path}')
+            SyntheticDataset(options['scale'], options['seed']).write(path)
+            start = time.perf_counter()
+            IMDbLoader.load(path)
+            return round(time.perf_counter() - start, 3)
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            if not options['data']:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def report_run(self, result):
+        latency = result['latency_ms']
+        self.stdout.write(
+            f'{result["scenario"]:<14} {result["framework"]:<8} x{result["concurrency"]:<3} '
+            f'p50 {latency["p50"]:>9.2f} ms  p95 {latency["p95"]:>9.2f} ms  p99 {latency["p99"]:>9.2f} ms  '
+            f'{result["throughput"]:>8.1f} req/s  {result["queries"]["mean"]:>6.1f} queries  '
+            f'{result["errors"]} errors'
+        )
@@ -0,0 +1,161 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.imdb.benchmarks import BenchmarkReport, IngestBenchmark, SyntheticDataset
+from apps.imdb.benchmarks.ingest import MIN_GATED_SECONDS, THRESHOLD
+
+
+class Command(BaseCommand):
+    help = """
+        Benchmarks the IMDb loader and guards its ingest throughput against a baseline.
+
+        This command generates synthetic IMDb datasets and times every load_* method of the loader on them, in
+        dependency order, on the default database. Each dataset reports rows per second and the split of its time
+        between the stages profiled by load_imdb --profile: reading (decompression), parsing, building the rows,
+        looking up referenced ids, inserting rows and many-to-many links, and committing. The results are written to
+        a JSON report, compared against a baseline and optionally recorded as the new one.
+
+        Usage:
+            python manage.py benchmark_ingest --baseline <baseline.json>
+
+        Arguments:
+            --scale     Number of synthetic titles (default: 20000).
+            --seed      Seed of the generated data (default: 0).
+            --data      Directory for the generated dataset files (default: a temporary directory, removed after).
+            --repeat    Rounds to run, each dataset reports its fastest (default: 3).
+            --baseline  Baseline file to compare against.
+            --threshold Largest accepted drop of rows per second against the baseline, as a fraction (default: 0.25).
+            --min-seconds
+                        Datasets loading faster than this, now or in the baseline, are not gated (default: 1.0).
+            --save-baseline
+                        Record the results in the --baseline file for this database backend.
+            --output    Path of the JSON report (default: ingest-benchmark.json).
+
+        Example:
+            python manage.py benchmark_ingest --baseline benchmarks/ingest-baseline.json --save-baseline
+            python manage.py benchmark_ingest --baseline benchmarks/ingest-baseline.json --scale 100000 --threshold 0.15
+
+        Notes:
+            - The IMDb tables must be empty, they are emptied again after every round.
+            - Baselines are kept per database backend (sqlite, postgresql) in the same file, run the command once
+              with the settings of each database to cover both.
+            - A baseline only compares with results of the same scale and seed, of the same machine, and is best
+              recorded and checked with the same --repeat.
+            - Time outside the profiled stages is reported as other.
+            - The command fails when the total, or a dataset loading for at least --min-seconds, regressed by more
+              than the threshold, after writing the report. Faster datasets are reported but not gated.
+            - Expect noise: with the defaults, unchanged code measures within about 20% of its baseline per dataset
+              and 10% in total on a quiet machine, short datasets (ratings, episodes) swing by more. A larger
+              --scale and --repeat narrow it, allowing a lower --threshold.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=20000, help='Number of synthetic titles.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+        parser.add_argument('--data', type=str, help='Directory for the generated dataset files.')
+        parser.add_argument('--repeat', type=int, default=3, help='Rounds to run.')
+        parser.add_argument('--baseline', type=str, help='Baseline file.')
+        parser.add_argument('--threshold', type=float, default=THRESHOLD, help='Accepted drop of rows per second.')
+        parser.add_argument(
+            '--min-seconds', type=float, default=MIN_GATED_SECONDS, help='Shortest load of a gated dataset.',
+        )
+        parser.add_argument('--save-baseline', action='store_true', help='Record the results as the baseline.')
+        parser.add_argument('--output', type=str, default='ingest-benchmark.json', help='Path of the JSON report.')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1.')
+        if not 0 <= options['threshold'] < 1:
+            raise CommandError('--threshold must be a fraction between 0 and 1.')
+        if options['min_seconds'] < 0:
+            raise CommandError('--min-seconds can not be negative.')
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save-baseline needs a --baseline file.')
+        baseline = self.read_baseline(options)
+
+        path = options['data'] or tempfile.mkdtemp(prefix='imdb-ingest-')
+        try:
+            SyntheticDataset(options['scale'], options['seed']).write(path)
+            results = IngestBenchmark(path, options['repeat']).run(progress=self.report_round)
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            if not options['data']:
+                shutil.rmtree(path, ignore_errors=True)
+
+        comparison, regressions = None, []
+        recorded = baseline.get('databases', {}).get(connection.vendor)
+        if recorded and not options['save_baseline']:
+            comparison, regressions = IngestBenchmark.compare(
+                results, recorded, options['threshold'], options['min_seconds'],
+            )
+            for name, change in comparison.items():
+                self.stdout.write(
+                    f'{name:<11} {change["rows_per_second"]:>11.1f} rows/s  baseline '
+                    f'{change["baseline_rows_per_second"]:>11.1f}  {change["change"]:>+7.1%}'
+                    + ('' if change['gated'] else '  (not gated)')
+                )
+        elif options['baseline'] and not options['save_baseline']:
+            self.stdout.write(self.style.WARNING(f'The baseline has no {connection.vendor} results to compare.'))
+
+        BenchmarkReport.write(
+            options['output'],
+            dataset={'scale': options['scale'], 'seed': options['seed']},
+            settings={
+                'repeat': options['repeat'], 'threshold': options['threshold'], 'min_seconds': options['min_seconds'],
+            },
+            results=results,
+            total=IngestBenchmark.totals(results),
+            comparison=comparison,
+        )
+        self.stdout.write(f'Report written to {options["output"]}')
+        if options['save_baseline']:
+            self.write_baseline(options, baseline, results)
+        if regressions:
+            raise CommandError(
+                f'Ingest throughput dropped by more than {options["threshold"]:.0%} against the baseline: '
+                + ', '.join(f'{name} ({comparison[name]["change"]:+.1%})' for name in regressions)
+            )
+
+    @staticmethod
+    def read_baseline(options):
+        """
+        Returns the baseline file contents, empty when it is missing and about to be recorded.
+        """
+        if not options['baseline'] or not os.path.exists(options['baseline']):
+            if options['baseline'] and not options['save_baseline']:
+                raise CommandError(f'Baseline {options["baseline"]} not found, record one with --save-baseline.')
+            return {}
+        with open(options['baseline']) as file:
+            baseline = json.load(file)
+        if (baseline.get('scale'), baseline.get('seed')) != (options['scale'], options['seed']):
+            if not options['save_baseline']:
+                raise CommandError(
+                    f'The baseline was recorded with --scale {baseline.get("scale")} --seed {baseline.get("seed")}.'
+                )
+            # Recorded with other files, the results of every backend are replaced.
+            return {}
+        return baseline
+
+    def write_baseline(self, options, baseline, results):
+        baseline = {
+            'scale': options['scale'],
+            'seed': options['seed'],
+            'databases': {**baseline.get('databases', {}), connection.vendor: results},
+        }
+        with open(options['baseline'], 'w') as file:
+            json.dump(baseline, file, indent=2)
+            file.write('\n')
+        self.stdout.write(self.style.SUCCESS(f'Baseline for {connection.vendor} written to {options["baseline"]}'))
+
+    def report_round(self, round_number, dataset, result):
+        stages = '  '.join(f'{stage} {seconds:.3f}s' for stage, seconds in result['stages'].items())
+        self.stdout.write(
+            f'#{round_number} {dataset:<11} {result["rows"]:>9} rows  {result["rows_per_second"]:>11.1f} rows/s  '
+            f'{result["queries"]:>6} queries  {stages}'
+        )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.imdb.benchmarks import SyntheticDataset
+
+
+class Command(BaseCommand):
+    help = """
+        Generates synthetic IMDb datasets for benchmarks.
+
+        This command writes the seven IMDb dataset files (.tsv.gz) with made up titles, persons, ratings and links,
+        ready for load_imdb. The same scale and seed always produce identical files.
+
+        Usage:
+            python manage.py generate_imdb --path <output_directory> --scale <titles>
+
+        Arguments:
+            --path      Directory the dataset files are written to, created if missing.
+            --scale     Number of titles, also the number of persons (default: 10000).
+            --seed      Seed of the random data (default: 0).
+
+        Example:
+            python manage.py generate_imdb --path datasets/synthetic --scale 100000
+
+        Notes:
+            - Existing dataset files in the directory are overwritten.
+            - A title gets up to four alternate titles and eight principals, the files hold about 11 rows per title.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', type=str, required=True, help='Output directory.')
+        parser.add_argument('--scale', type=int, default=10000, help='Number of titles.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+
+    def handle(self, *args, **options):
+        try:
+            dataset = SyntheticDataset(options['scale'], options['seed'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        for file_path in dataset.write(options['path']):
+            self.stdout.write(file_path)
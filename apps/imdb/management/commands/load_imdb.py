@@ -1,9 +1,16 @@
+import cProfile
 import json
 
 from django.contrib.auth.models import User
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
 
-from apps.imdb.services import IMDbLoader
+from apps.imdb.benchmarks import BenchmarkReport
+from apps.imdb.services import DeferredIndexes, IMDbLoader, IMDbPipeline, IngestProfile, peak_rss
+from apps.imdb.services.deferred_indexes import MAINTENANCE_WORK_MEM
+
+# Options recorded in the --profile report.
+PROFILED_OPTIONS = ('path', 'delta', 'defer_indexes', 'maintenance_work_mem', 'memory_limit', 'resume')
 
 
 class Command(BaseCommand):
@@ -17,6 +24,20 @@ class Command(BaseCommand):
 
         Arguments:
             --path      Path to the directory containing IMDb dataset files.
+            --workers   Number of worker processes parsing and writing chunks in parallel (default: 1).
+            --delta     Reload into populated tables, applying only inserted, changed and deleted rows.
+            --defer-indexes
+                        Drop secondary indexes and foreign key checks during the load, rebuild and validate them after.
+            --maintenance-work-mem
+                        PostgreSQL maintenance_work_mem used while rebuilding indexes (default: 1GB).
+            --memory-limit
+                        Resident memory ceiling in MB, batches shrink while the loader is above it.
+            --resume    Continue an interrupted load, skipping the batches it committed.
+            --profile   Report the time of every stage (read, parse, build, lookup, insert, m2m, commit), statements,
+                        rows per second and resident memory, per dataset and per batch.
+            --profile-output
+                        Path of the JSON profile report (default: load-profile.json).
+            --cprofile  Run the load under cProfile and dump its statistics to this file.
 
         Supported Files:
             - name.basics.tsv.gz       (People: actors, directors, writers)
@@ -29,16 +50,125 @@ class Command(BaseCommand):
 
         Example:
             python manage.py load_imdb --path datasets/imdb
+            python manage.py load_imdb --path datasets/imdb --profile --cprofile load.prof
 
         Notes:
             - Data is loaded in bulk for better performance.
-            - Missing or invalid data is safely ignored.
+            - Batches start at 1000 rows and adapt per dataset towards half a second to write and commit each, up to
+              4 MB of raw lines. Inserts use as many rows per statement as the database's parameter limit allows.
+            - Missing or invalid data is safely ignored. Files missing a column the loader reads are rejected before
+              anything is loaded.
             - Ensure the database is migrated before running this command.
+            - --workers greater than 1 needs a database accepting concurrent writers (PostgreSQL).
+            - --delta runs in a single process and can not be combined with --workers or --defer-indexes.
+            - --delta replaces alternate titles and principals as a whole, they have no key of their own to diff on.
+              Each is replaced in one transaction, the APIs serve the previous rows until the new ones are committed.
+            - Rows and links referencing a title or person missing from the datasets are skipped.
+            - With --defer-indexes the rebuild uses --workers parallel connections on PostgreSQL. --defer-indexes is
+              supported on PostgreSQL and SQLite.
+            - The dropped indexes and foreign keys are recorded in the database before they are dropped. Those of an
+              interrupted load are rebuilt by the next run, before loading or, with --defer-indexes, with the others
+              after it.
+            - Every batch commits together with a checkpoint, --resume needs the same dataset files and can not be
+              combined with --delta.
+            - The peak resident memory of the loader (and of its workers) is reported at the end.
+            - --profile and --cprofile only see the loading process, they can not be combined with --workers.
+            - The --cprofile statistics are read with python -m pstats load.prof or any pstats viewer.
+            - A finished load rebuilds the top rated rankings and bumps the dataset version, retiring the cached
+              API responses.
     """
 
     def add_arguments(self, parser):
         parser.add_argument('--path', type=str, required=True, help='Path to IMDb dataset files.')
-
+        parser.add_argument('--workers', type=int, default=1, help='Number of parallel worker processes.')
+        parser.add_argument('--delta', action='store_true', help='Apply only the changes against the stored rows.')
+        parser.add_argument(
+            '--defer-indexes', action='store_true', help='Rebuild secondary indexes and foreign keys after the load.',
+        )
+        parser.add_argument(
+            '--maintenance-work-mem', default=MAINTENANCE_WORK_MEM, help='maintenance_work_mem for index rebuilds.',
+        )
+        parser.add_argument('--memory-limit', type=int, help='Resident memory ceiling in MB.')
+        parser.add_argument('--resume', action='store_true', help='Continue an interrupted load.')
+        parser.add_argument('--profile', action='store_true', help='Report the time and statements of every stage.')
+        parser.add_argument(
+            '--profile-output', type=str, default='load-profile.json', help='Path of the JSON profile report.',
+        )
+        parser.add_argument('--cprofile', type=str, help='Dump cProfile statistics of the load to this file.')
 
     def handle(self, *args, **options):
-        IMDbLoader.load(options['path'])
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError('--workers must be at least 1.')
+        if workers > 1 and options['delta']:
+            raise CommandError('--delta can not be combined with --workers.')
+        if workers > 1 and connection.vendor == 'sqlite':
+            raise CommandError('SQLite does not accept concurrent writers, run without --workers.')
+        if options['defer_indexes'] and not DeferredIndexes.supported():
+            raise CommandError(f'--defer-indexes is not supported on {connection.vendor}.')
+        if options['delta'] and options['defer_indexes']:
+            raise CommandError('--delta can not be combined with --defer-indexes.')
+        if options['delta'] and options['resume']:
+            raise CommandError('--delta can not be combined with --resume.')
+        if workers > 1 and (options['profile'] or options['cprofile']):
+            raise CommandError('--profile and --cprofile can not be combined with --workers.')
+        profile = IngestProfile() if options['profile'] else None
+        profiler = cProfile.Profile() if options['cprofile'] else None
+        if profiler:
+            profiler.enable()
+        try:
+            if profile:
+                with profile.active():
+                    self.deferred_load(options)
+            else:
+                self.deferred_load(options)
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(options['cprofile'])
+                self.stdout.write(f'cProfile statistics written to {options["cprofile"]}')
+        if profile:
+            self.report_profile(options, profile)
+        self.stdout.write(f'Peak RSS: {peak_rss() // 2 ** 20} MB')
+        if workers > 1:
+            self.stdout.write(f'Peak worker RSS: {peak_rss(children=True) // 2 ** 20} MB')
+
+    def deferred_load(self, options):
+        if options['defer_indexes']:
+            with DeferredIndexes.deferred(options['workers'], options['maintenance_work_mem']):
+                self.load(options)
+            return
+        if DeferredIndexes.pending():
+            self.stdout.write('Rebuilding the indexes and foreign keys dropped by an interrupted load.')
+            DeferredIndexes.restore(options['workers'], options['maintenance_work_mem'])
+        self.load(options)
+
+    def load(self, options):
+        memory_limit = options['memory_limit'] * 2 ** 20 if options['memory_limit'] else None
+        try:
+            if options['workers'] == 1:
+                IMDbLoader.load(
+                    options['path'], delta=options['delta'], memory_limit=memory_limit, resume=options['resume'],
+                )
+            else:
+                IMDbPipeline.load(
+                    options['path'], options['workers'], memory_limit=memory_limit, resume=options['resume'],
+                )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+    def report_profile(self, options, profile):
+        for dataset, summary in profile.datasets.items():
+            stages = '  '.join(f'{stage} {ms / 1000:.3f}s' for stage, ms in summary['stages_ms'].items())
+            self.stdout.write(
+                f'{dataset:<11} {summary["rows"]:>9} rows  {summary["rows_per_second"] or 0:>11.1f} rows/s  '
+                f'{summary["queries"]["total"]:>6} queries  {summary["peak_rss_mb"] or 0:>7.1f} MB  {stages}'
+            )
+        BenchmarkReport.write(
+            options['profile_output'],
+            settings={option: options[option] for option in PROFILED_OPTIONS},
+            datasets=profile.datasets,
+            batches=profile.batches,
+            peak_rss_mb=round(peak_rss() / 2 ** 20, 1),
+        )
+        self.stdout.write(f'Profile written to {options["profile_output"]}')
@@ -0,0 +1,5 @@
+from .middleware import *
+from .registry import *
+from .renderers import *
+from .requests import *
+from .resolvers import *
\ No newline at end of file
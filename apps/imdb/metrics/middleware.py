@@ -0,0 +1,108 @@
+import json
+import logging
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .registry import QUERY_BUCKETS, REGISTRY
+from .requests import RequestMetrics, metrics_settings
+
+__all__ = ('RequestMetricsMiddleware', )
+
+logger = logging.getLogger('imdb.requests')
+
+LABELS = ('api', 'route', 'method')
+REQUESTS = REGISTRY.counter('imdb_requests_total', 'Requests handled.', (*LABELS, 'status'))
+DURATION = REGISTRY.histogram('imdb_request_duration_seconds', 'Time to handle a request.', LABELS)
+DB_DURATION = REGISTRY.histogram('imdb_request_db_seconds', 'Time a request spent executing statements.', LABELS)
+SERIALIZATION = REGISTRY.histogram(
+    'imdb_request_serialization_seconds',
+    'Time a request spent serializing (DRF serializers and renderer, GraphQL execution and encoding), statements '
+    'excluded.',
+    LABELS,
+)
+QUERIES = REGISTRY.histogram('imdb_request_queries', 'Statements executed by a request.', LABELS, QUERY_BUCKETS)
+DUPLICATE_QUERIES = REGISTRY.counter(
+    'imdb_request_duplicate_queries_total', 'Statements repeated with the same parameters within a request.', LABELS,
+)
+RESOLVER_DURATION = REGISTRY.histogram(
+    'imdb_graphql_resolver_seconds', 'Time a request spent in the resolvers of a GraphQL field.', ('field', ),
+)
+RESOLVER_CALLS = REGISTRY.counter('imdb_graphql_resolver_calls_total', 'GraphQL field resolutions.', ('field', ))
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, statement time and count, duplicate statements, serialization time and GraphQL resolver
+    timings of every request, into the ``REGISTRY`` histograms served at ``/metrics`` and as one JSON line per
+    request on the ``imdb.requests`` logger.
+
+    Requests are labelled with their API (``drf``, ``graphql`` or ``django``), URL name or route and method. The
+    metrics live in the process, every worker of a multi-process server exposes its own.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.settings = metrics_settings()
+
+    def __call__(self, request):
+        if not self.settings['ENABLED'] or request.path.startswith(tuple(self.settings['IGNORED_PATHS'])):
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = metrics.activate()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            metrics.deactivate(token)
+        self.record(request, response, metrics)
+        return response
+
+    @staticmethod
+    def labels(request):
+        match = request.resolver_match
+        if match is None:
+            return 'django', 'unmatched', request.method
+        if hasattr(match.func, 'cls'):
+            api = 'drf'
+        elif hasattr(getattr(match.func, 'view_class', None), 'execute_graphql_request'):
+            api = 'graphql'
+        else:
+            api = 'django'
+        return api, match.url_name or match.route, request.method
+
+    def record(self, request, response, metrics):
+        duration = metrics.elapsed()
+        labels = self.labels(request)
+        serialization = metrics.stages.get('serialization', 0.0)
+        REQUESTS.inc(*labels, response.status_code)
+        DURATION.observe(duration, *labels)
+        DB_DURATION.observe(metrics.db_seconds, *labels)
+        SERIALIZATION.observe(serialization, *labels)
+        QUERIES.observe(metrics.queries, *labels)
+        if metrics.duplicate_queries:
+            DUPLICATE_QUERIES.inc(*labels, amount=metrics.duplicate_queries)
+        for field, (calls, seconds) in metrics.resolvers.items():
+            RESOLVER_DURATION.observe(seconds, field)
+            RESOLVER_CALLS.inc(field, amount=calls)
+        if self.settings['LOG'] and logger.isEnabledFor(logging.INFO):
+            slowest = sorted(metrics.resolvers.items(), key=lambda item: -item[1][1])
+            api, route, method = labels
+            logger.info(json.dumps({
+                'api': api,
+                'route': route,
+                'method': method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 3),
+                'db_ms': round(metrics.db_seconds * 1000, 3),
+                'queries': metrics.queries,
+                'duplicate_queries': metrics.duplicate_queries,
+                'serialization_ms': round(serialization * 1000, 3),
+                'resolvers': {
+                    field: {'calls': calls, 'ms': round(seconds * 1000, 3)}
+                    for field, (calls, seconds) in slowest[:self.settings['LOGGED_RESOLVERS']]
+                },
+            }))
@@ -0,0 +1,15 @@
+from rest_framework.renderers import JSONRenderer
+
+from .requests import RequestMetrics
+
+__all__ = ('TimedJSONRenderer', )
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` reporting its encoding time to the ``serialization`` stage of the current request.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with RequestMetrics.stage('serialization'):
+            return super().render(data, accepted_media_type, renderer_context)
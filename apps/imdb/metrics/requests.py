@@ -0,0 +1,107 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+__all__ = ('RequestMetrics', 'metrics_settings')
+
+DEFAULT_METRICS = {
+    'ENABLED': True,
+    # One JSON line per request on the 'imdb.requests' logger.
+    'LOG': True,
+    # Time every GraphQL resolver, adds a few microseconds per resolved field.
+    'RESOLVERS': True,
+    # Slowest resolvers listed in the log line of a request.
+    'LOGGED_RESOLVERS': 10,
+    'IGNORED_PATHS': ('/metrics', '/static/', '/admin/'),
+    # Whether /metrics is served, None to serve it with DEBUG only.
+    'ENDPOINT': None,
+    # Client addresses allowed to read /metrics, any when empty.
+    'ALLOWED_IPS': (),
+    # Bearer token a scraper of /metrics has to send, none when empty.
+    'TOKEN': '',
+}
+
+current_metrics = ContextVar('imdb_request_metrics', default=None)
+
+
+def metrics_settings():
+    return {**DEFAULT_METRICS, **getattr(settings, 'IMDB_METRICS', {})}
+
+
+class RequestMetrics:
+    """
+    What one request spent its time on.
+
+    Installed as a connection execute wrapper it times and counts every statement, a statement run again with the
+    same parameters counts as a duplicate. ``stage`` times named parts of the request (``serialization``) without
+    the statements they run, and ``resolved`` accumulates GraphQL resolver timings by ``Type.field``. The metrics of
+    the request being handled are found with ``current``, the hooks do nothing outside a request.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.duplicate_queries = 0
+        self.statements = set()
+        self.stages = {}
+        self.stage_db_seconds = 0.0
+        self.active_stage = None
+        self.resolvers = {}
+
+    @staticmethod
+    def current():
+        return current_metrics.get()
+
+    def activate(self):
+        return current_metrics.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        current_metrics.reset(token)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.db_seconds += elapsed
+            if self.active_stage:
+                self.stage_db_seconds += elapsed
+            self.queries += 1
+            statement = (sql, repr(params))
+            if statement in self.statements:
+                self.duplicate_queries += 1
+            else:
+                self.statements.add(statement)
+
+    @classmethod
+    @contextmanager
+    def stage(cls, name):
+        """
+        Adds the time of the block, less its statements, to the ``name`` stage of the current request. Nested stages
+        count towards the outermost one only.
+        """
+        metrics = cls.current()
+        if metrics is None or metrics.active_stage:
+            yield
+            return
+        metrics.active_stage = name
+        db_seconds = metrics.stage_db_seconds
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start - (metrics.stage_db_seconds - db_seconds)
+            metrics.stages[name] = metrics.stages.get(name, 0.0) + elapsed
+            metrics.active_stage = None
+
+    def resolved(self, field, seconds):
+        calls, total = self.resolvers.get(field, (0, 0.0))
+        self.resolvers[field] = (calls + 1, total + seconds)
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdb', '0002_profession_movie_episode_akas_person_crew_principal_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crew',
+            name='row_hash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='episode',
+            name='row_hash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='row_hash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='row_hash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='rating',
+            name='row_hash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
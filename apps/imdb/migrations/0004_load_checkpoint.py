@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdb', '0003_row_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoadCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dataset', models.CharField(max_length=32)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('start_row', models.BigIntegerField()),
+                ('rows', models.IntegerField()),
+                ('completed', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dataset', 'start_row'], name='imdb_loadch_dataset_b58296_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:50
+
+from django.db import migrations, models
+
+PREFIXES = {'Movie': 'tt', 'Person': 'nm'}
+
+
+def key_columns(apps, model_name):
+    """
+    Returns ``(table, column)`` of the primary key of ``model_name`` and of every foreign key referencing it,
+    the foreign keys of the many-to-many through tables included.
+    """
+    model = apps.get_model('imdb', model_name)
+    columns = [(model._meta.db_table, model._meta.pk.column)]
+    for relation in model._meta.get_fields(include_hidden=True):
+        if relation.auto_created and not relation.concrete and (relation.one_to_many or relation.one_to_one):
+            columns.append((relation.related_model._meta.db_table, relation.field.column))
+    return columns
+
+
+def update_keys(apps, schema_editor, template):
+    quote_name = schema_editor.quote_name
+    with schema_editor.connection.cursor() as cursor:
+        for model_name, prefix in PREFIXES.items():
+            for table, column in key_columns(apps, model_name):
+                value = template.format(column=quote_name(column), prefix=prefix)
+                cursor.execute(f'UPDATE {quote_name(table)} SET {quote_name(column)} = {value}')
+        if schema_editor.connection.vendor == 'postgresql':
+            # Check the deferred foreign keys now, tables with pending trigger events can not be altered.
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+def strip_prefixes(apps, schema_editor):
+    update_keys(apps, schema_editor, 'SUBSTR({column}, 3)')
+
+
+def add_prefixes(apps, schema_editor):
+    # 1 -> tt0000001, ids of more than 7 digits are kept as they are.
+    update_keys(
+        apps,
+        schema_editor,
+        "'{prefix}' || CASE WHEN LENGTH({column}) < 7 "
+        "THEN SUBSTR('0000000' || {column}, LENGTH({column}) + 1) ELSE {column} END",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdb', '0004_load_checkpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(strip_prefixes, add_prefixes),
+        migrations.AlterField(
+            model_name='movie',
+            name='id',
+            field=models.IntegerField(primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='person',
+            name='id',
+            field=models.IntegerField(primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:53
+
+from django.db import migrations, models
+
+# Expression indexes Django can only express with django.contrib.postgres, created on PostgreSQL only. Django compiles
+# istartswith/icontains on a CharField to UPPER("title"::text) LIKE UPPER(...), the prefix B-tree serves the former in
+# any collation and the trigram GIN index the latter.
+POSTGRESQL_INDEXES = {
+    'imdb_movie_title_prefix_idx': 'ON imdb_movie (UPPER(title::text) text_pattern_ops)',
+}
+# Need the pg_trgm extension, skipped on servers where it is not available.
+TRIGRAM_INDEXES = {
+    'imdb_movie_title_trgm_idx': 'ON imdb_movie USING gin (UPPER(title::text) gin_trgm_ops)',
+}
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    AddIndex using CREATE INDEX CONCURRENTLY on PostgreSQL, so a loaded table stays writable while it is indexed.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, **self.options(schema_editor))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, **self.options(schema_editor))
+
+    @staticmethod
+    def options(schema_editor):
+        return {'concurrently': True} if schema_editor.connection.vendor == 'postgresql' else {}
+
+
+def create_postgresql_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    indexes = dict(POSTGRESQL_INDEXES)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone():
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            indexes.update(TRIGRAM_INDEXES)
+    for name, definition in indexes.items():
+        schema_editor.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}')
+
+
+def drop_postgresql_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in {**POSTGRESQL_INDEXES, **TRIGRAM_INDEXES}:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('imdb', '0005_integer_keys'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='akas',
+            index=models.Index(fields=['region', 'language'], name='imdb_akas_region_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='akas',
+            index=models.Index(fields=['language'], name='imdb_akas_language_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='movie',
+            index=models.Index(fields=['year', 'id'], name='imdb_movie_year_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='movie',
+            index=models.Index(fields=['movie_type', 'year'], name='imdb_movie_type_year_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='movie',
+            index=models.Index(fields=['title', 'id'], name='imdb_movie_title_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='rating',
+            index=models.Index(fields=['-average_rating', '-id'], include=('movie',), name='imdb_rating_rank_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='rating',
+            index=models.Index(fields=['-num_votes', '-id'], name='imdb_rating_votes_id_idx'),
+        ),
+        migrations.RunPython(create_postgresql_indexes, drop_postgresql_indexes),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdb', '0006_read_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('loaded_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdb', '0008_dataset_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('decade', models.IntegerField(blank=True, null=True)),
+                ('rank', models.IntegerField()),
+                ('weighted_rating', models.FloatField()),
+                ('average_rating', models.FloatField()),
+                ('num_votes', models.IntegerField()),
+                ('genre', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='imdb.genre')),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='imdb.movie')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['genre', 'decade', 'rank'], name='imdb_ranking_scope_idx')],
+            },
+        ),
+    ]
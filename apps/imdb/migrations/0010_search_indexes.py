@@ -0,0 +1,47 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:40
+
+from django.db import migrations
+
+# Full-text indexes for apps.imdb.services.TitleSearch, PostgreSQL only. The expressions are the documents the
+# search queries, MOVIE_DOCUMENT and AKAS_DOCUMENT, the 'simple' configuration keeps titles unstemmed in any language.
+POSTGRESQL_INDEXES = {
+    'imdb_movie_title_fts_idx': (
+        "ON imdb_movie USING gin (to_tsvector('simple', title::text || ' ' || original_title::text))"
+    ),
+    'imdb_akas_title_fts_idx': "ON imdb_akas USING gin (to_tsvector('simple', title::text))",
+}
+# Fuzzy matching of alternate titles, needs the pg_trgm extension (see migration 0006).
+TRIGRAM_INDEXES = {
+    'imdb_akas_title_trgm_idx': 'ON imdb_akas USING gin (UPPER(title::text) gin_trgm_ops)',
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    indexes = dict(POSTGRESQL_INDEXES)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone():
+            indexes.update(TRIGRAM_INDEXES)
+    for name, definition in indexes.items():
+        schema_editor.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in {**POSTGRESQL_INDEXES, **TRIGRAM_INDEXES}:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('imdb', '0009_movie_ranking'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Drops the INCLUDE column of imdb_rating_rank_idx from the model state only. Models.W040 flags covering indexes
+    on SQLite, which never had the column; on PostgreSQL the index created by 0006 keeps covering the movie.
+    """
+
+    dependencies = [
+        ('imdb', '0010_search_indexes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name='rating',
+                    name='imdb_rating_rank_idx',
+                ),
+                migrations.AddIndex(
+                    model_name='rating',
+                    index=models.Index(fields=['-average_rating', '-id'], name='imdb_rating_rank_idx'),
+                ),
+            ],
+        ),
+    ]
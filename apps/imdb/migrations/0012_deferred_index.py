@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imdb', '0011_rating_rank_index_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeferredIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=128)),
+                ('name', models.CharField(max_length=128)),
+                ('foreign_key', models.BooleanField(default=False)),
+                ('definition', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
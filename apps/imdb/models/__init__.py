@@ -1 +1,2 @@
-from .imdb import *
\ No newline at end of file
+from .imdb import *
+from .loader import *
\ No newline at end of file
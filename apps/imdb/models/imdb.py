@@ -1,6 +1,6 @@
 from django.db import models
 
-__all__ = ['Genre', 'MovieType', 'Movie', 'Profession', 'Person', 'Akas', 'Crew', 'Episode', 'Principal', 'Rating']
+__all__ = ['Genre', 'MovieType', 'Movie', 'Profession', 'Person', 'Akas', 'Crew', 'Episode', 'Principal', 'Rating', 'MovieRanking']
 
 
 class Genre(models.Model):
@@ -77,7 +77,8 @@ class MovieType(models.Model):
 
 
 class Movie(models.Model):
-    id = models.CharField(max_length=16, primary_key=True)
+    # Numeric part of the IMDb title id (tt0000001 -> 1), the prefix is only added back at the API boundary.
+    id = models.IntegerField(primary_key=True)
     movie_type = models.ForeignKey(MovieType, default=MovieType.no_type, on_delete=models.CASCADE)
     title = models.CharField(max_length=512)
     original_title = models.CharField(max_length=512)
@@ -86,10 +87,27 @@ class Movie(models.Model):
     end_year = models.IntegerField(null=True, blank=True)
     runtime_minutes = models.IntegerField(null=True, blank=True)
     genres = models.ManyToManyField(Genre, related_name='movies', blank=True)
+    row_hash = models.BigIntegerField(null=True, blank=True, editable=False)
+
+    class Meta:
+        # Title prefix and trigram indexes on UPPER(title) are PostgreSQL only, see migration 0006.
+        indexes = [
+            models.Index(fields=['year', 'id'], name='imdb_movie_year_idx'),
+            models.Index(fields=['movie_type', 'year'], name='imdb_movie_type_year_idx'),
+            models.Index(fields=['title', 'id'], name='imdb_movie_title_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def tconst(self):
+        return f'tt{self.id:07d}'
+
+    @staticmethod
+    def parse_tconst(tconst):
+        return int(tconst[2:] if tconst.startswith('tt') else tconst)
+
 
 class Profession(models.Model):
     (accountant, actor, actress, animation_department, archive_footage, archive_sound, art_department, art_director,
@@ -156,16 +174,26 @@ class Profession(models.Model):
 
 
 class Person(models.Model):
-    id = models.CharField(max_length=16, primary_key=True)
+    # Numeric part of the IMDb name id (nm0000001 -> 1), the prefix is only added back at the API boundary.
+    id = models.IntegerField(primary_key=True)
     name = models.CharField(max_length=255)
     birth_year = models.IntegerField(null=True, blank=True)
     death_year = models.IntegerField(null=True, blank=True)
     professions = models.ManyToManyField(Profession, related_name='persons', blank=True)
     movies = models.ManyToManyField(Movie, related_name='persons', blank=True)
+    row_hash = models.BigIntegerField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.name
 
+    @property
+    def nconst(self):
+        return f'nm{self.id:07d}'
+
+    @staticmethod
+    def parse_nconst(nconst):
+        return int(nconst[2:] if nconst.startswith('nm') else nconst)
+
 
 class Akas(models.Model):
     movie = models.ForeignKey(Movie, on_delete=models.CASCADE)
@@ -177,6 +205,12 @@ class Akas(models.Model):
     attributes = models.CharField(max_length=255, blank=True)
     is_original_title = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['region', 'language'], name='imdb_akas_region_idx'),
+            models.Index(fields=['language'], name='imdb_akas_language_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -185,6 +219,7 @@ class Crew(models.Model):
     movie = models.OneToOneField(Movie, on_delete=models.CASCADE)
     directors = models.ManyToManyField(Person, related_name = 'crew_directors', blank = True)
     writers = models.ManyToManyField(Person, related_name = 'crew_writers', blank = True)
+    row_hash = models.BigIntegerField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return f'Crew: {self.movie.title}'
@@ -195,6 +230,7 @@ class Episode(models.Model):
     parent = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='episodes')
     season_number = models.IntegerField(null=True, blank=True)
     episode_number = models.IntegerField(null=True, blank=True)
+    row_hash = models.BigIntegerField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return f'Episode {self.episode_number}: {self.movie.title}'
@@ -218,6 +254,37 @@ class Rating(models.Model):
     movie = models.OneToOneField(Movie, on_delete=models.CASCADE, related_name='rating')
     average_rating = models.FloatField()
     num_votes = models.IntegerField()
+    row_hash = models.BigIntegerField(null=True, blank=True, editable=False)
+
+    class Meta:
+        # Top rated listings use imdb_rating_rank_idx on (-average_rating, -id), covering the movie on PostgreSQL,
+        # see migration 0013. The id breaks ties for keyset pagination, average ratings take fewer than a hundred
+        # distinct values.
+        indexes = [
+            models.Index(fields=['-num_votes', '-id'], name='imdb_rating_votes_id_idx'),
+        ]
 
     def __str__(self):
         return f'{self.movie.title} - {self.average_rating}'
+
+
+class MovieRanking(models.Model):
+    """
+    Precomputed leaderboard entry: the rank of a movie by weighted rating among all rated movies, within a genre,
+    a decade or both (``genre``/``decade`` unset for all of them). Rebuilt at the end of every load.
+    """
+    genre = models.ForeignKey(Genre, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    decade = models.IntegerField(null=True, blank=True)
+    rank = models.IntegerField()
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='rankings')
+    weighted_rating = models.FloatField()
+    average_rating = models.FloatField()
+    num_votes = models.IntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['genre', 'decade', 'rank'], name='imdb_ranking_scope_idx'),
+        ]
+
+    def __str__(self):
+        return f'#{self.rank} {self.movie_id}'
@@ -0,0 +1,48 @@
+from django.db import models
+
+__all__ = ['DatasetVersion', 'DeferredIndex', 'LoadCheckpoint']
+
+
+class LoadCheckpoint(models.Model):
+    """
+    A range of dataset rows committed by the loader together with the batch, or with ``completed`` the marker of a
+    fully loaded dataset file.
+    """
+    dataset = models.CharField(max_length=32)
+    fingerprint = models.CharField(max_length=64)
+    start_row = models.BigIntegerField()
+    rows = models.IntegerField()
+    completed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['dataset', 'start_row'])]
+
+    def __str__(self):
+        return f'{self.dataset}: {self.start_row}+{self.rows}'
+
+
+class DeferredIndex(models.Model):
+    """
+    A secondary index or foreign key dropped by ``load_imdb --defer-indexes``. Recorded in the transaction dropping it
+    and removed once it is rebuilt, so the indexes of an interrupted load are restored by the next one.
+    """
+    table = models.CharField(max_length=128)
+    name = models.CharField(max_length=128)
+    foreign_key = models.BooleanField(default=False)
+    definition = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.table}: {self.name}'
+
+
+class DatasetVersion(models.Model):
+    """
+    Single row stamp of the loaded data, bumped at the end of every load. Cached API responses are keyed by it.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    loaded_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'Dataset version {self.version}'
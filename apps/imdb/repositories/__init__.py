@@ -0,0 +1,2 @@
+from .imdb import *
+from .keyset import *
\ No newline at end of file
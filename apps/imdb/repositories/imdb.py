@@ -0,0 +1,87 @@
+from django.db.models import Prefetch
+
+from apps.imdb.models import Crew, Movie, MovieRanking, Person, Rating
+from apps.imdb.services import TitleSearch
+
+__all__ = (
+    'CrewRepository',
+    'MovieRepository',
+    'PersonRepository',
+    'RankingRepository',
+    'RatingRepository',
+    'SearchRepository',
+)
+
+
+class MovieRepository:
+    @classmethod
+    def summaries(cls):
+        return Movie.objects.only('id', 'title', 'year')
+
+    @classmethod
+    def list(cls):
+        """
+        Movies with everything the movie serializers nest: the to-one relations are joined, every to-many relation
+        is one prefetch query for the whole page.
+        """
+        return Movie.objects.select_related('movie_type', 'rating', 'crew').prefetch_related(
+            'genres',
+            Prefetch('persons', queryset=PersonRepository.summaries()),
+            Prefetch('crew__directors', queryset=PersonRepository.summaries()),
+            Prefetch('crew__writers', queryset=PersonRepository.summaries()),
+        ).order_by('id')
+
+
+class PersonRepository:
+    @classmethod
+    def summaries(cls):
+        return Person.objects.only('id', 'name')
+
+    @classmethod
+    def list(cls):
+        return Person.objects.prefetch_related(
+            'professions',
+            Prefetch('movies', queryset=MovieRepository.summaries()),
+        ).order_by('id')
+
+
+class CrewRepository:
+    @classmethod
+    def list(cls):
+        return Crew.objects.select_related('movie').only(
+            'movie__id', 'movie__title', 'movie__year',
+        ).prefetch_related(
+            Prefetch('directors', queryset=PersonRepository.summaries()),
+            Prefetch('writers', queryset=PersonRepository.summaries()),
+        ).order_by('movie_id')
+
+
+class RatingRepository:
+    @classmethod
+    def list(cls):
+        return Rating.objects.select_related('movie').only(
+            'average_rating', 'num_votes', 'movie__id', 'movie__title', 'movie__year',
+        ).order_by('movie_id')
+
+
+class RankingRepository:
+    @classmethod
+    def list(cls):
+        """
+        Leaderboard entries in rank order, filter on ``genre`` and ``decade`` (``None`` for all) to get one ranking.
+        """
+        return MovieRanking.objects.select_related('movie', 'genre').only(
+            'genre__code', 'decade', 'rank', 'weighted_rating', 'average_rating', 'num_votes',
+            'movie__id', 'movie__title', 'movie__year',
+        ).order_by('rank')
+
+
+class SearchRepository:
+    @classmethod
+    def search(cls, text, region=None, language=None, limit=20):
+        """
+        Title search results in rank order, each ``TitleSearch`` hit with the summary of its ``movie``.
+        """
+        hits = TitleSearch.search(text, region=region, language=language, limit=limit)
+        movies = MovieRepository.summaries().in_bulk([hit.movie_id for hit in hits])
+        return [{'movie': movies[hit.movie_id], **hit._asdict()} for hit in hits if hit.movie_id in movies]
@@ -0,0 +1,6 @@
+from .connections import *
+from .cost import *
+from .documents import *
+from .imdb import *
+from .loaders import *
+from .planner import *
\ No newline at end of file
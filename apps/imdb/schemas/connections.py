@@ -0,0 +1,58 @@
+from graphene import relay
+from graphene_django.settings import graphene_settings
+from graphql import GraphQLError
+
+from apps.imdb.repositories import Keyset
+
+from .loaders import Loaders
+
+__all__ = ('KeysetConnectionField', )
+
+PAGE_SIZE = 100
+
+
+class KeysetConnectionField(relay.ConnectionField):
+    """
+    Relay connection over an ordered queryset, paged with ``Keyset`` instead of offsets.
+
+    ``first``/``after`` seek forward from a cursor and ``last``/``before`` backward, so any page costs one index seek.
+    Pages default to ``PAGE_SIZE`` rows and are capped at ``RELAY_CONNECTION_MAX_LIMIT``. The nodes of a page are
+    registered with the request's ``Loaders``, so their relations are loaded for the whole page at once.
+    """
+
+    @classmethod
+    def connection_resolver(cls, resolver, connection_type, root, info, **args):
+        connection = super().connection_resolver(resolver, connection_type, root, info, **args)
+        Loaders.of(info).register([edge.node for edge in connection.edges])
+        return connection
+
+    @classmethod
+    def resolve_connection(cls, connection_type, args, resolved):
+        if isinstance(resolved, connection_type):
+            return resolved
+        first, last = args.get('first'), args.get('last')
+        if first is not None and last is not None:
+            raise GraphQLError('Pass either first or last, not both.')
+        reverse = last is not None
+        size = last if reverse else first
+        if size is None:
+            size = PAGE_SIZE
+        if not 0 <= size <= graphene_settings.RELAY_CONNECTION_MAX_LIMIT:
+            raise GraphQLError(f'Pages hold 0 to {graphene_settings.RELAY_CONNECTION_MAX_LIMIT} records.')
+        try:
+            keyset = Keyset(resolved)
+            cursor = args.get('before') if reverse else args.get('after')
+            key = keyset.decode(cursor)[0] if cursor else None
+        except ValueError as e:
+            raise GraphQLError(str(e))
+        rows, has_more = keyset.page(size, key, reverse)
+        edges = [connection_type.Edge(node=row, cursor=keyset.encode(row)) for row in rows]
+        return connection_type(
+            edges=edges,
+            page_info=relay.PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_next_page=bool(cursor) if reverse else has_more,
+                has_previous_page=has_more if reverse else bool(cursor),
+            ),
+        )
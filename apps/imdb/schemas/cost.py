@@ -0,0 +1,140 @@
+from django.conf import settings
+from graphene_django.settings import graphene_settings
+from graphql import (
+    FieldNode, FragmentSpreadNode, GraphQLError, IntValueNode, VariableNode, get_named_type, get_nullable_type,
+    is_composite_type, is_list_type,
+)
+from graphql.validation import ValidationRule
+
+from .connections import PAGE_SIZE
+
+__all__ = ('QueryCostRule', )
+
+DEFAULT_QUERY_COST = {
+    'BUDGET': 500_000,
+    'MAX_DEPTH': 10,
+    'LIST_SIZE': 10,
+}
+
+
+def query_cost_settings():
+    return {**DEFAULT_QUERY_COST, **getattr(settings, 'GRAPHQL_QUERY_COST', {})}
+
+
+class QueryCostRule(ValidationRule):
+    """
+    Rejects operations estimated to resolve more objects than the ``GRAPHQL_QUERY_COST`` budget, or nested deeper
+    than its ``MAX_DEPTH``.
+
+    The cost is the number of objects the operation may resolve: every object field counts once per parent, times
+    the page size (``first``/``last``, ``PAGE_SIZE`` by default) for connections and ``LIST_SIZE`` for plain lists.
+    ``Person.knownFor`` and ``Movie.persons`` form a cycle, so nesting multiplies quickly; scalar fields are free.
+    Use ``bind`` to get a rule seeing the request variables and recording the estimate of each operation.
+    """
+    variables = {}
+    costs = None
+
+    @classmethod
+    def bind(cls, variables, costs):
+        """
+        Returns a rule class reading ``first``/``last`` variables from ``variables`` and storing the estimate of
+        each operation in ``costs`` by operation name.
+        """
+        return type(cls.__name__, (cls, ), {'variables': variables or {}, 'costs': costs})
+
+    def enter_operation_definition(self, node, *args):
+        options = query_cost_settings()
+        schema = self.context.schema
+        root = schema.mutation_type if node.operation.value == 'mutation' else schema.query_type
+        if root is None:
+            return
+        defaults = {
+            definition.variable.name.value: definition.default_value
+            for definition in node.variable_definitions or ()
+            if definition.default_value is not None
+        }
+        cost, depth = self.estimate(root, node.selection_set, 0, defaults, options, set())
+        name = node.name.value if node.name else None
+        if self.costs is not None:
+            self.costs[name] = {'cost': cost, 'depth': depth, 'budget': options['BUDGET']}
+        if depth > options['MAX_DEPTH']:
+            self.report_error(GraphQLError(
+                f'Query depth {depth} exceeds the limit of {options["MAX_DEPTH"]}.',
+                node,
+                extensions={'code': 'QUERY_TOO_DEEP'},
+            ))
+        elif cost > options['BUDGET']:
+            self.report_error(GraphQLError(
+                f'Query cost {cost} exceeds the budget of {options["BUDGET"]}, request smaller pages or fewer '
+                f'nested lists.',
+                node,
+                extensions={'code': 'QUERY_TOO_COSTLY', 'cost': cost, 'budget': options['BUDGET']},
+            ))
+
+    def estimate(self, parent_type, selection_set, depth, defaults, options, fragments):
+        """
+        Returns ``(cost, depth)`` of ``selection_set`` on ``parent_type``, ``depth`` levels below the root. Connection
+        edges and nodes do not add a level.
+        """
+        cost, deepest = 0, depth
+        wrapper = self.is_connection(parent_type) or 'cursor' in getattr(parent_type, 'fields', {})
+        child_depth = depth if wrapper else depth + 1
+        if selection_set is None or depth > options['MAX_DEPTH']:
+            return cost, deepest
+        for selection in selection_set.selections:
+            if isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.context.get_fragment(name)
+                if fragment is None or name in fragments:
+                    continue
+                sub_type = self.context.schema.get_type(fragment.type_condition.name.value) or parent_type
+                sub_cost, sub_depth = self.estimate(
+                    sub_type, fragment.selection_set, depth, defaults, options, fragments | {name},
+                )
+            elif not isinstance(selection, FieldNode):
+                condition = selection.type_condition
+                sub_type = self.context.schema.get_type(condition.name.value) if condition else parent_type
+                sub_cost, sub_depth = self.estimate(
+                    sub_type or parent_type, selection.selection_set, depth, defaults, options, fragments,
+                )
+            else:
+                field = getattr(parent_type, 'fields', {}).get(selection.name.value)
+                if field is None or not is_composite_type(get_named_type(field.type)):
+                    continue
+                field_type = get_named_type(field.type)
+                child_cost, sub_depth = self.estimate(
+                    field_type, selection.selection_set, child_depth, defaults, options, fragments,
+                )
+                if self.is_connection(parent_type):
+                    # edges and pageInfo only wrap the nodes of the page
+                    sub_cost = child_cost
+                elif self.is_connection(field_type):
+                    sub_cost = self.page_size(selection, defaults) * child_cost
+                elif is_list_type(get_nullable_type(field.type)):
+                    sub_cost = options['LIST_SIZE'] * (1 + child_cost)
+                else:
+                    sub_cost = 1 + child_cost
+            cost += sub_cost
+            deepest = max(deepest, sub_depth)
+        return cost, deepest
+
+    @staticmethod
+    def is_connection(graphql_type):
+        return 'pageInfo' in getattr(graphql_type, 'fields', {})
+
+    def page_size(self, field_node, defaults):
+        sizes = {'first': None, 'last': None}
+        for argument in field_node.arguments:
+            if argument.name.value not in sizes:
+                continue
+            value = argument.value
+            if isinstance(value, VariableNode):
+                name = value.name.value
+                value = self.variables[name] if name in self.variables else defaults.get(name)
+            if isinstance(value, IntValueNode):
+                value = int(value.value)
+            sizes[argument.name.value] = value if isinstance(value, int) else None
+        if sizes['first'] is None and sizes['last'] is None:
+            return PAGE_SIZE
+        # Out of range sizes are rejected by the connection, count them as the largest page.
+        return min(max(size or 0 for size in sizes.values()), graphene_settings.RELAY_CONNECTION_MAX_LIMIT)
@@ -0,0 +1,97 @@
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from graphene_django.settings import graphene_settings
+from graphql import GraphQLError, parse, specified_rules, validate
+
+__all__ = ('DocumentCache', 'PersistedQueries', 'query_hash')
+
+DEFAULT_DOCUMENTS = {
+    'CACHE_SIZE': 256,
+    'PERSISTED_QUERIES': True,
+}
+
+
+def documents_settings():
+    return {**DEFAULT_DOCUMENTS, **getattr(settings, 'GRAPHQL_DOCUMENTS', {})}
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+class DocumentCache:
+    """
+    LRU cache of parsed and validated query documents keyed by the SHA-256 of the query text.
+
+    Parsing and running the specified validation rules depend on the query text and the schema only, so a document
+    seen before is executed straight away. Documents failing to parse or validate are cached with their errors.
+    Rules depending on the request, like ``QueryCostRule``, still have to run on every request.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.documents = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, schema, query):
+        """
+        Returns ``(document, errors)`` of ``query``, ``document`` is ``None`` if it does not parse.
+        """
+        key = query_hash(query)
+        with self.lock:
+            if key in self.documents:
+                self.documents.move_to_end(key)
+                return self.documents[key]
+        try:
+            document = parse(query)
+        except GraphQLError as e:
+            entry = None, [e]
+        else:
+            entry = document, validate(schema, document, specified_rules, graphene_settings.MAX_VALIDATION_ERRORS)
+        with self.lock:
+            self.documents[key] = entry
+            while len(self.documents) > self.size:
+                self.documents.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self.lock:
+            self.documents.clear()
+
+
+class PersistedQueries:
+    """
+    Automatic persisted queries, as sent by Apollo clients.
+
+    A client sends ``extensions.persistedQuery.sha256Hash`` instead of the query text. An unknown hash is answered
+    with ``PersistedQueryNotFound``; the client then sends the query along with its hash, which registers it in the
+    Django cache for the following requests. Share the cache between workers to share the registrations.
+    """
+    KEY_PREFIX = 'graphql:persisted:'
+
+    @classmethod
+    def resolve(cls, query, extensions):
+        """
+        Returns the query text of a request, looked up or registered by its persisted query hash if it has one.
+        """
+        persisted = extensions.get('persistedQuery') if isinstance(extensions, dict) else None
+        if not isinstance(persisted, dict):
+            return query
+        if not documents_settings()['PERSISTED_QUERIES']:
+            raise GraphQLError('PersistedQueryNotSupported', extensions={'code': 'PERSISTED_QUERY_NOT_SUPPORTED'})
+        if persisted.get('version') != 1 or not isinstance(persisted.get('sha256Hash'), str):
+            raise GraphQLError('Unsupported persisted query version or hash.')
+        key = cls.KEY_PREFIX + persisted['sha256Hash']
+        if not query:
+            query = cache.get(key)
+            if query is None:
+                raise GraphQLError('PersistedQueryNotFound', extensions={'code': 'PERSISTED_QUERY_NOT_FOUND'})
+            return query
+        if query_hash(query) != persisted['sha256Hash']:
+            raise GraphQLError('Provided sha256Hash does not match the query.')
+        cache.set(key, query, timeout=None)
+        return query
@@ -0,0 +1,232 @@
+import graphene
+from graphene import relay
+from graphene_django import DjangoObjectType
+
+from apps.imdb.models import Crew, Episode, Movie, MovieRanking, Person, Principal, Rating
+
+from .loaders import Loaders
+
+__all__ = (
+    'CrewNode',
+    'EpisodeNode',
+    'MovieConnection',
+    'MovieNode',
+    'PersonConnection',
+    'PersonNode',
+    'PrincipalNode',
+    'RankingConnection',
+    'RankingNode',
+    'RatingNode',
+    'SearchResult',
+)
+
+
+def codes(instances):
+    return [instance.code for instance in instances]
+
+
+class MovieNode(DjangoObjectType):
+    id = graphene.ID(required=True, description='IMDb title id, e.g. tt0000001.')
+    movie_type = graphene.String()
+    genres = graphene.List(graphene.NonNull(graphene.String), required=True)
+    rating = graphene.Field(lambda: RatingNode)
+    crew = graphene.Field(lambda: CrewNode)
+    persons = graphene.List(graphene.NonNull(lambda: PersonNode), required=True, description='Known for by.')
+    principals = graphene.List(graphene.NonNull(lambda: PrincipalNode), required=True)
+    episode = graphene.Field(lambda: EpisodeNode, description='Set when the title is an episode.')
+    episodes = graphene.List(graphene.NonNull(lambda: EpisodeNode), required=True)
+
+    class Meta:
+        model = Movie
+        name = 'Movie'
+        fields = ('id', 'title', 'original_title', 'is_adult', 'year', 'end_year', 'runtime_minutes')
+
+    @staticmethod
+    def resolve_id(root, info):
+        return root.tconst
+
+    @staticmethod
+    def resolve_movie_type(root, info):
+        return Loaders.of(info).load(root, 'movie_type').code
+
+    @staticmethod
+    def resolve_genres(root, info):
+        return codes(Loaders.of(info).load(root, 'genres'))
+
+    @staticmethod
+    def resolve_rating(root, info):
+        return Loaders.of(info).load(root, 'rating')
+
+    @staticmethod
+    def resolve_crew(root, info):
+        return Loaders.of(info).load(root, 'crew')
+
+    @staticmethod
+    def resolve_persons(root, info):
+        return Loaders.of(info).load(root, 'persons')
+
+    @staticmethod
+    def resolve_principals(root, info):
+        return Loaders.of(info).load(root, 'principal_set')
+
+    @staticmethod
+    def resolve_episode(root, info):
+        return Loaders.of(info).load(root, 'episode')
+
+    @staticmethod
+    def resolve_episodes(root, info):
+        return Loaders.of(info).load(root, 'episodes')
+
+
+class PersonNode(DjangoObjectType):
+    id = graphene.ID(required=True, description='IMDb name id, e.g. nm0000001.')
+    professions = graphene.List(graphene.NonNull(graphene.String), required=True)
+    known_for = graphene.List(graphene.NonNull(MovieNode), required=True)
+    directed = graphene.List(graphene.NonNull(MovieNode), required=True)
+    written = graphene.List(graphene.NonNull(MovieNode), required=True)
+    principals = graphene.List(graphene.NonNull(lambda: PrincipalNode), required=True)
+
+    class Meta:
+        model = Person
+        name = 'Person'
+        fields = ('id', 'name', 'birth_year', 'death_year')
+
+    @staticmethod
+    def resolve_id(root, info):
+        return root.nconst
+
+    @staticmethod
+    def resolve_professions(root, info):
+        return codes(Loaders.of(info).load(root, 'professions'))
+
+    @staticmethod
+    def resolve_known_for(root, info):
+        return Loaders.of(info).load(root, 'movies')
+
+    @staticmethod
+    def resolve_directed(root, info):
+        loaders = Loaders.of(info)
+        return [loaders.load(crew, 'movie') for crew in loaders.load(root, 'crew_directors')]
+
+    @staticmethod
+    def resolve_written(root, info):
+        loaders = Loaders.of(info)
+        return [loaders.load(crew, 'movie') for crew in loaders.load(root, 'crew_writers')]
+
+    @staticmethod
+    def resolve_principals(root, info):
+        return Loaders.of(info).load(root, 'principal_set')
+
+
+class CrewNode(DjangoObjectType):
+    movie = graphene.Field(graphene.NonNull(MovieNode))
+    directors = graphene.List(graphene.NonNull(PersonNode), required=True)
+    writers = graphene.List(graphene.NonNull(PersonNode), required=True)
+
+    class Meta:
+        model = Crew
+        name = 'Crew'
+        fields = ()
+
+    @staticmethod
+    def resolve_movie(root, info):
+        return Loaders.of(info).load(root, 'movie')
+
+    @staticmethod
+    def resolve_directors(root, info):
+        return Loaders.of(info).load(root, 'directors')
+
+    @staticmethod
+    def resolve_writers(root, info):
+        return Loaders.of(info).load(root, 'writers')
+
+
+class RatingNode(DjangoObjectType):
+    movie = graphene.Field(graphene.NonNull(MovieNode))
+
+    class Meta:
+        model = Rating
+        name = 'Rating'
+        fields = ('average_rating', 'num_votes')
+
+    @staticmethod
+    def resolve_movie(root, info):
+        return Loaders.of(info).load(root, 'movie')
+
+
+class EpisodeNode(DjangoObjectType):
+    movie = graphene.Field(graphene.NonNull(MovieNode))
+    parent = graphene.Field(graphene.NonNull(MovieNode))
+
+    class Meta:
+        model = Episode
+        name = 'Episode'
+        fields = ('season_number', 'episode_number')
+
+    @staticmethod
+    def resolve_movie(root, info):
+        return Loaders.of(info).load(root, 'movie')
+
+    @staticmethod
+    def resolve_parent(root, info):
+        return Loaders.of(info).load(root, 'parent')
+
+
+class PrincipalNode(DjangoObjectType):
+    movie = graphene.Field(graphene.NonNull(MovieNode))
+    person = graphene.Field(graphene.NonNull(PersonNode))
+
+    class Meta:
+        model = Principal
+        name = 'Principal'
+        fields = ('ordering', 'category', 'job', 'characters')
+
+    @staticmethod
+    def resolve_movie(root, info):
+        return Loaders.of(info).load(root, 'movie')
+
+    @staticmethod
+    def resolve_person(root, info):
+        return Loaders.of(info).load(root, 'person')
+
+
+class RankingNode(DjangoObjectType):
+    genre = graphene.String(description='Unset in the ranking across all genres.')
+    movie = graphene.Field(graphene.NonNull(MovieNode))
+
+    class Meta:
+        model = MovieRanking
+        name = 'Ranking'
+        fields = ('rank', 'weighted_rating', 'average_rating', 'num_votes', 'decade')
+
+    @staticmethod
+    def resolve_genre(root, info):
+        genre = Loaders.of(info).load(root, 'genre')
+        return genre.code if genre else None
+
+    @staticmethod
+    def resolve_movie(root, info):
+        return Loaders.of(info).load(root, 'movie')
+
+
+class SearchResult(graphene.ObjectType):
+    movie = graphene.Field(graphene.NonNull(MovieNode))
+    title = graphene.String(required=True, description='The matching title, original or alternate.')
+    region = graphene.String(required=True)
+    language = graphene.String(required=True)
+    score = graphene.Float(required=True)
+
+
+class MovieConnection(relay.Connection):
+    class Meta:
+        node = MovieNode
+
+
+class PersonConnection(relay.Connection):
+    class Meta:
+        node = PersonNode
+
+
+class RankingConnection(relay.Connection):
+    class Meta:
+        node = RankingNode
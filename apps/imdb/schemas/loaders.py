@@ -0,0 +1,70 @@
+from collections import defaultdict
+
+from django.db.models import Prefetch, prefetch_related_objects
+from django.db.models.fields.related_descriptors import ReverseManyToOneDescriptor
+
+from apps.imdb.models import Movie
+
+__all__ = ('Loaders', 'RELATION_ORDERINGS')
+
+# (model, relation) -> ordering of to-many relations listed in a meaningful order.
+RELATION_ORDERINGS = {
+    (Movie, 'principal_set'): ('ordering', ),
+    (Movie, 'episodes'): ('season_number', 'episode_number'),
+}
+
+
+class Loaders:
+    """
+    Per-request batch loading of model relations for GraphQL resolvers.
+
+    Every instance handed to the schema is registered by model. The first time a relation is loaded for one of them,
+    it is fetched for all registered instances of that model still missing it with a single ``prefetch_related``
+    query (``WHERE id IN (...)``), and the instances it returns are registered in turn. Since the executor resolves
+    a list item by item, the siblings of the first item are already registered when its relations are loaded, so a
+    query costs one database query per relation it traverses, however many rows it returns.
+    """
+
+    def __init__(self):
+        self.instances = defaultdict(dict)
+        self.results = defaultdict(dict)
+
+    @classmethod
+    def of(cls, info):
+        context = info.context
+        if not hasattr(context, 'imdb_loaders'):
+            context.imdb_loaders = cls()
+        return context.imdb_loaders
+
+    def register(self, instances):
+        # Keyed by identity, not primary key: a row reached through two paths may be two instances loaded with
+        # different columns, each has to get its relations on itself.
+        for instance in instances:
+            if instance is not None:
+                self.instances[instance._meta.concrete_model].setdefault(id(instance), instance)
+        return instances
+
+    def load(self, instance, relation):
+        """
+        Returns the related object (or ``None``) of a to-one ``relation`` of ``instance``, or the list of related
+        objects of a to-many one.
+        """
+        model = instance._meta.concrete_model
+        results = self.results[model, relation]
+        if id(instance) not in results:
+            self.register([instance])
+            batch = [other for key, other in self.instances[model].items() if key not in results]
+            self.fetch(model, relation, batch, results)
+        return results[id(instance)]
+
+    def fetch(self, model, relation, batch, results):
+        ordering = RELATION_ORDERINGS.get((model, relation))
+        queryset = getattr(model, relation).rel.related_model.objects.order_by(*ordering) if ordering else None
+        prefetch_related_objects(batch, Prefetch(relation, queryset=queryset))
+        to_many = isinstance(getattr(model, relation), ReverseManyToOneDescriptor)
+        for instance in batch:
+            if to_many:
+                results[id(instance)] = self.register(list(getattr(instance, relation).all()))
+            else:
+                results[id(instance)] = getattr(instance, relation, None)
+                self.register([results[id(instance)]])
@@ -0,0 +1,163 @@
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_snake_case
+from graphql import FieldNode, FragmentSpreadNode
+
+from apps.imdb.models import Crew, Episode, Movie, MovieRanking, Person, Principal, Rating
+
+from .loaders import RELATION_ORDERINGS
+
+__all__ = ('QueryPlanner', )
+
+# model -> GraphQL field -> path of model relations it resolves through, fields not listed map to model columns.
+RELATIONS = {
+    Movie: {
+        'movieType': ('movie_type', ),
+        'genres': ('genres', ),
+        'rating': ('rating', ),
+        'crew': ('crew', ),
+        'persons': ('persons', ),
+        'principals': ('principal_set', ),
+        'episode': ('episode', ),
+        'episodes': ('episodes', ),
+    },
+    Person: {
+        'professions': ('professions', ),
+        'knownFor': ('movies', ),
+        'directed': ('crew_directors', 'movie'),
+        'written': ('crew_writers', 'movie'),
+        'principals': ('principal_set', ),
+    },
+    Crew: {'movie': ('movie', ), 'directors': ('directors', ), 'writers': ('writers', )},
+    Rating: {'movie': ('movie', )},
+    Episode: {'movie': ('movie', ), 'parent': ('parent', )},
+    Principal: {'movie': ('movie', ), 'person': ('person', )},
+    MovieRanking: {'genre': ('genre', ), 'movie': ('movie', )},
+}
+
+# Slug relations resolve to this column only.
+SLUG_FIELDS = {(Movie, 'movieType'), (Movie, 'genres'), (Person, 'professions'), (MovieRanking, 'genre')}
+
+
+class Plan:
+    """
+    Columns to load of a model, and its relations to join (``select``) or prefetch, each with its own plan.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = {model._meta.pk.attname}
+        self.select = {}
+        self.prefetch = {}
+
+
+class QueryPlanner:
+    """
+    Trims a root queryset to what a GraphQL query selects.
+
+    The selection set is read from ``info`` (fragments included) and mapped onto the model: selected columns become
+    ``.only()``, to-one relations ``select_related`` and to-many ones a ``Prefetch`` whose queryset is planned the same
+    way, down to the deepest selection. A query asking for ``title`` and ``year`` reads the id, title and year columns
+    in one query. ``Loaders`` finds the relations it is asked for already cached and does not query them again.
+    """
+
+    @classmethod
+    def optimize(cls, queryset, info, path=()):
+        """
+        Returns ``queryset`` trimmed to the selection of the field being resolved, the selection below ``path``
+        (e.g. ``('edges', 'node')`` for a connection) when given.
+        """
+        nodes = info.field_nodes
+        for name in path:
+            nodes = cls.children(nodes, info.fragments).get(name, [])
+        plan = Plan(queryset.model)
+        cls.fill(plan, cls.children(nodes, info.fragments), info.fragments)
+        opts = queryset.model._meta
+        for name in queryset.query.order_by:
+            name = name.removeprefix('-')
+            plan.fields.add(opts.pk.attname if name == 'pk' else opts.get_field(name).attname)
+        return cls.apply(queryset, plan)
+
+    @classmethod
+    def children(cls, nodes, fragments):
+        """
+        Returns the fields selected below ``nodes`` by response name, aliases of one field merged.
+        """
+        children = defaultdict(list)
+        for node in nodes:
+            if node.selection_set is not None:
+                cls.collect(node.selection_set, fragments, children)
+        return children
+
+    @classmethod
+    def collect(cls, selection_set, fragments, children):
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                children[selection.name.value].append(selection)
+            elif isinstance(selection, FragmentSpreadNode):
+                cls.collect(fragments[selection.name.value].selection_set, fragments, children)
+            else:
+                cls.collect(selection.selection_set, fragments, children)
+
+    @classmethod
+    def fill(cls, plan, selections, fragments):
+        opts = plan.model._meta
+        relations = RELATIONS.get(plan.model, {})
+        for name, nodes in selections.items():
+            if name in relations:
+                sub = cls.relation(plan, relations[name])
+                if (plan.model, name) in SLUG_FIELDS:
+                    sub.fields.add('code')
+                else:
+                    cls.fill(sub, cls.children(nodes, fragments), fragments)
+                continue
+            try:
+                field = opts.get_field(to_snake_case(name))
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.is_relation:
+                plan.fields.add(field.attname)
+
+    @staticmethod
+    def relation(plan, path):
+        """
+        Adds the relations of ``path`` to ``plan`` and returns the plan of the last one.
+        """
+        for name in path:
+            field = next(
+                field for field in plan.model._meta.get_fields()
+                if (field.get_accessor_name() if field.auto_created and not field.concrete else field.name) == name
+            )
+            to_many = field.many_to_many or field.one_to_many
+            plans = plan.prefetch if to_many else plan.select
+            sub = plans.setdefault(name, Plan(field.related_model))
+            if field.one_to_many or field.one_to_one and not field.concrete:
+                # Reverse relations are matched on the foreign key of the related rows.
+                sub.fields.add(field.field.attname)
+            elif field.concrete and not field.many_to_many:
+                plan.fields.add(field.attname)
+            plan = sub
+        return plan
+
+    @classmethod
+    def apply(cls, queryset, plan):
+        only, select, prefetch = [], [], []
+        cls.flatten(plan, '', only, select, prefetch)
+        queryset = queryset.only(*only).prefetch_related(*prefetch)
+        # select_related() without fields would follow every foreign key.
+        return queryset.select_related(*select) if select else queryset
+
+    @classmethod
+    def flatten(cls, plan, prefix, only, select, prefetch):
+        only.extend(prefix + name for name in sorted(plan.fields))
+        for name, sub in plan.select.items():
+            select.append(prefix + name)
+            cls.flatten(sub, f'{prefix}{name}__', only, select, prefetch)
+        for name, sub in plan.prefetch.items():
+            queryset = sub.model.objects.all()
+            ordering = RELATION_ORDERINGS.get((plan.model, name))
+            if ordering:
+                queryset = queryset.order_by(*ordering)
+            prefetch.append(Prefetch(prefix + name, queryset=cls.apply(queryset, sub)))
@@ -0,0 +1,2 @@
+from .imdb import *
+from .timing import *
\ No newline at end of file
@@ -0,0 +1,125 @@
+from rest_framework import serializers
+
+from apps.imdb.models import Crew, Movie, MovieRanking, Person, Rating
+from apps.imdb.services.title_search import MAX_RESULTS
+
+from .timing import TimedListSerializer, TimedSerializerMixin
+
+__all__ = (
+    'CrewSerializer',
+    'MovieSerializer',
+    'MovieSummarySerializer',
+    'PersonSerializer',
+    'PersonSummarySerializer',
+    'RankingSerializer',
+    'RatingSerializer',
+    'SearchQuerySerializer',
+    'SearchResultSerializer',
+)
+
+
+class MovieSummarySerializer(serializers.ModelSerializer):
+    id = serializers.CharField(source='tconst', read_only=True)
+
+    class Meta:
+        model = Movie
+        fields = ('id', 'title', 'year')
+
+
+class PersonSummarySerializer(serializers.ModelSerializer):
+    id = serializers.CharField(source='nconst', read_only=True)
+
+    class Meta:
+        model = Person
+        fields = ('id', 'name')
+
+
+class MovieRatingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Rating
+        fields = ('average_rating', 'num_votes')
+
+
+class MovieCrewSerializer(serializers.ModelSerializer):
+    directors = PersonSummarySerializer(many=True, read_only=True)
+    writers = PersonSummarySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Crew
+        fields = ('directors', 'writers')
+
+
+class MovieSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    id = serializers.CharField(source='tconst', read_only=True)
+    movie_type = serializers.SlugRelatedField(slug_field='code', read_only=True)
+    genres = serializers.SlugRelatedField(slug_field='code', many=True, read_only=True)
+    rating = MovieRatingSerializer(read_only=True)
+    crew = MovieCrewSerializer(read_only=True)
+    persons = PersonSummarySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Movie
+        fields = (
+            'id', 'movie_type', 'title', 'original_title', 'is_adult', 'year', 'end_year', 'runtime_minutes',
+            'genres', 'rating', 'crew', 'persons',
+        )
+        list_serializer_class = TimedListSerializer
+
+
+class PersonSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    id = serializers.CharField(source='nconst', read_only=True)
+    professions = serializers.SlugRelatedField(slug_field='code', many=True, read_only=True)
+    known_for = MovieSummarySerializer(source='movies', many=True, read_only=True)
+
+    class Meta:
+        model = Person
+        fields = ('id', 'name', 'birth_year', 'death_year', 'professions', 'known_for')
+        list_serializer_class = TimedListSerializer
+
+
+class CrewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    movie = MovieSummarySerializer(read_only=True)
+    directors = PersonSummarySerializer(many=True, read_only=True)
+    writers = PersonSummarySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Crew
+        fields = ('movie', 'directors', 'writers')
+        list_serializer_class = TimedListSerializer
+
+
+class RatingSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    movie = MovieSummarySerializer(read_only=True)
+
+    class Meta:
+        model = Rating
+        fields = ('movie', 'average_rating', 'num_votes')
+        list_serializer_class = TimedListSerializer
+
+
+class RankingSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    movie = MovieSummarySerializer(read_only=True)
+    genre = serializers.SlugRelatedField(slug_field='code', read_only=True)
+
+    class Meta:
+        model = MovieRanking
+        fields = ('rank', 'movie', 'weighted_rating', 'average_rating', 'num_votes', 'genre', 'decade')
+        list_serializer_class = TimedListSerializer
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField()
+    region = serializers.CharField(required=False, max_length=4)
+    language = serializers.CharField(required=False, max_length=4)
+    limit = serializers.IntegerField(required=False, default=20, min_value=1, max_value=MAX_RESULTS)
+
+
+class SearchResultSerializer(TimedSerializerMixin, serializers.Serializer):
+    movie = MovieSummarySerializer(read_only=True)
+    title = serializers.CharField(read_only=True)
+    region = serializers.CharField(read_only=True)
+    language = serializers.CharField(read_only=True)
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        list_serializer_class = TimedListSerializer
@@ -0,0 +1,21 @@
+from rest_framework import serializers
+
+from apps.imdb.metrics import RequestMetrics
+
+__all__ = ('TimedListSerializer', 'TimedSerializerMixin')
+
+
+class TimedSerializerMixin:
+    """
+    Reports the time spent building ``data`` to the ``serialization`` stage of the current request. Only the
+    serializers a view returns need it, nested serializers run within them.
+    """
+
+    @property
+    def data(self):
+        with RequestMetrics.stage('serialization'):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
@@ -1 +1,13 @@
-from .imdb_loader import *
\ No newline at end of file
+from .batch_sizer import *
+from .bulk_writer import *
+from .checkpoints import *
+from .dataset_version import *
+from .deferred_indexes import *
+from .imdb_loader import *
+from .imdb_pipeline import *
+from .ingest_profile import *
+from .memory import *
+from .rankings import *
+from .row_delta import *
+from .title_search import *
+from .tsv_decoder import *
\ No newline at end of file
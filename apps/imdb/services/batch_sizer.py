@@ -0,0 +1,42 @@
+__all__ = ('BatchSizer', )
+
+BATCH_SIZE = 1000
+MIN_BATCH_SIZE = 100
+MAX_BATCH_SIZE = 50000
+# Raw TSV characters per batch, bounds the batches of wide rows (alternate titles, principals).
+BATCH_BYTES = 4 * 2 ** 20
+# Time to write and commit a batch: long enough to amortize its lookups and commit, short enough to keep the
+# progress, checkpoints and memory of a load fine grained.
+FLUSH_SECONDS = 0.5
+
+
+class BatchSizer:
+    """
+    Rows per batch of one dataset.
+
+    Batches start at ``BATCH_SIZE`` rows and end early at ``max_bytes`` of raw lines. Every flushed batch resizes
+    the next ones towards ``flush_seconds`` per batch, by at most a factor of two per batch, between
+    ``MIN_BATCH_SIZE`` and ``MAX_BATCH_SIZE`` rows: narrow tables that write fast grow large batches, slow ones
+    shrink them. ``shrink`` halves the batches for the rest of the load.
+    """
+
+    def __init__(self, rows=BATCH_SIZE, max_bytes=BATCH_BYTES, flush_seconds=FLUSH_SECONDS):
+        self.rows = rows
+        self.max_rows = MAX_BATCH_SIZE
+        self.max_bytes = max_bytes
+        self.flush_seconds = flush_seconds
+
+    def full(self, rows, size):
+        return rows >= self.rows or size >= self.max_bytes
+
+    def flushed(self, rows, seconds):
+        """
+        Resizes the batches from a batch of ``rows`` rows written and committed in ``seconds``.
+        """
+        if not rows or seconds <= 0:
+            return
+        wanted = rows * self.flush_seconds / seconds
+        self.rows = int(min(self.max_rows, self.rows * 2, max(MIN_BATCH_SIZE, self.rows / 2, wanted)))
+
+    def shrink(self):
+        self.rows = self.max_rows = max(MIN_BATCH_SIZE, self.rows // 2)
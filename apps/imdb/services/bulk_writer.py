@@ -0,0 +1,108 @@
+import functools
+import io
+
+from django.db import connection
+
+from .ingest_profile import IngestProfile
+
+__all__ = ('BulkWriter', )
+
+# Bind parameters of a statement where the backend reports no limit of its own (PostgreSQL's protocol). Django
+# holds SQLite to 999.
+MAX_QUERY_PARAMS = 65535
+# Characters of values per INSERT statement.
+STATEMENT_BYTES = 2 ** 20
+# Rows sampled to estimate the width of a table's rows.
+SAMPLED_ROWS = 100
+
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+
+class BulkWriter:
+    """
+    Writes rows given as tuples of values ordered like ``fields``.
+
+    On PostgreSQL the rows are streamed through ``COPY ... FROM STDIN``, any other backend falls back to
+    ``bulk_create`` with model instances built from the tuples, in statements sized by ``batch_size``. Writes are
+    profiled as the ``m2m`` stage for many-to-many through models and as ``insert`` otherwise.
+    """
+
+    @classmethod
+    def can_copy(cls):
+        return connection.vendor == 'postgresql'
+
+    @staticmethod
+    def batch_size(fields, rows):
+        """
+        Returns the rows per INSERT statement of ``rows``: as many as the backend's bind parameter limit allows, and
+        fewer when their values, estimated from a sample, would exceed ``STATEMENT_BYTES``.
+        """
+        max_params = connection.features.max_query_params or MAX_QUERY_PARAMS
+        sample = rows[:SAMPLED_ROWS]
+        row_bytes = sum(len(str(value)) for row in sample for value in row) // len(sample) if sample else 1
+        return max(1, min(max_params // len(fields), STATEMENT_BYTES // max(1, row_bytes)))
+
+    @staticmethod
+    def stage(model):
+        return 'm2m' if model._meta.auto_created else 'insert'
+
+    @classmethod
+    def write(cls, model, fields, rows):
+        if not rows:
+            return
+        with IngestProfile.stage(cls.stage(model)):
+            if cls.can_copy():
+                cls.copy(model, fields, rows)
+            else:
+                model.objects.bulk_create(
+                    [model(**dict(zip(fields, row))) for row in rows], batch_size=cls.batch_size(fields, rows),
+                )
+
+    @classmethod
+    def upsert(cls, model, fields, rows, unique_fields):
+        if not rows:
+            return
+        update_fields = [field for field in fields if field not in unique_fields]
+        with IngestProfile.stage(cls.stage(model)):
+            model.objects.bulk_create(
+                [model(**dict(zip(fields, row))) for row in rows],
+                batch_size=cls.batch_size(fields, rows),
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=update_fields,
+            )
+
+    @classmethod
+    def copy(cls, model, fields, rows):
+        buffer = io.StringIO()
+        buffer.writelines('\t'.join(map(cls.encode, row)) + '\n' for row in rows)
+        buffer.seek(0)
+        quote_name = connection.ops.quote_name
+        columns = ', '.join(quote_name(model._meta.get_field(field).column) for field in fields)
+        sql = f'COPY {quote_name(model._meta.db_table)} ({columns}) FROM STDIN'
+        with connection.cursor() as cursor:
+            def execute(sql, params, many, context):
+                # Django wraps the DB-API cursor, copy_expert lives on the psycopg2 one.
+                cursor.cursor.copy_expert(sql, buffer)
+
+            # Through the connection's execute wrappers, which only see statements run by Django's cursor otherwise.
+            for wrapper in reversed(connection.execute_wrappers):
+                execute = functools.partial(wrapper, execute)
+            execute(sql, None, False, {'connection': connection, 'cursor': cursor})
+
+    @staticmethod
+    def encode(value):
+        if value is None:
+            return '\\N'
+        if value is True:
+            return 't'
+        if value is False:
+            return 'f'
+        if isinstance(value, str):
+            return value.translate(COPY_ESCAPES)
+        return str(value)
@@ -0,0 +1,51 @@
+import os
+
+from apps.imdb.models import LoadCheckpoint
+
+__all__ = ('Checkpoints', )
+
+
+class Checkpoints:
+    """
+    Records which rows of a dataset file are committed, so an interrupted load can resume after them.
+
+    Every batch commits a ``LoadCheckpoint`` range in the same transaction as its rows. Batches written by the
+    pipeline commit out of order, so resuming skips every committed range rather than a single offset. gzip streams
+    can not be seeked, the skipped rows are still decompressed but neither decoded nor written.
+    """
+
+    @classmethod
+    def fingerprint(cls, file_path):
+        stat = os.stat(file_path)
+        return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+    @classmethod
+    def committed(cls, dataset, file_path, resume=False):
+        """
+        Returns the fingerprint of the file and the merged ``(start_row, rows)`` ranges to skip, or ``None`` instead
+        of the ranges when the dataset is already fully loaded. Without ``resume`` the checkpoints are reset.
+        """
+        fingerprint = cls.fingerprint(file_path)
+        checkpoints = LoadCheckpoint.objects.filter(dataset=dataset)
+        if not resume:
+            checkpoints.delete()
+            return fingerprint, []
+        if checkpoints.exclude(fingerprint=fingerprint).exists():
+            raise ValueError(f'{file_path} changed since the interrupted load, it can not be resumed.')
+        if checkpoints.filter(completed=True).exists():
+            return fingerprint, None
+        ranges = []
+        for start_row, rows in checkpoints.order_by('start_row').values_list('start_row', 'rows'):
+            if ranges and ranges[-1][0] + ranges[-1][1] == start_row:
+                ranges[-1] = (ranges[-1][0], ranges[-1][1] + rows)
+            else:
+                ranges.append((start_row, rows))
+        return fingerprint, ranges
+
+    @classmethod
+    def commit(cls, dataset, fingerprint, start_row, rows):
+        LoadCheckpoint.objects.create(dataset=dataset, fingerprint=fingerprint, start_row=start_row, rows=rows)
+
+    @classmethod
+    def complete(cls, dataset, fingerprint):
+        LoadCheckpoint.objects.create(dataset=dataset, fingerprint=fingerprint, start_row=0, rows=0, completed=True)
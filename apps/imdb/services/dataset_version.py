@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from apps.imdb.models import DatasetVersion
+
+__all__ = ('DatasetVersions', )
+
+
+class DatasetVersions:
+    """
+    The stamp of the loaded data, read by the response cache and bumped by the loaders when a load finishes.
+
+    The version lives in the database and is cached for ``IMDB_RESPONSE_CACHE['VERSION_TIMEOUT']`` seconds. A load
+    also writes the new version to the cache, which every process sees at once when the cache is shared (file,
+    Redis); with a per-process local-memory cache the other processes pick it up once their copy expires.
+    """
+    CACHE_KEY = 'imdb:dataset-version'
+
+    @classmethod
+    def current(cls):
+        version = cache.get(cls.CACHE_KEY)
+        if version is None:
+            version = DatasetVersion.objects.values_list('version', flat=True).first() or 0
+            cache.set(cls.CACHE_KEY, version, settings.IMDB_RESPONSE_CACHE['VERSION_TIMEOUT'])
+        return version
+
+    @classmethod
+    def bump(cls):
+        DatasetVersion.objects.get_or_create(pk=1)
+        DatasetVersion.objects.filter(pk=1).update(version=F('version') + 1, loaded_at=timezone.now())
+        version = DatasetVersion.objects.get(pk=1).version
+        cache.set(cls.CACHE_KEY, version, settings.IMDB_RESPONSE_CACHE['VERSION_TIMEOUT'])
+        return version
@@ -0,0 +1,236 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.db import DatabaseError, IntegrityError, connection, transaction
+
+from apps.imdb.models import DeferredIndex
+
+__all__ = ('DeferredIndexes', )
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_WORK_MEM = '1GB'
+SUPPORTED_VENDORS = ('postgresql', 'sqlite')
+
+
+class DeferredIndexes:
+    """
+    Drops secondary indexes and foreign key checks of the IMDb tables for the duration of a bulk load and rebuilds
+    them afterwards.
+
+    Primary keys and unique constraints are kept, the loaders and upserts rely on them. On PostgreSQL the indexes are
+    rebuilt in parallel over separate connections, foreign keys are re-added as ``NOT VALID`` and then validated, which
+    checks every row in one pass instead of per inserted row. On SQLite foreign key enforcement is switched off and
+    ``check_constraints`` validates the tables at the end.
+
+    Every dropped index and foreign key is recorded as a ``DeferredIndex`` in the transaction dropping it, and
+    forgotten once rebuilt. Those of a load that was killed, or whose rebuild failed, stay recorded until ``restore``
+    rebuilds them.
+    """
+
+    @classmethod
+    def supported(cls):
+        return connection.vendor in SUPPORTED_VENDORS
+
+    @classmethod
+    def pending(cls):
+        return DeferredIndex.objects.exists()
+
+    @classmethod
+    @contextmanager
+    def deferred(cls, workers=1, maintenance_work_mem=MAINTENANCE_WORK_MEM):
+        """
+        Runs the block without the secondary indexes and foreign keys, also keeping those still recorded by an
+        interrupted load dropped, and rebuilds all of them after. A rebuild failing after a failed block is logged,
+        the block's exception is raised.
+        """
+        cls.drop(cls.tables())
+        try:
+            yield
+        except BaseException:
+            try:
+                cls.restore(workers, maintenance_work_mem)
+            except Exception:
+                logger.exception('Rebuilding the deferred indexes failed, the next load_imdb run rebuilds them.')
+            raise
+        cls.restore(workers, maintenance_work_mem)
+
+    @classmethod
+    def tables(cls):
+        return [
+            model._meta.db_table
+            for model in apps.get_app_config('imdb').get_models(include_auto_created=True)
+            if model is not DeferredIndex
+        ]
+
+    @classmethod
+    def drop(cls, tables):
+        if not cls.supported():
+            raise ValueError(f'Deferred indexes are not supported on {connection.vendor}.')
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                cls.drop_postgresql(tables)
+            else:
+                cls.drop_sqlite(tables)
+        if connection.vendor == 'sqlite' and not connection.disable_constraint_checking():
+            raise DatabaseError('Foreign key checks can not be disabled inside a transaction.')
+
+    @classmethod
+    def record(cls, definitions, foreign_key=False):
+        """
+        Records the dropped ``(table, name, definition)`` not recorded yet, a rebuild may have been interrupted after
+        recreating an index but before forgetting it.
+        """
+        recorded = set(DeferredIndex.objects.values_list('name', flat=True))
+        DeferredIndex.objects.bulk_create([
+            DeferredIndex(table=table, name=name, foreign_key=foreign_key, definition=definition)
+            for table, name, definition in definitions if name not in recorded
+        ])
+
+    @classmethod
+    def restore(cls, workers=1, maintenance_work_mem=MAINTENANCE_WORK_MEM):
+        """
+        Rebuilds the recorded indexes and foreign keys, forgetting each one once rebuilt. Those failing stay recorded.
+        """
+        if connection.vendor == 'postgresql':
+            cls.restore_postgresql(workers, maintenance_work_mem)
+        else:
+            cls.restore_sqlite()
+
+    @classmethod
+    def drop_postgresql(cls, tables):
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT t.relname, i.relname, pg_get_indexdef(x.indexrelid)
+                FROM pg_index x
+                JOIN pg_class t ON t.oid = x.indrelid
+                JOIN pg_class i ON i.oid = x.indexrelid
+                WHERE t.relname = ANY(%s) AND NOT EXISTS (
+                    SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid AND c.contype IN ('p', 'u', 'x')
+                )
+                """,
+                [tables],
+            )
+            indexes = cursor.fetchall()
+            cursor.execute(
+                """
+                SELECT t.relname, c.conname, pg_get_constraintdef(c.oid)
+                FROM pg_constraint c
+                JOIN pg_class t ON t.oid = c.conrelid
+                WHERE c.contype = 'f' AND t.relname = ANY(%s)
+                """,
+                [tables],
+            )
+            foreign_keys = cursor.fetchall()
+            cls.record(indexes)
+            cls.record(foreign_keys, foreign_key=True)
+            for table, name, _ in foreign_keys:
+                cursor.execute(f'ALTER TABLE {quote_name(table)} DROP CONSTRAINT {quote_name(name)}')
+            for _, name, _ in indexes:
+                cursor.execute(f'DROP INDEX {quote_name(name)}')
+
+    @classmethod
+    def restore_postgresql(cls, workers, maintenance_work_mem):
+        quote_name = connection.ops.quote_name
+        indexes = list(DeferredIndex.objects.filter(foreign_key=False))
+        foreign_keys = list(DeferredIndex.objects.filter(foreign_key=True))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relname FROM pg_class WHERE relkind = 'i' AND relname = ANY(%s)",
+                [[index.name for index in indexes]],
+            )
+            built = {name for name, in cursor.fetchall()}
+            cursor.execute(
+                "SELECT conname, convalidated FROM pg_constraint WHERE contype = 'f' AND conname = ANY(%s)",
+                [[foreign_key.name for foreign_key in foreign_keys]],
+            )
+            validated = dict(cursor.fetchall())
+            for foreign_key in foreign_keys:
+                if foreign_key.name not in validated:
+                    cursor.execute(
+                        f'ALTER TABLE {quote_name(foreign_key.table)} ADD CONSTRAINT {quote_name(foreign_key.name)} '
+                        f'{foreign_key.definition} NOT VALID'
+                    )
+        errors = cls.execute_parallel(
+            {index: index.definition for index in indexes if index.name not in built}, workers, maintenance_work_mem,
+        )
+        errors.update(cls.execute_parallel(
+            {
+                foreign_key: f'ALTER TABLE {quote_name(foreign_key.table)} '
+                             f'VALIDATE CONSTRAINT {quote_name(foreign_key.name)}'
+                for foreign_key in foreign_keys if not validated.get(foreign_key.name)
+            },
+            workers,
+            maintenance_work_mem,
+        ))
+        cls.forget([*indexes, *foreign_keys], errors)
+
+    @classmethod
+    def execute_parallel(cls, statements, workers, maintenance_work_mem):
+        """
+        Runs the statements of ``{record: sql}``, returns ``{record: error}`` of those that failed.
+        """
+        errors = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(cls.execute, sql, maintenance_work_mem): record for record, sql in statements.items()
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except DatabaseError as e:
+                    errors[futures[future]] = f'{statements[futures[future]]}: {e}'
+        return errors
+
+    @staticmethod
+    def execute(sql, maintenance_work_mem):
+        # Runs in a pool thread, which gets its own connection.
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SET maintenance_work_mem = %s', [maintenance_work_mem])
+                cursor.execute(sql)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def forget(records, errors):
+        DeferredIndex.objects.filter(pk__in=[record.pk for record in records if record not in errors]).delete()
+        if errors:
+            raise IntegrityError('Rebuilding indexes and constraints failed:\n' + '\n'.join(errors.values()))
+
+    @classmethod
+    def drop_sqlite(cls, tables):
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            placeholders = ', '.join(['%s'] * len(tables))
+            cursor.execute(
+                f"SELECT tbl_name, name, sql FROM sqlite_master "
+                f"WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders})",
+                tables,
+            )
+            indexes = cursor.fetchall()
+            cls.record(indexes)
+            for _, name, _ in indexes:
+                cursor.execute(f'DROP INDEX {quote_name(name)}')
+
+    @classmethod
+    def restore_sqlite(cls):
+        indexes = list(DeferredIndex.objects.all())
+        errors = {}
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+            built = {name for name, in cursor.fetchall()}
+            for index in indexes:
+                if index.name in built:
+                    continue
+                try:
+                    cursor.execute(index.definition)
+                except DatabaseError as e:
+                    errors[index] = f'{index.definition}: {e}'
+        connection.enable_constraint_checking()
+        cls.forget(indexes, errors)
+        connection.check_constraints(table_names=cls.tables())
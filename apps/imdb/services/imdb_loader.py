@@ -1,5 +1,9 @@
-import csv
+import gc
 import gzip
+import os
+import time
+
+from django.db import reset_queries, transaction
 from tqdm import tqdm
 
 from apps.imdb.models import (
@@ -15,239 +19,407 @@ from apps.imdb.models import (
     Rating,
 )
 
+from .batch_sizer import MIN_BATCH_SIZE, BatchSizer
+from .bulk_writer import BulkWriter
+from .checkpoints import Checkpoints
+from .dataset_version import DatasetVersions
+from .ingest_profile import IngestProfile
+from .memory import current_rss
+from .rankings import Rankings
+from .row_delta import RowDelta
+from .tsv_decoder import Column, ImdbId, ImdbIds, RowHash, TsvSchema
+
 __all__ = ('IMDbLoader', )
 
-BATCH_SIZE = 1000
+MOVIE_FIELDS = (
+    'id', 'movie_type_id', 'title', 'original_title', 'is_adult', 'year', 'end_year', 'runtime_minutes', 'row_hash',
+)
+PERSON_FIELDS = ('id', 'name', 'birth_year', 'death_year', 'row_hash')
+RATING_FIELDS = ('movie_id', 'average_rating', 'num_votes', 'row_hash')
+CREW_FIELDS = ('movie_id', 'row_hash')
+AKAS_FIELDS = (
+    'movie_id', 'ordering', 'title', 'region', 'language', 'types', 'attributes', 'is_original_title',
+)
+EPISODE_FIELDS = ('movie_id', 'parent_id', 'season_number', 'episode_number', 'row_hash')
+PRINCIPAL_FIELDS = ('movie_id', 'ordering', 'person_id', 'category', 'job', 'characters')
+
+# Dataset name -> (file name, datasets whose rows it references).
+DATASETS = {
+    'movies': ('title.basics.tsv.gz', ()),
+    'persons': ('name.basics.tsv.gz', ('movies', )),
+    'ratings': ('title.ratings.tsv.gz', ('movies', )),
+    'crew': ('title.crew.tsv.gz', ('movies', 'persons')),
+    'akas': ('title.akas.tsv.gz', ('movies', )),
+    'episodes': ('title.episode.tsv.gz', ('movies', )),
+    'principals': ('title.principals.tsv.gz', ('movies', 'persons')),
+}
+LOADED_DATASETS = ('movies', 'persons', 'ratings', 'crew', 'akas', 'episodes', 'principals')
+# Dataset name -> (model, key field) for delta reloads, the key is the first decoded column and the hash the last.
+DELTA_KEYS = {
+    'movies': (Movie, 'id'),
+    'persons': (Person, 'id'),
+    'ratings': (Rating, 'movie_id'),
+    'crew': (Crew, 'movie_id'),
+    'episodes': (Episode, 'movie_id'),
+}
+# Dataset name -> (model, many-to-many field) of the rows linking to a dataset's rows. A row's hash is stored only
+# when all its links resolved, those whose links cascade away with a deleted row lose it, so that a delta reload
+# writes them again once the row they link to comes back.
+LINKED_HASHES = {
+    'movies': ((Person, 'movies'), ),
+    'persons': ((Crew, 'directors'), (Crew, 'writers')),
+}
+# Datasets without a key of their own to diff on, a delta reload replaces all their rows.
+REPLACED_MODELS = {
+    'akas': Akas,
+    'principals': Principal,
+}
+# Dataset name -> decoded columns, in the order the write_* methods unpack them.
+SCHEMAS = {
+    'movies': TsvSchema(
+        Column('tconst', ImdbId),
+        Column('titleType'),
+        Column('primaryTitle', max_length=512),
+        Column('originalTitle', max_length=512),
+        Column('isAdult', bool),
+        Column('startYear', int, null=None),
+        Column('endYear', int, null=None),
+        Column('runtimeMinutes', int, null=None),
+        Column('genres', list, null=()),
+        RowHash(),
+    ),
+    'persons': TsvSchema(
+        Column('nconst', ImdbId),
+        Column('primaryName', max_length=255),
+        Column('birthYear', int, null=None),
+        Column('deathYear', int, null=None),
+        Column('primaryProfession', list, null=()),
+        Column('knownForTitles', ImdbIds, null=()),
+        RowHash(),
+    ),
+    'ratings': TsvSchema(
+        Column('tconst', ImdbId),
+        Column('averageRating', float),
+        Column('numVotes', int),
+        RowHash(),
+    ),
+    'crew': TsvSchema(
+        Column('tconst', ImdbId),
+        Column('directors', ImdbIds, null=()),
+        Column('writers', ImdbIds, null=()),
+        RowHash(),
+    ),
+    'akas': TsvSchema(
+        Column('titleId', ImdbId),
+        Column('ordering', int),
+        Column('title', max_length=512),
+        Column('region', null='', max_length=4),
+        Column('language', null='', max_length=4),
+        Column('types', null='', max_length=50),
+        Column('attributes', null='', max_length=255),
+        Column('isOriginalTitle', bool),
+    ),
+    'episodes': TsvSchema(
+        Column('tconst', ImdbId),
+        Column('parentTconst', ImdbId),
+        Column('seasonNumber', int, null=None),
+        Column('episodeNumber', int, null=None),
+        RowHash(),
+    ),
+    'principals': TsvSchema(
+        Column('tconst', ImdbId),
+        Column('ordering', int),
+        Column('nconst', ImdbId),
+        Column('category', max_length=50),
+        Column('job', null='', max_length=255),
+        Column('characters', null='', max_length=255),
+    ),
+}
 
 
 class IMDbLoader:
     @classmethod
-    def load(cls, path):
-        cls.load_movies(f'{path}/title.basics.tsv.gz')
-        cls.load_persons(f'{path}/name.basics.tsv.gz')
-        cls.load_ratings(f'{path}/title.ratings.tsv.gz')
-        cls.load_crew(f'{path}/title.crew.tsv.gz')
-        # cls.load_akas(f'{path}/title.akas.tsv.gz')
-        # cls.load_episodes(f'{path}/title.episode.tsv.gz')
-        # cls.load_principals(f'{path}/title.principals.tsv.gz')
+    def load(cls, path, delta=False, memory_limit=None, resume=False):
+        cls.check_headers(path)
+        for dataset in LOADED_DATASETS:
+            file_name, _ = DATASETS[dataset]
+            getattr(cls, f'load_{dataset}')(
+                f'{path}/{file_name}', delta=delta, memory_limit=memory_limit, resume=resume,
+            )
+        Rankings.refresh()
+        DatasetVersions.bump()
 
     @classmethod
-    def get_total_lines(cls, file_path):
-        with gzip.open(file_path, 'rt', encoding='utf-8') as file:
-            total_lines = sum(1 for _ in file) - 1
-        return total_lines
+    def load_dataset(cls, dataset, file_path, desc, delta=False, memory_limit=None, resume=False):
+        """
+        Loads one dataset into empty tables, or with ``delta`` applies only the rows that differ from the stored ones
+        and deletes the stored rows the dataset no longer contains.
+
+        Only one batch and the rows derived from it are held at a time, its size adapts to the time the previous ones
+        took to write (``BatchSizer``). ``memory_limit`` (bytes) shrinks the batches while the process is above it.
+        Each batch commits with its checkpoint, ``resume`` skips the committed rows of an interrupted load of the
+        same file.
+        """
+        write = getattr(cls, f'write_{dataset}')
+        cls.check_header(dataset, file_path)
+        if delta and resume:
+            raise ValueError('A delta reload can not be resumed, it has to see every row to find deleted ones.')
+        if delta and dataset in REPLACED_MODELS:
+            # One transaction, readers keep seeing the previous rows until all new ones are committed and a failed
+            # reload leaves them in place.
+            with transaction.atomic():
+                REPLACED_MODELS[dataset].objects.all().delete()
+                cls.load_dataset(dataset, file_path, desc, memory_limit=memory_limit)
+            return
+        if delta and dataset not in DELTA_KEYS:
+            raise ValueError(f'{dataset} can not be reloaded incrementally.')
+        fingerprint, committed = Checkpoints.committed(dataset, file_path, resume)
+        if committed is None:
+            return
+        row_delta = RowDelta(*DELTA_KEYS[dataset], LINKED_HASHES.get(dataset, ())) if delta else None
+        sizer = BatchSizer()
+        with IngestProfile.loading(dataset):
+            for start_row, rows in cls.read_batches(dataset, file_path, desc, memory_limit, committed, sizer):
+                start = time.perf_counter()
+                with IngestProfile.stage('commit'), transaction.atomic():
+                    with IngestProfile.stage('build'):
+                        if row_delta:
+                            write(row_delta.changed(rows), upsert=True)
+                        else:
+                            write(rows)
+                    Checkpoints.commit(dataset, fingerprint, start_row, len(rows))
+                sizer.flushed(len(rows), time.perf_counter() - start)
+                IngestProfile.batch_done(dataset, start_row, len(rows))
+                # With DEBUG on every executed statement is kept, bulk inserts included.
+                reset_queries()
+            if row_delta:
+                row_delta.delete_missing()
+            Checkpoints.complete(dataset, fingerprint)
 
     @classmethod
-    def load_persons(cls, file_path):
-        total_rows = cls.get_total_lines(file_path)
-        with gzip.open(file_path, 'rt', encoding='utf-8') as file:
-            reader = csv.DictReader(file, delimiter='\t', quoting=csv.QUOTE_NONE)
-            persons = []
-            movies = {}
-            professions = {}
-            for row in tqdm(reader, total=total_rows, desc="Loading Persons", unit="rows"):
-                persons.append(Person(
-                    id=row['nconst'],
-                    name=row['primaryName'],
-                    birth_year=int(row['birthYear']) if row['birthYear'] != '\\N' else None,
-                    death_year=int(row['deathYear']) if row['deathYear'] != '\\N' else None,
-                ))
-                movies[row['nconst']] = row['knownForTitles'].split(',')
-                professions[row['nconst']] = row['primaryProfession'].split(',')
-                if len(persons) >= BATCH_SIZE:
-                    persones_objects = Person.objects.bulk_create(persons, batch_size=BATCH_SIZE)
-                    movie_objects = []
-                    proffesion_objects = []
-                    for p in persones_objects:
-                        movie_objects += [
-                            Person.movies.through(person_id=p.id, movie_id=item)
-                            for item in movies[p.id] if item != '\\N'
-                        ]
-                        proffesion_objects += [
-                            Person.professions.through(person_id=p.id, profession_id=Profession.mapped_choices.get(item))
-                            for item in professions[p.id] if Profession.mapped_choices.get(item)
-                        ]
-                    Person.movies.through.objects.bulk_create(movie_objects, batch_size=BATCH_SIZE)
-                    Person.professions.through.objects.bulk_create(proffesion_objects, batch_size=BATCH_SIZE)
-                    persons = []
-            if persons:
-                persones_objects = Person.objects.bulk_create(persons, batch_size=BATCH_SIZE)
-                movie_objects = []
-                proffesion_objects = []
-                for p in persones_objects:
-                    movie_objects += [
-                        Person.movies.through(person_id=p.id, movie_id=item)
-                        for item in movies[p.id] if item != '\\N'
-                    ]
-                    proffesion_objects += [
-                        Person.professions.through(person_id=p.id, profession_id=Profession.mapped_choices.get(item))
-                        for item in professions[p.id] if Profession.mapped_choices.get(item)
-                    ]
-                Person.movies.through.objects.bulk_create(movie_objects, batch_size=BATCH_SIZE)
-                Person.professions.through.objects.bulk_create(proffesion_objects, batch_size=BATCH_SIZE)
-
-    @classmethod
-    def load_movies(cls, file_path):
-        total_rows = cls.get_total_lines(file_path)
-        with gzip.open(file_path, 'rt', encoding='utf-8') as file:
-            reader = csv.DictReader(file, delimiter='\t', quoting=csv.QUOTE_NONE)
-            genres = {}
-            movies = []
-            for row in tqdm(reader, total=total_rows, desc="Loading Movies", unit="rows"):
-                movies.append(Movie(
-                    id=row['tconst'],
-                    movie_type_id=MovieType.mapped_choices.get(row['titleType'], MovieType.no_type),
-                    title=row['primaryTitle'],
-                    original_title=row['originalTitle'],
-                    is_adult=row['isAdult'] == '1',
-                    year=int(row['startYear']) if row['startYear'] != '\\N' else None,
-                    end_year=int(row['endYear']) if row['endYear'] != '\\N' else None,
-                    runtime_minutes=int(row['runtimeMinutes']) if row['runtimeMinutes'] != '\\N' else None
-                ))
-                genres[row['tconst']] = row['genres'].split(',')
-                if len(movies) >= BATCH_SIZE:
-                    movies_objects = Movie.objects.bulk_create(movies, batch_size=BATCH_SIZE)
-                    genres_objects = []
-                    for m in movies_objects:
-                        genres_objects += [
-                            Movie.genres.through(movie_id=m.id, genre_id=Genre.mapped_choices.get(item))
-                            for item in genres[m.id] if Genre.mapped_choices.get(item)
-                        ]
-                    Movie.genres.through.objects.bulk_create(genres_objects)
-                    movies = []
-            if movies:
-                movies_objects = Movie.objects.bulk_create(movies, batch_size=BATCH_SIZE)
-                genres_objects = []
-                for m in movies_objects:
-                    genres_objects += [
-                        Movie.genres.through(movie_id=m.id, genre_id=Genre.mapped_choices.get(item))
-                        for item in genres[m.id] if Genre.mapped_choices.get(item)
-                    ]
-                Movie.genres.through.objects.bulk_create(genres_objects)
-
-    @classmethod
-    def load_akas(cls, file_path):
-        total_rows = cls.get_total_lines(file_path)
-        with gzip.open(file_path, 'rt', encoding='utf-8') as file:
-            reader = csv.DictReader(file, delimiter='\t', quoting=csv.QUOTE_NONE)
-            akas = []
-            for row in tqdm(reader, total=total_rows, desc="Loading Akas", unit="rows"):
-                akas.append(Akas(
-                    movie_id=row['titleId'],
-                    ordering=int(row['ordering']),
-                    title=row['title'][:512],
-                    region=row['region'],
-                    language=row['language'],
-                    types=row['types'],
-                    attributes=row['attributes'],
-                    is_original_title=row['isOriginalTitle'] == '1'
-                ))
-                if len(akas) >= BATCH_SIZE:
-                    Akas.objects.bulk_create(akas, batch_size=BATCH_SIZE)
-                    akas = []
-            if akas:
-                Akas.objects.bulk_create(akas, batch_size=BATCH_SIZE)
-
-    @classmethod
-    def load_crew(cls, file_path):
-        total_rows = cls.get_total_lines(file_path)
-        with gzip.open(file_path, 'rt', encoding='utf-8') as file:
-            reader = csv.DictReader(file, delimiter='\t', quoting=csv.QUOTE_NONE)
-            crews = []
-            directors = {}
-            writers = {}
-            for row in tqdm(reader, total=total_rows, desc="Loading Crews", unit="rows"):
-                movie_id = row['tconst']
-                crews.append(Crew(
-                    movie_id=row['tconst'],
-                ))
-                directors[movie_id] = row['directors'].split(',')
-                writers[movie_id] = row['writers'].split(',')
-                if len(crews) >= BATCH_SIZE:
-                    crew_objects = Crew.objects.bulk_create(crews, batch_size=BATCH_SIZE)
-                    director_objects = []
-                    writer_objects = []
-                    for c in crew_objects:
-                        director_objects += [
-                            Crew.directors.through(crew_id=c.id, person_id=item)
-                            for item in directors[c.movie_id]  if item != '\\N'
-                        ]
-                        writer_objects += [
-                            Crew.writers.through(crew_id=c.id, person_id=item)
-                            for item in writers[c.movie_id] if item != '\\N'
-                        ]
-                    Crew.directors.through.objects.bulk_create(director_objects)
-                    Crew.writers.through.objects.bulk_create(writer_objects)
-                    crews = []
-            if crews:
-                crew_objects = Crew.objects.bulk_create(crews, batch_size=BATCH_SIZE)
-                director_objects = []
-                writer_objects = []
-                for c in crew_objects:
-                    director_objects += [
-                        Crew.directors.through(crew_id=c.id, person_id=item)
-                        for item in directors[c.movie_id] if item != '\\N'
-                    ]
-                    writer_objects += [
-                        Crew.writers.through(crew_id=c.id, person_id=item)
-                        for item in writers[c.movie_id] if item != '\\N'
-                    ]
-                Crew.directors.through.objects.bulk_create(director_objects)
-                Crew.writers.through.objects.bulk_create(writer_objects)
-
-    @classmethod
-    def load_episodes(cls, file_path):
-        total_rows = cls.get_total_lines(file_path)
-        with gzip.open(file_path, 'rt', encoding='utf-8') as file:
-            reader = csv.DictReader(file, delimiter='\t', quoting=csv.QUOTE_NONE)
-            episodes = []
-            for row in tqdm(reader, total=total_rows, desc="Loading Episodes", unit="rows"):
-                episodes.append(Episode(
-                    movie_id=int(row['tconst'][2:]),
-                    parent_id=int(row['parentTconst'][2:]),
-                    season_number=int(row['seasonNumber']) if row['seasonNumber'] != '\\N' else None,
-                    episode_number=int(row['episodeNumber']) if row['episodeNumber'] != '\\N' else None
-                ))
-
-                if len(episodes) >= BATCH_SIZE:
-                    Episode.objects.bulk_create(episodes, batch_size=BATCH_SIZE)
-                    episodes = []
-            if episodes:
-                Episode.objects.bulk_create(episodes, batch_size=BATCH_SIZE)
-
-    @classmethod
-    def load_principals(cls, file_path):
-        with gzip.open(file_path, 'rt', encoding='utf-8') as file:
-            reader = csv.DictReader(file, delimiter='\t', quoting=csv.QUOTE_NONE)
-            principals = []
-            for row in reader:
-                principals.append(Principal(
-                    movie_id=int(row['tconst'][2:]),
-                    person_id=int(row['nconst'][2:]),
-                    category=row['category'],
-                    job=row['job'] if row['job'] != '\\N' else '',
-                    characters=row['characters'] if row['characters'] != '\\N' else ''
-                ))
-                if len(principals) >= BATCH_SIZE:
-                    Principal.objects.bulk_create(principals, batch_size=BATCH_SIZE)
-                    principals = []
-            if principals:
-                Principal.objects.bulk_create(principals, batch_size=BATCH_SIZE)
-
-    @classmethod
-    def load_ratings(cls, file_path):
-        total_rows = cls.get_total_lines(file_path)
+    def check_headers(cls, path):
+        """
+        Checks the headers of all dataset files in ``path`` before any of them is loaded.
+        """
+        for dataset in LOADED_DATASETS:
+            file_name, _ = DATASETS[dataset]
+            cls.check_header(dataset, f'{path}/{file_name}')
+
+    @classmethod
+    def check_header(cls, dataset, file_path):
         with gzip.open(file_path, 'rt', encoding='utf-8') as file:
-            reader = csv.DictReader(file, delimiter='\t', quoting=csv.QUOTE_NONE)
-            ratings = []
-            for row in tqdm(reader, total=total_rows, desc="Loading Ratings", unit="rows"):
-                ratings.append(Rating(
-                    movie_id=row['tconst'],
-                    average_rating=float(row['averageRating']),
-                    num_votes=int(row['numVotes'])
-                ))
-                if len(ratings) >= BATCH_SIZE:
-                    Rating.objects.bulk_create(ratings, batch_size=BATCH_SIZE)
-                    ratings = []
-            if ratings:
-                Rating.objects.bulk_create(ratings, batch_size=BATCH_SIZE)
+            header = file.readline().rstrip('\n').split('\t')
+        missing = SCHEMAS[dataset].missing(header)
+        if missing:
+            raise ValueError(
+                f'{file_path} can not be loaded as the {dataset} dataset, its header lacks the columns '
+                f'{", ".join(missing)}.'
+            )
+
+    @classmethod
+    def read_chunks(cls, file_path, desc, memory_limit=None, skip=(), sizer=None):
+        """
+        Yields ``(header, start_row, lines)`` with consecutive raw TSV lines, as many per chunk as ``sizer`` takes
+        when the chunk is read, leaving out the ``(start_row, rows)`` ranges in ``skip``.
+
+        Progress follows the compressed bytes consumed, so the file is decompressed only once. While the resident set
+        size is above ``memory_limit`` the chunk size is halved, down to ``MIN_BATCH_SIZE``.
+        """
+        sizer = sizer or BatchSizer()
+        with open(file_path, 'rb') as raw, gzip.open(raw, 'rt', encoding='utf-8') as file, \
+                tqdm(total=os.path.getsize(file_path), desc=desc, unit='B', unit_scale=True) as progress:
+            header = file.readline().rstrip('\n').split('\t')
+            skip = sorted(skip, reverse=True)
+            lines = []
+            start_row = row = size = skip_until = 0
+            for line in file:
+                if skip and row == skip[-1][0]:
+                    if lines:
+                        yield header, start_row, lines
+                        lines = []
+                        size = 0
+                    skip_start, skip_rows = skip.pop()
+                    skip_until = skip_start + skip_rows
+                row += 1
+                if row <= skip_until:
+                    continue
+                if not lines:
+                    start_row = row - 1
+                lines.append(line)
+                size += len(line)
+                if sizer.full(len(lines), size):
+                    yield header, start_row, lines
+                    lines = []
+                    size = 0
+                    progress.set_postfix(rows=row, refresh=False)
+                    progress.update(raw.tell() - progress.n)
+                    if memory_limit and sizer.rows > MIN_BATCH_SIZE and (current_rss() or 0) > memory_limit:
+                        gc.collect()
+                        sizer.shrink()
+            if lines:
+                yield header, start_row, lines
+            progress.set_postfix(rows=row, refresh=False)
+            progress.update(raw.tell() - progress.n)
+
+    @classmethod
+    def parse_rows(cls, dataset, header, lines):
+        return SCHEMAS[dataset].decode(header, lines)
+
+    @classmethod
+    def read_batches(cls, dataset, file_path, desc, memory_limit=None, skip=(), sizer=None):
+        chunks = cls.read_chunks(file_path, desc, memory_limit, skip, sizer)
+        while True:
+            with IngestProfile.stage('read'):
+                chunk = next(chunks, None)
+            if chunk is None:
+                return
+            header, start_row, lines = chunk
+            with IngestProfile.stage('parse'):
+                rows = cls.parse_rows(dataset, header, lines)
+            yield start_row, rows
+
+    @classmethod
+    def existing_ids(cls, model, ids):
+        """
+        Returns the subset of ``ids`` stored for ``model``, rows referencing any other id are left out of a batch.
+        """
+        with IngestProfile.stage('lookup'):
+            return set(model.objects.filter(pk__in=ids).values_list('pk', flat=True))
+
+    @classmethod
+    def load_persons(cls, file_path, delta=False, memory_limit=None, resume=False):
+        cls.load_dataset('persons', file_path, "Loading Persons", delta, memory_limit, resume)
+
+    @classmethod
+    def write_persons(cls, rows, upsert=False):
+        persons = []
+        movies = []
+        professions = []
+        known_ids = cls.existing_ids(Movie, {movie_id for row in rows for movie_id in row[5]})
+        for person_id, name, birth_year, death_year, profession_codes, movie_ids, row_hash in rows:
+            linked = [(person_id, movie_id) for movie_id in movie_ids if movie_id in known_ids]
+            # Without a hash the row is written again by the next delta reload, which may know the missing movies.
+            if len(linked) < len(movie_ids):
+                row_hash = None
+            persons.append((person_id, name, birth_year, death_year, row_hash))
+            movies += linked
+            professions += [
+                (person_id, Profession.mapped_choices.get(code))
+                for code in profession_codes if Profession.mapped_choices.get(code)
+            ]
+        if upsert:
+            person_ids = [person[0] for person in persons]
+            BulkWriter.upsert(Person, PERSON_FIELDS, persons, ('id', ))
+            with IngestProfile.stage('m2m'):
+                Person.movies.through.objects.filter(person_id__in=person_ids).delete()
+                Person.professions.through.objects.filter(person_id__in=person_ids).delete()
+        else:
+            BulkWriter.write(Person, PERSON_FIELDS, persons)
+        BulkWriter.write(Person.movies.through, ('person_id', 'movie_id'), movies)
+        BulkWriter.write(Person.professions.through, ('person_id', 'profession_id'), professions)
+
+    @classmethod
+    def load_movies(cls, file_path, delta=False, memory_limit=None, resume=False):
+        cls.load_dataset('movies', file_path, "Loading Movies", delta, memory_limit, resume)
+
+    @classmethod
+    def write_movies(cls, rows, upsert=False):
+        movies = []
+        genres = []
+        for movie_id, movie_type, *values, genre_codes, row_hash in rows:
+            movies.append((movie_id, MovieType.mapped_choices.get(movie_type, MovieType.no_type), *values, row_hash))
+            genres += [
+                (movie_id, Genre.mapped_choices.get(code))
+                for code in genre_codes if Genre.mapped_choices.get(code)
+            ]
+        if upsert:
+            BulkWriter.upsert(Movie, MOVIE_FIELDS, movies, ('id', ))
+            with IngestProfile.stage('m2m'):
+                Movie.genres.through.objects.filter(movie_id__in=[movie[0] for movie in movies]).delete()
+        else:
+            BulkWriter.write(Movie, MOVIE_FIELDS, movies)
+        BulkWriter.write(Movie.genres.through, ('movie_id', 'genre_id'), genres)
+
+    @classmethod
+    def load_akas(cls, file_path, delta=False, memory_limit=None, resume=False):
+        cls.load_dataset('akas', file_path, "Loading Akas", delta, memory_limit, resume)
+
+    @classmethod
+    def write_akas(cls, rows):
+        movie_ids = cls.existing_ids(Movie, {row[0] for row in rows})
+        BulkWriter.write(Akas, AKAS_FIELDS, [row for row in rows if row[0] in movie_ids])
+
+    @classmethod
+    def load_crew(cls, file_path, delta=False, memory_limit=None, resume=False):
+        cls.load_dataset('crew', file_path, "Loading Crews", delta, memory_limit, resume)
+
+    @classmethod
+    def write_crew(cls, rows, upsert=False):
+        movie_ids = cls.existing_ids(Movie, {row[0] for row in rows})
+        rows = [row for row in rows if row[0] in movie_ids]
+        known_ids = cls.existing_ids(Person, {person_id for row in rows for person_id in (*row[1], *row[2])})
+        # Crew ids are generated by the database, so crews go through bulk_create to get them back. A crew linking
+        # to a missing person gets no hash, the next delta reload writes it again.
+        crews = [
+            Crew(movie_id=movie_id, row_hash=row_hash if known_ids.issuperset((*director_ids, *writer_ids)) else None)
+            for movie_id, director_ids, writer_ids, row_hash in rows
+        ]
+        batch_size = BulkWriter.batch_size(CREW_FIELDS, [(crew.movie_id, crew.row_hash) for crew in crews])
+        if upsert:
+            with IngestProfile.stage('insert'):
+                crew_objects = Crew.objects.bulk_create(
+                    crews, batch_size=batch_size, update_conflicts=True, unique_fields=['movie'],
+                    update_fields=['row_hash'],
+                )
+            crew_ids = [crew.id for crew in crew_objects]
+            with IngestProfile.stage('m2m'):
+                Crew.directors.through.objects.filter(crew_id__in=crew_ids).delete()
+                Crew.writers.through.objects.filter(crew_id__in=crew_ids).delete()
+        else:
+            with IngestProfile.stage('insert'):
+                crew_objects = Crew.objects.bulk_create(crews, batch_size=batch_size)
+        directors = []
+        writers = []
+        for crew, (_, director_ids, writer_ids, _) in zip(crew_objects, rows):
+            directors += [(crew.id, person_id) for person_id in director_ids if person_id in known_ids]
+            writers += [(crew.id, person_id) for person_id in writer_ids if person_id in known_ids]
+        BulkWriter.write(Crew.directors.through, ('crew_id', 'person_id'), directors)
+        BulkWriter.write(Crew.writers.through, ('crew_id', 'person_id'), writers)
+
+    @classmethod
+    def load_episodes(cls, file_path, delta=False, memory_limit=None, resume=False):
+        cls.load_dataset('episodes', file_path, "Loading Episodes", delta, memory_limit, resume)
+
+    @classmethod
+    def write_episodes(cls, rows, upsert=False):
+        movie_ids = cls.existing_ids(Movie, {movie_id for row in rows for movie_id in row[:2]})
+        episodes = [row for row in rows if row[0] in movie_ids and row[1] in movie_ids]
+        if upsert:
+            BulkWriter.upsert(Episode, EPISODE_FIELDS, episodes, ('movie_id', ))
+        else:
+            BulkWriter.write(Episode, EPISODE_FIELDS, episodes)
+
+    @classmethod
+    def load_principals(cls, file_path, delta=False, memory_limit=None, resume=False):
+        cls.load_dataset('principals', file_path, "Loading Principals", delta, memory_limit, resume)
+
+    @classmethod
+    def write_principals(cls, rows):
+        movie_ids = cls.existing_ids(Movie, {row[0] for row in rows})
+        person_ids = cls.existing_ids(Person, {row[2] for row in rows})
+        BulkWriter.write(Principal, PRINCIPAL_FIELDS, [
+            row for row in rows if row[0] in movie_ids and row[2] in person_ids
+        ])
+
+    @classmethod
+    def load_ratings(cls, file_path, delta=False, memory_limit=None, resume=False):
+        cls.load_dataset('ratings', file_path, "Loading Ratings", delta, memory_limit, resume)
+
+    @classmethod
+    def write_ratings(cls, rows, upsert=False):
+        movie_ids = cls.existing_ids(Movie, {row[0] for row in rows})
+        rows = [row for row in rows if row[0] in movie_ids]
+        if upsert:
+            BulkWriter.upsert(Rating, RATING_FIELDS, rows, ('movie_id', ))
+        else:
+            BulkWriter.write(Rating, RATING_FIELDS, rows)
@@ -0,0 +1,108 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.db import connection, reset_queries, transaction
+
+from .batch_sizer import BatchSizer
+from .checkpoints import Checkpoints
+from .dataset_version import DatasetVersions
+from .imdb_loader import DATASETS, LOADED_DATASETS, IMDbLoader
+from .rankings import Rankings
+
+__all__ = ('IMDbPipeline', )
+
+
+class IMDbPipeline:
+    """
+    Loads the IMDb datasets with a pool of worker processes.
+
+    A dataset starts once every dataset it references is fully written. Each file is decompressed by a reader
+    thread in the parent (gzip can only be read sequentially), and its chunks are parsed and written by the worker
+    processes, each over its own database connection. The chunk size adapts to the time workers take to write
+    them (``BatchSizer``). Workers are spawned rather than forked, so they never inherit
+    a connection opened by the parent or its reader threads.
+    """
+
+    @classmethod
+    def load(cls, path, workers, memory_limit=None, resume=False):
+        IMDbLoader.check_headers(path)
+        stop = threading.Event()
+        pending = list(LOADED_DATASETS)
+        done = set()
+        running = {}
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=django.setup) as pool, \
+                ThreadPoolExecutor(max_workers=len(pending)) as readers:
+            try:
+                while pending or running:
+                    for dataset in cls.ready_datasets(pending, done):
+                        pending.remove(dataset)
+                        file_name, _ = DATASETS[dataset]
+                        future = readers.submit(
+                            cls.load_dataset, pool, dataset, f'{path}/{file_name}', workers, stop, memory_limit, resume,
+                        )
+                        running[future] = dataset
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        future.result()
+                        done.add(running.pop(future))
+            except BaseException:
+                stop.set()
+                raise
+        Rankings.refresh()
+        DatasetVersions.bump()
+
+    @classmethod
+    def ready_datasets(cls, pending, done):
+        return [
+            dataset for dataset in pending
+            if all(parent in done or parent not in LOADED_DATASETS for parent in DATASETS[dataset][1])
+        ]
+
+    @classmethod
+    def load_dataset(cls, pool, dataset, file_path, workers, stop, memory_limit=None, resume=False):
+        try:
+            fingerprint, committed = Checkpoints.committed(dataset, file_path, resume)
+            if committed is None:
+                return
+            sizer = BatchSizer()
+            chunks = IMDbLoader.read_chunks(file_path, f'Loading {dataset.title()}', memory_limit, committed, sizer)
+            if cls.submit_chunks(pool, dataset, fingerprint, chunks, workers, stop, sizer):
+                Checkpoints.complete(dataset, fingerprint)
+        finally:
+            # The reader thread opened its own connection for the checkpoints.
+            connection.close()
+
+    @classmethod
+    def submit_chunks(cls, pool, dataset, fingerprint, chunks, workers, stop, sizer):
+        in_flight = set()
+        try:
+            for header, start_row, lines in chunks:
+                if stop.is_set():
+                    return False
+                # Bound the chunks waiting in the pool so a fast reader does not buffer the whole file.
+                if len(in_flight) >= workers * 2:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        sizer.flushed(*future.result())
+                in_flight.add(pool.submit(cls.write_chunk, dataset, fingerprint, header, start_row, lines))
+        finally:
+            finished = wait(in_flight).done
+        for future in finished:
+            future.result()
+        return True
+
+    @classmethod
+    def write_chunk(cls, dataset, fingerprint, header, start_row, lines):
+        """
+        Parses, writes and commits a chunk, returns its rows and the seconds it took.
+        """
+        start = time.perf_counter()
+        with transaction.atomic():
+            getattr(IMDbLoader, f'write_{dataset}')(IMDbLoader.parse_rows(dataset, header, lines))
+            Checkpoints.commit(dataset, fingerprint, start_row, len(lines))
+        reset_queries()
+        return len(lines), time.perf_counter() - start
@@ -0,0 +1,183 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connection
+
+from .memory import current_rss
+
+__all__ = ('IngestProfile', )
+
+# read: decompression and line splitting, build: rows and instances in write_*, lookup: referenced ids,
+# insert: rows of the dataset's models, m2m: many-to-many links, commit: the batch transaction and its checkpoint.
+STAGES = ('read', 'parse', 'build', 'lookup', 'insert', 'm2m', 'commit')
+
+current_profile = ContextVar('imdb_ingest_profile', default=None)
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 3)
+
+
+def per_second(rows, seconds):
+    return round(rows / seconds, 1) if seconds else None
+
+
+def megabytes(size):
+    return round(size / 2 ** 20, 1) if size is not None else None
+
+
+class IngestProfile:
+    """
+    Where the time of a load goes, per dataset and per batch.
+
+    While ``active`` the loader reports its ``STAGES`` to the profile. Stages nest, each one counts its own time
+    without the stages run within it, and every statement is a round trip of the innermost stage. Time outside the
+    stages is reported as ``other``. Each batch also samples the resident set size. The hooks do nothing while no
+    profile is active, and only see the process they run in.
+    """
+
+    def __init__(self):
+        self.datasets = {}
+        self.batches = []
+        self.stack = []
+        self.summary = None
+        self.reset()
+
+    def reset(self):
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.queries = dict.fromkeys((*STAGES, 'other'), 0)
+        self.db_seconds = 0.0
+        self.batch_start = time.perf_counter()
+
+    @staticmethod
+    def current():
+        return current_profile.get()
+
+    @contextmanager
+    def active(self):
+        token = current_profile.set(self)
+        try:
+            with connection.execute_wrapper(self):
+                yield self
+        finally:
+            current_profile.reset(token)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.queries[self.stack[-1][0] if self.stack else 'other'] += 1
+
+    @classmethod
+    @contextmanager
+    def stage(cls, name):
+        profile = cls.current()
+        if profile is None:
+            yield
+            return
+        profile.stack.append([name, 0.0])
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _, nested = profile.stack.pop()
+            profile.seconds[name] += elapsed - nested
+            if profile.stack:
+                profile.stack[-1][1] += elapsed
+
+    @classmethod
+    @contextmanager
+    def loading(cls, dataset):
+        """
+        Profiles the load of ``dataset`` run within the block, summarized in ``datasets``.
+        """
+        profile = cls.current()
+        if profile is None:
+            yield
+            return
+        profile.summary = summary = {
+            'rows': 0,
+            'batches': 0,
+            'stages': dict.fromkeys(STAGES, 0.0),
+            'queries': dict.fromkeys((*STAGES, 'other'), 0),
+            'db_seconds': 0.0,
+            'batch_seconds': [],
+            'peak_rss': None,
+        }
+        profile.reset()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Statements and stages after the last batch, finding it was the last one among them.
+            profile.accumulate()
+            profile.summary = None
+            profile.datasets[dataset] = profile.summarize(summary, time.perf_counter() - start)
+
+    @classmethod
+    def batch_done(cls, dataset, start_row, rows):
+        """
+        Records a committed batch of ``rows`` rows, with the stages and statements since the previous one.
+        """
+        profile = cls.current()
+        if profile is None or profile.summary is None:
+            return
+        seconds = time.perf_counter() - profile.batch_start
+        rss = current_rss()
+        profile.batches.append({
+            'dataset': dataset,
+            'batch': profile.summary['batches'],
+            'start_row': start_row,
+            'rows': rows,
+            'ms': milliseconds(seconds),
+            'rows_per_second': per_second(rows, seconds),
+            'stages_ms': profile.stages_ms(profile.seconds, seconds),
+            'queries': sum(profile.queries.values()),
+            'db_ms': milliseconds(profile.db_seconds),
+            'rss_mb': megabytes(rss),
+        })
+        summary = profile.summary
+        summary['rows'] += rows
+        summary['batches'] += 1
+        summary['batch_seconds'].append(seconds)
+        if rss is not None:
+            summary['peak_rss'] = max(summary['peak_rss'] or 0, rss)
+        profile.accumulate()
+
+    def accumulate(self):
+        for stage, seconds in self.seconds.items():
+            self.summary['stages'][stage] += seconds
+        for stage, queries in self.queries.items():
+            self.summary['queries'][stage] += queries
+        self.summary['db_seconds'] += self.db_seconds
+        self.reset()
+
+    @staticmethod
+    def stages_ms(stages, total):
+        return {
+            **{stage: milliseconds(seconds) for stage, seconds in stages.items()},
+            'other': milliseconds(max(0.0, total - sum(stages.values()))),
+        }
+
+    @classmethod
+    def summarize(cls, summary, seconds):
+        batch_seconds = sorted(summary['batch_seconds'])
+        return {
+            'rows': summary['rows'],
+            'batches': summary['batches'],
+            'seconds': round(seconds, 4),
+            'rows_per_second': per_second(summary['rows'], seconds),
+            'stages_ms': cls.stages_ms(summary['stages'], seconds),
+            'queries': {**summary['queries'], 'total': sum(summary['queries'].values())},
+            'db_ms': milliseconds(summary['db_seconds']),
+            'batch_ms': {
+                'min': milliseconds(batch_seconds[0]),
+                'median': milliseconds(batch_seconds[len(batch_seconds) // 2]),
+                'max': milliseconds(batch_seconds[-1]),
+            } if batch_seconds else None,
+            'peak_rss_mb': megabytes(summary['peak_rss']),
+        }
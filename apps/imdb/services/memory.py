@@ -0,0 +1,24 @@
+import resource
+import sys
+
+__all__ = ('current_rss', 'peak_rss')
+
+
+def current_rss():
+    """
+    Returns the resident set size of the process in bytes, or ``None`` where ``/proc`` is not available.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return None
+
+
+def peak_rss(children=False):
+    """
+    Returns the peak resident set size in bytes of the process, or of its largest terminated child with ``children``.
+    """
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+    return usage if sys.platform == 'darwin' else usage * 1024
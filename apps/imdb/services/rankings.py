@@ -0,0 +1,77 @@
+from django.db import connection, transaction
+
+from apps.imdb.models import Movie, MovieRanking, MovieType, Rating
+
+__all__ = ('Rankings', )
+
+# Entries kept per genre/decade scope.
+RANKING_SIZE = 250
+# Votes a movie needs to be ranked, IMDb's own top 250 threshold.
+MIN_VOTES = 25000
+# Title types ranked, feature films and TV movies like IMDb's top 250; shorts, series and episodes are not.
+RANKED_TYPES = (MovieType.movie, MovieType.tv_movie)
+
+REFRESH_SQL = '''
+WITH scored AS (
+    SELECT
+        rating.movie_id,
+        (movie.year / 10) * 10 AS decade,
+        (rating.num_votes * rating.average_rating + %(min_votes)s * mean.rating) / (rating.num_votes + %(min_votes)s)
+            AS weighted_rating,
+        rating.average_rating,
+        rating.num_votes
+    FROM {rating} rating
+    JOIN {movie} movie ON movie.id = rating.movie_id
+    CROSS JOIN (SELECT AVG(average_rating) AS rating FROM {rating}) mean
+    WHERE rating.num_votes >= %(min_votes)s AND movie.movie_type_id IN ({movie_types})
+), scoped AS (
+    -- Typed NULLs, PostgreSQL resolves the column types of a UNION from its first branches.
+    SELECT CAST(NULL AS INTEGER) AS genre_id, CAST(NULL AS INTEGER) AS scope_decade, {scores} FROM scored
+    UNION ALL
+    SELECT genres.genre_id, NULL, {scores} FROM scored JOIN {genres} genres ON genres.movie_id = scored.movie_id
+    UNION ALL
+    SELECT NULL, scored.decade, {scores} FROM scored WHERE scored.decade IS NOT NULL
+    UNION ALL
+    SELECT genres.genre_id, scored.decade, {scores}
+    FROM scored JOIN {genres} genres ON genres.movie_id = scored.movie_id
+    WHERE scored.decade IS NOT NULL
+), ranked AS (
+    SELECT
+        genre_id, scope_decade, movie_id, weighted_rating, average_rating, num_votes,
+        ROW_NUMBER() OVER (
+            PARTITION BY genre_id, scope_decade ORDER BY weighted_rating DESC, num_votes DESC, movie_id
+        ) AS rank
+    FROM scoped
+)
+INSERT INTO {ranking} (genre_id, decade, rank, movie_id, weighted_rating, average_rating, num_votes)
+SELECT genre_id, scope_decade, rank, movie_id, weighted_rating, average_rating, num_votes
+FROM ranked
+WHERE rank <= %(size)s
+'''
+
+
+class Rankings:
+    """
+    Maintains the ``MovieRanking`` leaderboards, top rated movies overall and per genre, decade and genre and decade.
+    Only titles of the ``RANKED_TYPES`` are ranked.
+
+    Movies are ranked by IMDb's weighted rating ``(v * R + m * C) / (v + m)``: ``v`` votes averaging ``R``, ``m``
+    the ``MIN_VOTES`` a movie needs to be ranked and ``C`` the mean of all ratings. The table is rebuilt with one
+    ``INSERT ... SELECT`` after a load, in a transaction, so the API reads either the previous or the new rankings.
+    It is a plain table rather than a materialized view, which keeps PostgreSQL and SQLite on the same code path.
+    """
+
+    @classmethod
+    def refresh(cls, size=RANKING_SIZE, min_votes=MIN_VOTES):
+        quote_name = connection.ops.quote_name
+        sql = REFRESH_SQL.format(
+            rating=quote_name(Rating._meta.db_table),
+            movie=quote_name(Movie._meta.db_table),
+            genres=quote_name(Movie.genres.through._meta.db_table),
+            ranking=quote_name(MovieRanking._meta.db_table),
+            movie_types=', '.join(str(movie_type) for movie_type in RANKED_TYPES),
+            scores='scored.movie_id, scored.weighted_rating, scored.average_rating, scored.num_votes',
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            MovieRanking.objects.all().delete()
+            cursor.execute(sql, {'size': size, 'min_votes': min_votes})
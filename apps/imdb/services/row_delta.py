@@ -0,0 +1,50 @@
+__all__ = ('RowDelta', )
+
+DELETE_BATCH_SIZE = 1000
+
+
+class RowDelta:
+    """
+    Tracks one dataset during a delta reload.
+
+    Incoming rows are decoded tuples starting with the key and ending with the row hash. They are kept only when they
+    are new or their hash differs from the stored ``row_hash``. Every key seen is recorded in a bitmap indexed by the
+    numeric IMDb id, which stays a few MB even for the full dumps, so the stored rows missing from the dataset can be
+    deleted at the end. The rows of the ``linked`` ``(model, many-to-many field)`` pairs losing their links to the
+    deleted rows lose their hash, so they are written again should the deleted rows come back.
+    """
+
+    def __init__(self, model, key_field, linked=()):
+        self.model = model
+        self.key_field = key_field
+        self.linked = linked
+        self.seen = bytearray()
+
+    def changed(self, rows):
+        keys = [row[0] for row in rows]
+        for key in keys:
+            self.mark_seen(key)
+        stored = dict(
+            self.model.objects.filter(**{f'{self.key_field}__in': keys}).values_list(self.key_field, 'row_hash')
+        )
+        return [row for key, row in zip(keys, rows) if stored.get(key) != row[-1]]
+
+    def mark_seen(self, key):
+        index, bit = divmod(key, 8)
+        if index >= len(self.seen):
+            self.seen.extend(bytes(max(index + 1, 2 * len(self.seen)) - len(self.seen)))
+        self.seen[index] |= 1 << bit
+
+    def is_seen(self, key):
+        index, bit = divmod(key, 8)
+        return index < len(self.seen) and bool(self.seen[index] & (1 << bit))
+
+    def delete_missing(self):
+        keys = self.model.objects.values_list(self.key_field, flat=True)
+        missing = [key for key in keys.iterator(chunk_size=10000) if not self.is_seen(key)]
+        for start in range(0, len(missing), DELETE_BATCH_SIZE):
+            batch = missing[start:start + DELETE_BATCH_SIZE]
+            for model, field in self.linked:
+                model.objects.filter(**{f'{field}__in': batch}).update(row_hash=None)
+            self.model.objects.filter(**{f'{self.key_field}__in': batch}).delete()
+        return len(missing)
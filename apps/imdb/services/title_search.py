@@ -0,0 +1,242 @@
+import bisect
+import re
+from array import array
+from collections import defaultdict, namedtuple
+from threading import Lock
+
+from django.db import connection
+
+from apps.imdb.models import Akas, Movie, Rating
+
+from .dataset_version import DatasetVersions
+
+__all__ = ('InvertedIndex', 'SearchHit', 'TitleSearch')
+
+MAX_RESULTS = 100
+# Matching rows ranked per source table, a one letter prefix matches a good part of the titles.
+CANDIDATES = 2000
+# Minimum trigram similarity of a fuzzy match.
+SIMILARITY = 0.4
+
+SearchHit = namedtuple('SearchHit', ('movie_id', 'title', 'region', 'language', 'score'))
+
+TOKEN_REGEX = re.compile(r'\w+')
+
+# The expressions have to match the full-text indexes of migration 0010 to use them.
+MOVIE_DOCUMENT = "to_tsvector('simple', {table}.title::text || ' ' || {table}.original_title::text)"
+AKAS_DOCUMENT = "to_tsvector('simple', {table}.title::text)"
+
+POSTGRESQL_SQL = '''
+WITH query AS (SELECT to_tsquery('simple', %(tsquery)s) AS tsquery), matches AS (
+    {movies}
+    SELECT movie_id, title, region, language, ts_rank(document, query.tsquery) AS score
+    FROM (
+        SELECT akas.movie_id, akas.title, akas.region, akas.language, {akas_document} AS document
+        FROM {akas} akas, query
+        WHERE {akas_document} @@ query.tsquery {filters}
+        LIMIT %(candidates)s
+    ) akas, query
+    {fuzzy}
+), best AS (
+    SELECT DISTINCT ON (movie_id) movie_id, title, region, language, score
+    FROM matches
+    ORDER BY movie_id, score DESC
+)
+SELECT best.movie_id, best.title, best.region, best.language, best.score
+FROM best
+LEFT JOIN {rating} rating ON rating.movie_id = best.movie_id
+ORDER BY best.score DESC, rating.num_votes DESC NULLS LAST, best.movie_id
+LIMIT %(limit)s
+'''
+POSTGRESQL_MOVIES_SQL = '''
+    SELECT id AS movie_id, title, '' AS region, '' AS language, ts_rank(document, query.tsquery) AS score
+    FROM (
+        SELECT movie.id, movie.title, {movie_document} AS document
+        FROM {movie} movie, query
+        WHERE {movie_document} @@ query.tsquery
+        LIMIT %(candidates)s
+    ) movie, query
+    UNION ALL
+'''
+# Typos: titles similar to the query, ranked below the full-text matches. Needs pg_trgm and its indexes.
+POSTGRESQL_FUZZY_SQL = '''
+    UNION ALL
+    SELECT movie_id, title, region, language, similarity(UPPER(title::text), UPPER(%(text)s)) - 1 AS score
+    FROM (
+        SELECT akas.movie_id, akas.title, akas.region, akas.language
+        FROM {akas} akas
+        WHERE UPPER(akas.title::text) %% UPPER(%(text)s) {filters}
+        LIMIT %(candidates)s
+    ) fuzzy
+'''
+
+
+def tokenize(text):
+    return TOKEN_REGEX.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    In-process full-text index of movie titles, original titles and alternate titles, the search backend where the
+    database has none (SQLite).
+
+    Every title is a document and every token of a title maps to the sorted array of documents containing it. The
+    tokens are kept sorted, so the last, possibly incomplete, word of a query is answered with a range of them. A
+    document matches when it contains every query token and scores higher the fewer other tokens it has.
+    """
+
+    def __init__(self):
+        self.movie_ids = array('l')
+        self.titles = []
+        self.regions = []
+        self.languages = []
+        self.lengths = array('H')
+        self.postings = {}
+        self.tokens = []
+
+    @classmethod
+    def build(cls):
+        index = cls()
+        postings = defaultdict(lambda: array('l'))
+        movies = Movie.objects.values_list('id', 'title', 'original_title').order_by().iterator(chunk_size=10000)
+        for movie_id, title, original_title in movies:
+            index.add(postings, movie_id, title, '', '', tokens=tokenize(f'{title} {original_title}'))
+        akas = Akas.objects.values_list('movie_id', 'title', 'region', 'language').order_by()
+        for movie_id, title, region, language in akas.iterator(chunk_size=10000):
+            index.add(postings, movie_id, title, region, language)
+        index.postings = dict(postings)
+        index.tokens = sorted(index.postings)
+        return index
+
+    def add(self, postings, movie_id, title, region, language, tokens=None):
+        tokens = set(tokens or tokenize(title))
+        if not tokens:
+            return
+        document = len(self.titles)
+        self.movie_ids.append(movie_id)
+        self.titles.append(title)
+        self.regions.append(region)
+        self.languages.append(language)
+        self.lengths.append(min(len(tokens), 0xffff))
+        for token in tokens:
+            postings[token].append(document)
+
+    def documents(self, token, prefix=False):
+        if not prefix:
+            return set(self.postings.get(token, ()))
+        start = bisect.bisect_left(self.tokens, token)
+        end = bisect.bisect_left(self.tokens, token + '\U0010ffff')
+        documents = set()
+        for other in self.tokens[start:end]:
+            documents.update(self.postings[other])
+        return documents
+
+    def search(self, text, region=None, language=None):
+        """
+        Returns the best ``SearchHit`` of each movie matching ``text``, treating its last word as a prefix.
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        *words, prefix = tokens
+        # Rarest words first, the intersection shrinks fastest.
+        words.sort(key=lambda word: len(self.postings.get(word, ())))
+        documents = None
+        for token, is_prefix in [(word, False) for word in words] + [(prefix, True)]:
+            matched = self.documents(token, is_prefix)
+            documents = matched if documents is None else documents & matched
+            if not documents:
+                return []
+        hits = {}
+        for document in documents:
+            if region and self.regions[document] != region or language and self.languages[document] != language:
+                continue
+            hit = SearchHit(
+                self.movie_ids[document], self.titles[document], self.regions[document], self.languages[document],
+                len(tokens) / max(self.lengths[document], len(tokens)),
+            )
+            if hit.movie_id not in hits or hit.score > hits[hit.movie_id].score:
+                hits[hit.movie_id] = hit
+        return list(hits.values())
+
+
+class TitleSearch:
+    """
+    Ranked search of movies by title, original title and alternate title, optionally only the alternate titles of a
+    region and/or language.
+
+    The last word of a query is matched as a prefix, so the same search serves autocomplete. On PostgreSQL it runs
+    on the ``simple`` full-text GIN indexes of migration 0010, ranked by ``ts_rank`` then votes; with ``pg_trgm``
+    installed titles within a few typos are appended below the exact matches. Other databases search an
+    ``InvertedIndex`` built on first use and rebuilt when a load bumps the dataset version.
+    """
+    index = None
+    index_version = None
+    lock = Lock()
+    trigrams = None
+
+    @classmethod
+    def search(cls, text, region=None, language=None, limit=20):
+        limit = max(1, min(limit, MAX_RESULTS))
+        if not tokenize(text):
+            return []
+        if connection.vendor == 'postgresql':
+            return cls.search_postgresql(text, region, language, limit)
+        hits = cls.inverted_index().search(text, region, language)
+        # Like the PostgreSQL search, only the best candidates are ranked by votes.
+        hits.sort(key=lambda hit: (-hit.score, hit.movie_id))
+        hits = hits[:CANDIDATES]
+        votes = dict(Rating.objects.filter(movie_id__in=[hit.movie_id for hit in hits]).values_list(
+            'movie_id', 'num_votes',
+        ))
+        hits.sort(key=lambda hit: (-hit.score, -votes.get(hit.movie_id, -1), hit.movie_id))
+        return hits[:limit]
+
+    @classmethod
+    def search_postgresql(cls, text, region, language, limit):
+        *words, prefix = tokenize(text)
+        tsquery = ' & '.join([f"'{word}'" for word in words] + [f"'{prefix}':*"])
+        quote_name = connection.ops.quote_name
+        tables = {
+            'movie': quote_name(Movie._meta.db_table),
+            'akas': quote_name(Akas._meta.db_table),
+            'rating': quote_name(Rating._meta.db_table),
+        }
+        filters = ''
+        if region:
+            filters += ' AND akas.region = %(region)s'
+        if language:
+            filters += ' AND akas.language = %(language)s'
+        movies = '' if region or language else POSTGRESQL_MOVIES_SQL.format(
+            movie_document=MOVIE_DOCUMENT.format(table='movie'), **tables,
+        )
+        fuzzy = POSTGRESQL_FUZZY_SQL.format(filters=filters, **tables) if cls.has_trigrams() else ''
+        sql = POSTGRESQL_SQL.format(
+            movies=movies, fuzzy=fuzzy, filters=filters, akas_document=AKAS_DOCUMENT.format(table='akas'), **tables,
+        )
+        params = {
+            'tsquery': tsquery, 'text': text, 'region': region, 'language': language, 'limit': limit,
+            'candidates': CANDIDATES,
+        }
+        with connection.cursor() as cursor:
+            if fuzzy:
+                cursor.execute('SELECT set_limit(%s)', [SIMILARITY])
+            cursor.execute(sql, params)
+            return [SearchHit(*row) for row in cursor.fetchall()]
+
+    @classmethod
+    def has_trigrams(cls):
+        if cls.trigrams is None:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                cls.trigrams = cursor.fetchone() is not None
+        return cls.trigrams
+
+    @classmethod
+    def inverted_index(cls):
+        version = DatasetVersions.current()
+        with cls.lock:
+            if cls.index is None or cls.index_version != version:
+                cls.index = InvertedIndex.build()
+                cls.index_version = version
+            return cls.index
@@ -1,3 +1,1145 @@
-from django.test import TestCase
+import base64
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+from functools import partial
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, IntegrityError, connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from graphql import parse
+from tqdm import tqdm
+
+from api.graphql.schema import schema
+from apps.imdb.benchmarks import IngestBenchmark, SyntheticDataset
+from apps.imdb.metrics import MetricsRegistry
+from apps.imdb.metrics.middleware import QUERIES, REQUESTS
+from apps.imdb.models import (
+    Akas,
+    Crew,
+    DeferredIndex,
+    Episode,
+    Genre,
+    LoadCheckpoint,
+    Movie,
+    MovieRanking,
+    MovieType,
+    Person,
+    Principal,
+    Profession,
+    Rating,
+)
+from apps.imdb.repositories import RankingRepository
+from apps.imdb.schemas import DocumentCache, Loaders, query_hash
+from apps.imdb.services import (
+    BatchSizer, BulkWriter, Checkpoints, DatasetVersions, DeferredIndexes, IMDbLoader, IMDbPipeline, IngestProfile,
+    InvertedIndex, Rankings, TitleSearch,
+)
+from apps.imdb.services.batch_sizer import MAX_BATCH_SIZE, MIN_BATCH_SIZE
+from apps.imdb.services.bulk_writer import MAX_QUERY_PARAMS, STATEMENT_BYTES
+from apps.imdb.services.imdb_loader import DATASETS, LOADED_DATASETS, MOVIE_FIELDS, SCHEMAS
+from apps.imdb.services.ingest_profile import STAGES
+from apps.imdb.services.title_search import SearchHit
+from apps.imdb.services.tsv_decoder import Column, ImdbId, ImdbIds, RowHash, TsvSchema, row_hash
+
+# Every 20th title and person is left out of the partial datasets, rows of the other files still reference them.
+MISSING_EVERY = 20
+
+quiet_progress = mock.patch('apps.imdb.services.imdb_loader.tqdm', partial(tqdm, disable=True))
+# Batches of MIN_BATCH_SIZE rows that do not grow however fast they are written.
+small_batches = mock.patch(
+    'apps.imdb.services.imdb_loader.BatchSizer', partial(BatchSizer, MIN_BATCH_SIZE, flush_seconds=0),
+)
+
+
+def synthetic_path(test_class, scale=400):
+    """
+    Writes synthetic datasets of ``scale`` titles to a directory removed after the tests of ``test_class``.
+    """
+    path = tempfile.mkdtemp(prefix='imdb-test-')
+    test_class.addClassCleanup(shutil.rmtree, path, ignore_errors=True)
+    SyntheticDataset(scale).write(path)
+    return path
+
+
+def snapshot():
+    """
+    The loaded rows by their IMDb keys, without database generated ids.
+    """
+    return {
+        'movies': set(Movie.objects.values_list('id', 'movie_type', 'title', 'year', 'runtime_minutes')),
+        'genres': set(Movie.genres.through.objects.values_list('movie_id', 'genre_id')),
+        'persons': set(Person.objects.values_list('id', 'name', 'birth_year', 'death_year')),
+        'known_for': set(Person.movies.through.objects.values_list('person_id', 'movie_id')),
+        'professions': set(Person.professions.through.objects.values_list('person_id', 'profession_id')),
+        'ratings': set(Rating.objects.values_list('movie_id', 'average_rating', 'num_votes')),
+        'crews': set(Crew.objects.values_list('movie_id', flat=True)),
+        'directors': set(Crew.directors.through.objects.values_list('crew__movie_id', 'person_id')),
+        'writers': set(Crew.writers.through.objects.values_list('crew__movie_id', 'person_id')),
+        'akas': set(Akas.objects.values_list('movie_id', 'ordering', 'title')),
+        'episodes': set(Episode.objects.values_list('movie_id', 'parent_id', 'season_number', 'episode_number')),
+        'principals': set(Principal.objects.values_list('movie_id', 'ordering', 'person_id', 'category')),
+    }
+
+
+def leave_out(source, target, file_name):
+    with gzip.open(os.path.join(source, file_name), 'rt', encoding='utf-8') as file, \
+            gzip.open(os.path.join(target, file_name), 'wt', encoding='utf-8') as filtered:
+        filtered.write(file.readline())
+        for line in file:
+            if int(line[2:line.index('\t')]) % MISSING_EVERY:
+                filtered.write(line)
+
+
+@quiet_progress
+class DeltaReloadTests(TransactionTestCase):
+    """
+    A delta reload leaves the tables as a fresh load of the same files would.
+
+    Loads commit every batch and truncate the tables, they do not run in a test transaction. The genres and
+    professions of the data migrations are restored after every test.
+    """
+
+    serialized_rollback = True
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.path = tempfile.mkdtemp(prefix='imdb-delta-')
+        cls.full = os.path.join(cls.path, 'full')
+        cls.partial = os.path.join(cls.path, 'partial')
+        SyntheticDataset(400).write(cls.full)
+        shutil.copytree(cls.full, cls.partial)
+        leave_out(cls.full, cls.partial, 'title.basics.tsv.gz')
+        leave_out(cls.full, cls.partial, 'name.basics.tsv.gz')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.path, ignore_errors=True)
+        super().tearDownClass()
+
+    def fresh_load(self, path):
+        IngestBenchmark.empty()
+        IMDbLoader.load(path)
+        return snapshot()
+
+    def test_delta_adds_links_to_new_rows(self):
+        expected = self.fresh_load(self.full)
+        self.fresh_load(self.partial)
+        IMDbLoader.load(self.full, delta=True)
+        self.assertEqual(snapshot(), expected)
+
+    def test_delta_restores_links_to_deleted_rows(self):
+        expected = self.fresh_load(self.full)
+        IMDbLoader.load(self.partial, delta=True)
+        self.assertEqual(snapshot(), self.fresh_load(self.partial))
+        self.fresh_load(self.full)
+        IMDbLoader.load(self.partial, delta=True)
+        IMDbLoader.load(self.full, delta=True)
+        self.assertEqual(snapshot(), expected)
+
+    def test_failed_replace_keeps_previous_rows(self):
+        expected = self.fresh_load(self.full)
+        with mock.patch.object(IMDbLoader, 'write_principals', side_effect=DatabaseError('Interrupted')), \
+                self.assertRaises(DatabaseError):
+            IMDbLoader.load(self.full, delta=True)
+        self.assertEqual(snapshot(), expected)
+
+
+class IngestBenchmarkCompareTests(SimpleTestCase):
+    """
+    The ingest benchmark gates the total and the datasets measured long enough to be stable.
+    """
+
+    baseline = {
+        'movies': {'rows': 20000, 'seconds': 2.0, 'rows_per_second': 10000.0},
+        'ratings': {'rows': 10000, 'seconds': 0.2, 'rows_per_second': 50000.0},
+    }
+
+    def test_short_datasets_are_not_gated(self):
+        results = {**self.baseline, 'ratings': {'rows': 10000, 'seconds': 0.4, 'rows_per_second': 25000.0}}
+        comparison, regressions = IngestBenchmark.compare(results, self.baseline)
+        self.assertEqual(regressions, [])
+        self.assertFalse(comparison['ratings']['gated'])
+
+    def test_regressions_above_the_threshold_fail(self):
+        results = {**self.baseline, 'movies': {'rows': 20000, 'seconds': 4.0, 'rows_per_second': 5000.0}}
+        _, regressions = IngestBenchmark.compare(results, self.baseline)
+        self.assertEqual(regressions, ['movies', 'total'])
+
+
+class BulkWriterTests(TestCase):
+    """
+    Rows written by ``BulkWriter`` read back unchanged, through COPY on PostgreSQL and bulk_create elsewhere.
+    """
+
+    def test_copy_encoding(self):
+        self.assertEqual(
+            [BulkWriter.encode(value) for value in (None, True, False, 7, 7.5, '\\N')],
+            ['\\N', 't', 'f', '7', '7.5', '\\\\N'],
+        )
+        self.assertEqual(BulkWriter.encode('a\tb\nc\rd\\e'), 'a\\tb\\nc\\rd\\\\e')
+
+    def test_written_rows_read_back(self):
+        rows = [
+            (1, MovieType.movie, 'Tab\tand\nnew line', 'Back\\slash \\N', False, 1999, None, 90, -5),
+            (2, MovieType.short, '\\N', 'Carriage\rreturn', True, None, 2001, None, None),
+        ]
+        BulkWriter.write(Movie, MOVIE_FIELDS, rows)
+        self.assertEqual(set(Movie.objects.values_list(*MOVIE_FIELDS)), set(rows))
+
+    def test_batch_size(self):
+        max_params = connection.features.max_query_params or MAX_QUERY_PARAMS
+        self.assertEqual(BulkWriter.batch_size(('a', 'b'), [(1, 2)] * 10), max_params // 2)
+        wide = [('x' * 10000, 'y' * 10000)] * 10
+        self.assertEqual(BulkWriter.batch_size(('a', 'b'), wide), STATEMENT_BYTES // 20000)
+        self.assertEqual(BulkWriter.batch_size(('a', ), []), max_params)
+
+
+@quiet_progress
+class PipelineTests(TestCase):
+    """
+    Datasets start once their references are loaded, and chunks committed in any order load what the sequential
+    loader does.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.path = synthetic_path(cls)
+
+    def test_datasets_start_after_their_references(self):
+        pending, done, rounds = list(LOADED_DATASETS), set(), []
+        while pending:
+            ready = IMDbPipeline.ready_datasets(pending, done)
+            rounds.append(ready)
+            pending = [dataset for dataset in pending if dataset not in ready]
+            done.update(ready)
+        self.assertEqual(rounds, [['movies'], ['persons', 'ratings', 'akas', 'episodes'], ['crew', 'principals']])
+
+    def test_chunks_commit_out_of_order(self):
+        file_path = os.path.join(self.path, DATASETS['movies'][0])
+        fingerprint, _ = Checkpoints.committed('movies', file_path)
+        chunks = list(IMDbLoader.read_chunks(file_path, 'Loading Movies', sizer=BatchSizer(MIN_BATCH_SIZE)))
+        self.assertGreater(len(chunks), 2)
+        for header, start_row, lines in reversed(chunks):
+            rows, _ = IMDbPipeline.write_chunk('movies', fingerprint, header, start_row, lines)
+            self.assertEqual(rows, len(lines))
+        self.assertEqual(Checkpoints.committed('movies', file_path, resume=True), (fingerprint, [(0, 400)]))
+        written = snapshot()
+        Movie.objects.all().delete()
+        IMDbLoader.load_movies(file_path)
+        loaded = snapshot()
+        self.assertEqual(len(written['movies']), 400)
+        self.assertEqual((written['movies'], written['genres']), (loaded['movies'], loaded['genres']))
+
+
+def table_indexes():
+    """
+    The ``(table, name)`` of every index and constraint of the IMDb tables but their primary keys.
+    """
+    with connection.cursor() as cursor:
+        return {
+            (table, name)
+            for table in DeferredIndexes.tables()
+            for name, constraint in connection.introspection.get_constraints(cursor, table).items()
+            if not constraint['primary_key']
+        }
+
+
+@quiet_progress
+class DeferredIndexesTests(TransactionTestCase):
+    """
+    Indexes and foreign keys dropped for a load are recorded first and rebuilt after it, or by the next load when
+    it was interrupted.
+    """
+
+    serialized_rollback = True
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.path = synthetic_path(cls, 50)
+
+    def test_rebuilt_after_the_load(self):
+        indexes = table_indexes()
+        with DeferredIndexes.deferred():
+            recorded = set(DeferredIndex.objects.values_list('table', 'name'))
+            self.assertTrue(recorded)
+            self.assertEqual(table_indexes(), indexes - recorded)
+        self.assertEqual(table_indexes(), indexes)
+        self.assertFalse(DeferredIndexes.pending())
+
+    def test_interrupted_load_rebuilt_by_the_next_one(self):
+        indexes = table_indexes()
+        DeferredIndexes.drop(DeferredIndexes.tables())
+        self.assertNotEqual(table_indexes(), indexes)
+        output = io.StringIO()
+        call_command('load_imdb', path=self.path, stdout=output)
+        self.assertIn('Rebuilding the indexes', output.getvalue())
+        self.assertEqual(table_indexes(), indexes)
+        self.assertFalse(DeferredIndexes.pending())
+        self.assertTrue(Movie.objects.exists())
+
+    def test_failed_rebuild_keeps_the_load_error(self):
+        indexes = table_indexes()
+        with mock.patch.object(DeferredIndexes, 'restore', side_effect=IntegrityError('Rebuild failed')), \
+                self.assertLogs('apps.imdb.services.deferred_indexes', 'ERROR'), \
+                self.assertRaisesMessage(ValueError, 'Load failed'):
+            with DeferredIndexes.deferred():
+                raise ValueError('Load failed')
+        self.assertTrue(DeferredIndexes.pending())
+        DeferredIndexes.restore()
+        self.assertEqual(table_indexes(), indexes)
+
+    def test_unsupported_database(self):
+        with mock.patch.object(DeferredIndexes, 'supported', return_value=False), \
+                self.assertRaisesMessage(CommandError, '--defer-indexes is not supported'):
+            call_command('load_imdb', path=self.path, defer_indexes=True)
+
+
+@quiet_progress
+class LoaderMemoryTests(TestCase):
+    """
+    Batches shrink while the loader is above its memory limit, and the statements of finished batches are not kept.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.path = synthetic_path(cls, 1000)
+        cls.movies = os.path.join(cls.path, DATASETS['movies'][0])
+
+    def chunk_sizes(self, memory_limit=None):
+        chunks = IMDbLoader.read_chunks(self.movies, 'Loading Movies', memory_limit, sizer=BatchSizer(400))
+        return [len(lines) for _, _, lines in chunks]
+
+    def test_batches_shrink_above_the_memory_limit(self):
+        self.assertEqual(self.chunk_sizes(), [400, 400, 200])
+        with mock.patch('apps.imdb.services.imdb_loader.current_rss', return_value=2 ** 31):
+            self.assertEqual(self.chunk_sizes(2 ** 30), [400, 200, *[MIN_BATCH_SIZE] * 4])
+            self.assertEqual(self.chunk_sizes(2 ** 32), [400, 400, 200])
+
+    @override_settings(DEBUG=True)
+    def test_statements_of_finished_batches_are_not_kept(self):
+        with small_batches:
+            IMDbLoader.load_movies(self.movies)
+        self.assertEqual(Movie.objects.count(), 1000)
+        self.assertLess(len(connection.queries), 5)
+
+    def test_peak_rss_reported(self):
+        output = io.StringIO()
+        call_command('load_imdb', path=self.path, memory_limit=1, stdout=output)
+        self.assertRegex(output.getvalue(), r'Peak RSS: [1-9]\d* MB')
+        self.assertEqual(Movie.objects.count(), 1000)
+
+
+class TsvDecoderTests(SimpleTestCase):
+    """
+    Lines decode by column name into typed tuples, whatever the order of the header.
+    """
+
+    schema = TsvSchema(
+        Column('tconst', ImdbId),
+        Column('title', max_length=5),
+        Column('adult', bool),
+        Column('year', int, null=None),
+        Column('rating', float),
+        Column('genres', list, null=()),
+        Column('directors', ImdbIds, null=()),
+        RowHash(),
+    )
+
+    def test_decode(self):
+        header = ['tconst', 'title', 'adult', 'year', 'rating', 'genres', 'directors']
+        lines = [
+            'tt0000042\tLong title\t1\t1999\t7.5\tDrama,Comedy\tnm0000001,nm0000002\n',
+            'tt1\tShort\t0\t\\N\t1\t\\N\t\\N\n',
+        ]
+        self.assertEqual(self.schema.decode(header, lines), [
+            (42, 'Long ', True, 1999, 7.5, ['Drama', 'Comedy'], [1, 2], row_hash(lines[0][:-1])),
+            (1, 'Short', False, None, 1.0, (), (), row_hash(lines[1][:-1])),
+        ])
+
+    def test_header_order(self):
+        header = ['directors', 'year', 'tconst', 'extra', 'genres', 'rating', 'adult', 'title']
+        line = 'nm0000003\t2001\ttt0000007\tignored\tDrama\t8\t0\tTitle\n'
+        self.assertEqual(
+            self.schema.decode(header, [line]), [(7, 'Title', False, 2001, 8.0, ['Drama'], [3], row_hash(line[:-1]))],
+        )
+
+    def test_missing_columns(self):
+        self.assertEqual(self.schema.missing(['tconst', 'title', 'adult', 'rating']), ['year', 'genres', 'directors'])
+        with self.assertRaisesMessage(ValueError, 'The header lacks the columns year, genres, directors.'):
+            self.schema.decode(['tconst', 'title', 'adult', 'rating'], [])
+
+
+@quiet_progress
+class LoaderHeaderTests(TestCase):
+    """
+    Dataset files without a column the loader reads are rejected before anything is loaded.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.path = synthetic_path(cls, 50)
+        file_path = os.path.join(cls.path, DATASETS['ratings'][0])
+        with gzip.open(file_path, 'rt', encoding='utf-8') as file:
+            lines = file.readlines()
+        with gzip.open(file_path, 'wt', encoding='utf-8') as file:
+            file.writelines(line.replace('numVotes', 'votes') for line in lines)
+
+    def test_missing_column(self):
+        with self.assertRaisesMessage(
+            CommandError, 'title.ratings.tsv.gz can not be loaded as the ratings dataset, its header lacks the columns '
+                          'numVotes.',
+        ):
+            call_command('load_imdb', path=self.path)
+        self.assertFalse(Movie.objects.exists())
+        self.assertEqual(SCHEMAS['ratings'].missing(['tconst', 'averageRating', 'numVotes']), [])
+
+
+@quiet_progress
+class CheckpointTests(TestCase):
+    """
+    Committed batches are recorded as row ranges, a resumed load skips them and writes only the rest.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.path = synthetic_path(cls, 1000)
+        cls.movies = os.path.join(cls.path, DATASETS['movies'][0])
+
+    def test_committed_ranges(self):
+        fingerprint = Checkpoints.fingerprint(self.movies)
+        for start_row in (300, 0, 100):
+            Checkpoints.commit('movies', fingerprint, start_row, 100)
+        Checkpoints.commit('persons', fingerprint, 200, 100)
+        self.assertEqual(
+            Checkpoints.committed('movies', self.movies, resume=True), (fingerprint, [(0, 200), (300, 100)]),
+        )
+        Checkpoints.complete('movies', fingerprint)
+        self.assertEqual(Checkpoints.committed('movies', self.movies, resume=True), (fingerprint, None))
+        self.assertEqual(Checkpoints.committed('movies', self.movies), (fingerprint, []))
+        self.assertFalse(LoadCheckpoint.objects.filter(dataset='movies').exists())
+
+    def test_changed_file(self):
+        Checkpoints.commit('movies', '1:1', 0, 100)
+        with self.assertRaisesMessage(ValueError, 'changed since the interrupted load'):
+            Checkpoints.committed('movies', self.movies, resume=True)
+
+    @small_batches
+    def test_resume_interrupted_load(self):
+        write_movies = IMDbLoader.write_movies
+        written = []
+
+        def write(rows, **kwargs):
+            if len(written) == 3:
+                raise DatabaseError('Interrupted')
+            written.append(len(rows))
+            write_movies(rows, **kwargs)
+
+        with mock.patch.object(IMDbLoader, 'write_movies', side_effect=write), self.assertRaises(DatabaseError):
+            IMDbLoader.load_movies(self.movies)
+        committed = Movie.objects.count()
+        self.assertEqual(committed, sum(written))
+        self.assertTrue(0 < committed < 1000)
+        written.clear()
+        with mock.patch.object(IMDbLoader, 'write_movies', side_effect=write_movies) as write:
+            IMDbLoader.load_movies(self.movies, resume=True)
+            self.assertEqual(sum(len(call.args[0]) for call in write.call_args_list), 1000 - committed)
+            IMDbLoader.load_movies(self.movies, resume=True)
+            self.assertEqual(sum(len(call.args[0]) for call in write.call_args_list), 1000 - committed)
+        self.assertEqual(Movie.objects.count(), 1000)
+
+
+class RatingRankIndexTests(TestCase):
+    """
+    The top rated index, kept out of the model state, exists on every database and covers the movie on PostgreSQL.
+    """
+
+    def test_rank_index(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Rating._meta.db_table)
+        index = constraints['imdb_rating_rank_idx']
+        self.assertEqual(index['columns'][:2], ['average_rating', 'id'])
+        self.assertEqual(index['orders'][:2], ['DESC', 'DESC'])
+
+    @skipUnless(connection.vendor == 'postgresql', 'Covering indexes are PostgreSQL only.')
+    def test_covering_on_postgresql(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = 'imdb_rating_rank_idx'")
+            self.assertTrue(cursor.fetchone()[0].endswith('INCLUDE (movie_id)'))
+
+
+def create_titles():
+    """
+    Three titles with their genres, ratings, crew, principals and known-for persons, for the API tests.
+    """
+    movies = Movie.objects.bulk_create([
+        Movie(id=1, movie_type_id=MovieType.movie, title='Alpha', original_title='Alpha', year=1999),
+        Movie(id=2, movie_type_id=MovieType.short, title='Beta', original_title='Beta', year=2005),
+        Movie(id=3, movie_type_id=MovieType.tv_movie, title='Alphabet', original_title='Alphabet', year=2010),
+    ])
+    movies[0].genres.set([Genre.drama, Genre.comedy])
+    movies[2].genres.set([Genre.drama])
+    Rating.objects.bulk_create([
+        Rating(movie=movies[0], average_rating=8.0, num_votes=1000),
+        Rating(movie=movies[1], average_rating=6.5, num_votes=50),
+        Rating(movie=movies[2], average_rating=8.0, num_votes=200),
+    ])
+    director = Person.objects.create(id=1, name='Anna Adams', birth_year=1960)
+    writer = Person.objects.create(id=2, name='Ben Berg')
+    director.professions.set([Profession.director, Profession.writer])
+    director.movies.set([movies[0], movies[2]])
+    writer.movies.set([movies[0]])
+    crew = Crew.objects.create(movie=movies[0])
+    crew.directors.set([director])
+    crew.writers.set([director, writer])
+    Principal.objects.bulk_create([
+        Principal(movie=movies[0], person=writer, category='writer', ordering=2),
+        Principal(movie=movies[0], person=director, category='director', ordering=1),
+    ])
+    return movies
+
+
+def ids(response):
+    return [row['id'] for row in response.json()['results']]
+
+
+class DrfApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_titles()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_movie(self):
+        response = self.client.get('/api/drf/movies/tt0000001/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'id': 'tt0000001',
+            'movie_type': 'movie',
+            'title': 'Alpha',
+            'original_title': 'Alpha',
+            'is_adult': False,
+            'year': 1999,
+            'end_year': None,
+            'runtime_minutes': None,
+            'genres': ['Comedy', 'Drama'],
+            'rating': {'average_rating': 8.0, 'num_votes': 1000},
+            'crew': {
+                'directors': [{'id': 'nm0000001', 'name': 'Anna Adams'}],
+                'writers': [{'id': 'nm0000001', 'name': 'Anna Adams'}, {'id': 'nm0000002', 'name': 'Ben Berg'}],
+            },
+            'persons': [{'id': 'nm0000001', 'name': 'Anna Adams'}, {'id': 'nm0000002', 'name': 'Ben Berg'}],
+        })
+        self.assertEqual(self.client.get('/api/drf/movies/1/').json()['id'], 'tt0000001')
+
+    def test_movie_filters(self):
+        self.assertEqual(ids(self.client.get('/api/drf/movies/')), ['tt0000001', 'tt0000002', 'tt0000003'])
+        self.assertEqual(ids(self.client.get('/api/drf/movies/?title=alpha')), ['tt0000001', 'tt0000003'])
+        self.assertEqual(ids(self.client.get('/api/drf/movies/?year__gte=2005')), ['tt0000002', 'tt0000003'])
+        self.assertEqual(ids(self.client.get('/api/drf/movies/?movie_type=tvMovie')), ['tt0000003'])
+        self.assertEqual(ids(self.client.get('/api/drf/movies/?genre=Drama')), ['tt0000001', 'tt0000003'])
+
+    def test_person(self):
+        self.assertEqual(self.client.get('/api/drf/persons/nm0000001/').json(), {
+            'id': 'nm0000001',
+            'name': 'Anna Adams',
+            'birth_year': 1960,
+            'death_year': None,
+            'professions': ['director', 'writer'],
+            'known_for': [
+                {'id': 'tt0000001', 'title': 'Alpha', 'year': 1999},
+                {'id': 'tt0000003', 'title': 'Alphabet', 'year': 2010},
+            ],
+        })
+
+    def test_crew_and_rating(self):
+        crew = self.client.get('/api/drf/crews/tt0000001/').json()
+        self.assertEqual(crew['movie'], {'id': 'tt0000001', 'title': 'Alpha', 'year': 1999})
+        self.assertEqual([person['id'] for person in crew['writers']], ['nm0000001', 'nm0000002'])
+        self.assertEqual(self.client.get('/api/drf/ratings/tt0000002/').json(), {
+            'movie': {'id': 'tt0000002', 'title': 'Beta', 'year': 2005},
+            'average_rating': 6.5,
+            'num_votes': 50,
+        })
+
+    def test_not_found(self):
+        for url in ('/api/drf/movies/tt0000009/', '/api/drf/persons/nm0000009/', '/api/drf/crews/tt0000002/',
+                    '/api/drf/ratings/tt0000009/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_list_queries(self):
+        # The page, then one query per prefetched relation however many rows it has.
+        with self.assertNumQueries(5):
+            self.assertEqual(len(ids(self.client.get('/api/drf/movies/'))), 3)
+        with self.assertNumQueries(3):
+            self.client.get('/api/drf/persons/')
+
+
+def cursor_of(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_titles()
+
+    def setUp(self):
+        cache.clear()
+
+    def pages(self, url, movie_id=lambda row: row['id']):
+        pages = []
+        while url:
+            response = self.client.get(url).json()
+            pages.append([movie_id(row) for row in response['results']])
+            url = response['next']
+        return pages, response['previous']
+
+    def test_round_trip(self):
+        pages, previous = self.pages('/api/drf/movies/?page_size=1')
+        self.assertEqual(pages, [['tt0000001'], ['tt0000002'], ['tt0000003']])
+        self.assertEqual(ids(self.client.get(previous)), ['tt0000002'])
+
+    def test_ties(self):
+        # Equal ratings are paged by id, none is skipped or repeated at the page boundary.
+        pages, _ = self.pages(
+            '/api/drf/ratings/?ordering=-average_rating&page_size=1', lambda row: row['movie']['id'],
+        )
+        self.assertEqual(pages, [['tt0000003'], ['tt0000001'], ['tt0000002']])
+
+    def test_tampered_cursor(self):
+        for payload in ([False, ['abc', 1]], [False, [10 ** 30, 1]], [False, [1]], [1, [1, 1]], 'abc'):
+            with self.subTest(payload=payload):
+                response = self.client.get('/api/drf/ratings/', {'cursor': cursor_of(payload)})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {'detail': 'Invalid cursor'})
+        self.assertEqual(self.client.get('/api/drf/ratings/', {'cursor': '!'}).status_code, 404)
+
+
+def execute(query, **variables):
+    """
+    Runs a GraphQL query against the schema, with a fresh context so every execution has its own loaders.
+    """
+    result = schema.execute(query, variable_values=variables, context_value=SimpleNamespace())
+    if result.errors:
+        raise result.errors[0]
+    return result.data
+
+
+class LoadersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_titles()
+
+    def setUp(self):
+        self.loaders = Loaders()
+        self.movies = self.loaders.register(list(Movie.objects.order_by('id')))
+
+    def test_batches(self):
+        with self.assertNumQueries(1):
+            genres = [{genre.code for genre in self.loaders.load(movie, 'genres')} for movie in self.movies]
+        self.assertEqual(genres, [{'Comedy', 'Drama'}, set(), {'Drama'}])
+        with self.assertNumQueries(1):
+            crews = [self.loaders.load(movie, 'crew') for movie in self.movies]
+        self.assertEqual([crew and crew.movie_id for crew in crews], [1, None, None])
+        with self.assertNumQueries(0):
+            self.loaders.load(self.movies[1], 'genres')
+
+    def test_loaded_rows_batch(self):
+        persons = self.loaders.load(self.movies[0], 'persons')
+        with self.assertNumQueries(1):
+            professions = [{profession.code for profession in self.loaders.load(person, 'professions')}
+                           for person in persons]
+        self.assertEqual(sorted(professions, key=len), [set(), {'director', 'writer'}])
+
+    def test_ordering(self):
+        principals = self.loaders.load(self.movies[0], 'principal_set')
+        self.assertEqual([principal.category for principal in principals], ['director', 'writer'])
+
+    def test_query_count(self):
+        # However many movies a page has, every relation the query traverses is one query.
+        query = """
+            query ($first: Int) {
+                movies(first: $first) { edges { node {
+                    title genres rating { numVotes }
+                    crew { directors { name knownFor { title } directed { title } } }
+                    principals { category person { name professions } }
+                } } }
+            }
+        """
+        counts = []
+        for first in (1, 3):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(len(execute(query, first=first)['movies']['edges']), first)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        [director] = execute(query, first=1)['movies']['edges'][0]['node']['crew']['directors']
+        self.assertEqual(director['name'], 'Anna Adams')
+        self.assertCountEqual(director['knownFor'], [{'title': 'Alpha'}, {'title': 'Alphabet'}])
+        self.assertEqual(director['directed'], [{'title': 'Alpha'}])
+
+
+class QueryPlannerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_titles()
+
+    def test_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = execute('{ movies(first: 2) { edges { node { title year } } } }')
+        self.assertEqual(data['movies']['edges'], [
+            {'node': {'title': 'Alpha', 'year': 1999}}, {'node': {'title': 'Beta', 'year': 2005}},
+        ])
+        [query] = queries
+        self.assertIn('"imdb_movie"."year"', query['sql'])
+        self.assertNotIn('original_title', query['sql'])
+        self.assertNotIn('runtime_minutes', query['sql'])
+
+    def test_relations(self):
+        # Rating and crew are joined, genres and directors are one prefetch each, nothing is left to the loaders.
+        query = """
+            query ($id: ID!) {
+                movie(id: $id) { ...Summary rating { averageRating } crew { directors { name } } genres }
+            }
+            fragment Summary on Movie { title name: originalTitle }
+        """
+        with self.assertNumQueries(3):
+            movie = execute(query, id='tt0000001')['movie']
+        self.assertEqual(movie['title'], 'Alpha')
+        self.assertEqual(movie['rating'], {'averageRating': 8.0})
+        self.assertEqual(movie['crew'], {'directors': [{'name': 'Anna Adams'}]})
+        self.assertCountEqual(movie['genres'], ['Comedy', 'Drama'])
+
+    def test_missing(self):
+        self.assertIsNone(execute('{ movie(id: "tt0000009") { title } }')['movie'])
+        self.assertIsNone(execute('{ person(id: "xx") { name } }')['person'])
+
+
+def post_graphql(client, query=None, variables=None, extensions=None):
+    data = {'variables': variables or {}}
+    if query is not None:
+        data['query'] = query
+    if extensions is not None:
+        data['extensions'] = extensions
+    return client.post('/api/graphql/', data, content_type='application/json')
+
+
+class QueryCostTests(TestCase):
+    query = 'query ($first: Int) { movies(first: $first) { edges { node { title rating { numVotes } } } } }'
+
+    @classmethod
+    def setUpTestData(cls):
+        create_titles()
+
+    def test_cost_extension(self):
+        response = post_graphql(self.client, self.query, {'first': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']['movies']['edges']), 2)
+        self.assertEqual(response.json()['extensions']['cost'], {'cost': 4, 'depth': 2, 'budget': 500000})
+
+    @override_settings(GRAPHQL_QUERY_COST={'BUDGET': 100})
+    def test_over_budget(self):
+        # Page sizes are read from the variables, the operation is rejected before any query runs.
+        with self.assertNumQueries(0):
+            response = post_graphql(self.client, self.query, {'first': 51})
+        [error] = response.json()['errors']
+        self.assertEqual(error['extensions'], {'code': 'QUERY_TOO_COSTLY', 'cost': 102, 'budget': 100})
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('data', response.json())
+        self.assertEqual(post_graphql(self.client, self.query, {'first': 50}).status_code, 200)
+
+    @override_settings(GRAPHQL_QUERY_COST={'MAX_DEPTH': 3})
+    def test_too_deep(self):
+        query = '{ person(id: "nm0000001") { knownFor { persons { knownFor { persons { name } } } } } }'
+        with self.assertNumQueries(0):
+            [error] = post_graphql(self.client, query).json()['errors']
+        self.assertEqual(error['extensions'], {'code': 'QUERY_TOO_DEEP'})
+
+
+class PersistedQueryTests(TestCase):
+    query = '{ movie(id: "tt0000001") { title } }'
+
+    @classmethod
+    def setUpTestData(cls):
+        create_titles()
+
+    def setUp(self):
+        cache.clear()
+
+    def persisted(self, sha256_hash=None):
+        return {'persistedQuery': {'version': 1, 'sha256Hash': sha256_hash or query_hash(self.query)}}
+
+    def test_register(self):
+        [error] = post_graphql(self.client, extensions=self.persisted()).json()['errors']
+        self.assertEqual(error['extensions'], {'code': 'PERSISTED_QUERY_NOT_FOUND'})
+        response = post_graphql(self.client, self.query, extensions=self.persisted())
+        self.assertEqual(response.json()['data'], {'movie': {'title': 'Alpha'}})
+        response = post_graphql(self.client, extensions=self.persisted())
+        self.assertEqual(response.json()['data'], {'movie': {'title': 'Alpha'}})
+
+    def test_hash_mismatch(self):
+        response = post_graphql(self.client, self.query, extensions=self.persisted('0' * 64))
+        self.assertEqual(response.json()['errors'][0]['message'], 'Provided sha256Hash does not match the query.')
+        [error] = post_graphql(self.client, extensions=self.persisted('0' * 64)).json()['errors']
+        self.assertEqual(error['extensions'], {'code': 'PERSISTED_QUERY_NOT_FOUND'})
+
+    @override_settings(GRAPHQL_DOCUMENTS={'PERSISTED_QUERIES': False})
+    def test_disabled(self):
+        [error] = post_graphql(self.client, self.query, extensions=self.persisted()).json()['errors']
+        self.assertEqual(error['extensions'], {'code': 'PERSISTED_QUERY_NOT_SUPPORTED'})
+
+
+class DocumentCacheTests(SimpleTestCase):
+    def test_lru(self):
+        documents = DocumentCache(2)
+        graphql_schema = schema.graphql_schema
+        first, errors = documents.get(graphql_schema, '{ movie(id: 1) { title } }')
+        self.assertEqual(errors, [])
+        documents.get(graphql_schema, '{ person(id: 1) { name } }')
+        self.assertIs(documents.get(graphql_schema, '{ movie(id: 1) { title } }')[0], first)
+        documents.get(graphql_schema, '{ persons { edges { node { name } } } }')
+        with mock.patch('apps.imdb.schemas.documents.parse', wraps=parse) as parsed:
+            documents.get(graphql_schema, '{ movie(id: 1) { title } }')
+            documents.get(graphql_schema, '{ person(id: 1) { name } }')
+        self.assertEqual(parsed.call_count, 1)
+
+    def test_invalid(self):
+        documents = DocumentCache(2)
+        self.assertIsNone(documents.get(schema.graphql_schema, '{ movie(')[0])
+        document, errors = documents.get(schema.graphql_schema, '{ movie(id: 1) { unknown } }')
+        self.assertEqual([error.message for error in errors], ["Cannot query field 'unknown' on type 'Movie'."])
+
+
+class ResponseCacheTests(TestCase):
+    url = '/api/drf/movies/tt0000001/'
+
+    @classmethod
+    def setUpTestData(cls):
+        create_titles()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url)
+        self.assertEqual(cached.json(), response.json())
+        self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertNotIn('ETag', self.client.get('/api/drf/movies/'))
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        # Not cached any more, resolved before the tag is compared.
+        cache.clear()
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': etag}).status_code, 304)
+
+    def test_missing(self):
+        for etag in ('*', 'W/"*"'):
+            with self.subTest(etag=etag):
+                response = self.client.get('/api/drf/movies/tt0000009/', headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 404)
+                self.assertNotIn('ETag', response)
+        response = self.client.get(self.url, headers={'If-None-Match': '*'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], 'tt0000001')
+
+    def test_new_version(self):
+        etag = self.client.get(self.url)['ETag']
+        DatasetVersions.bump()
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class RankingsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_titles()
+        # The short (2) has enough votes too, only movies and TV movies are ranked.
+        Rankings.refresh(min_votes=10)
+
+    def setUp(self):
+        cache.clear()
+
+    def ranked(self, genre=None, decade=None):
+        return list(RankingRepository.list().filter(genre=genre, decade=decade).values_list('rank', 'movie_id'))
+
+    def test_scopes(self):
+        self.assertEqual(self.ranked(), [(1, 1), (2, 3)])
+        self.assertEqual(self.ranked(genre=Genre.drama), [(1, 1), (2, 3)])
+        self.assertEqual(self.ranked(genre=Genre.comedy), [(1, 1)])
+        self.assertEqual(self.ranked(decade=2010), [(1, 3)])
+        self.assertEqual(self.ranked(genre=Genre.drama, decade=1990), [(1, 1)])
+        self.assertFalse(MovieRanking.objects.filter(movie_id=2).exists())
+
+    def test_weighted_rating(self):
+        # (v * R + m * C) / (v + m) with the mean rating C of all titles, the short included.
+        ranking = MovieRanking.objects.get(genre=None, decade=None, movie_id=3)
+        self.assertAlmostEqual(ranking.weighted_rating, (200 * 8.0 + 10 * 7.5) / 210)
+
+    def test_min_votes(self):
+        Rankings.refresh(min_votes=500)
+        self.assertEqual(self.ranked(), [(1, 1)])
+
+    def test_api(self):
+        response = self.client.get('/api/drf/rankings/', {'genre': 'Drama'})
+        self.assertEqual([row['movie']['id'] for row in response.json()['results']], ['tt0000001', 'tt0000003'])
+        self.assertEqual(response.json()['results'][0]['genre'], 'Drama')
+        data = execute('{ rankings(decade: 2010) { edges { node { rank decade movie { id } } } } }')
+        self.assertEqual(data['rankings']['edges'], [
+            {'node': {'rank': 1, 'decade': 2010, 'movie': {'id': 'tt0000003'}}},
+        ])
+
+
+class TitleSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_titles()
+        Akas.objects.bulk_create([
+            Akas(movie_id=3, ordering=1, title='Das Alphabet', region='DE', language='de'),
+            Akas(movie_id=2, ordering=1, title='Beta Test', region='US'),
+        ])
+
+    def setUp(self):
+        cache.clear()
+        # Built by an earlier test at the same dataset version.
+        TitleSearch.index = None
+
+    def search(self, text, **kwargs):
+        return [hit.movie_id for hit in TitleSearch.search(text, **kwargs)]
+
+    def test_inverted_index(self):
+        index = InvertedIndex.build()
+        self.assertEqual({hit.movie_id for hit in index.search('alph')}, {1, 3})
+        self.assertEqual({hit.movie_id for hit in index.search('ALPHA')}, {1, 3})
+        # The best title of a movie, its one word title rather than the two word alternate one.
+        self.assertEqual(index.search('beta'), [SearchHit(2, 'Beta', '', '', 1.0)])
+        self.assertEqual(index.search('das alph'), [SearchHit(3, 'Das Alphabet', 'DE', 'de', 1.0)])
+        self.assertEqual(index.search('alph', language='en'), [])
+        self.assertEqual(index.search('gamma'), [])
+
+    def test_search(self):
+        self.assertCountEqual(self.search('alph'), [1, 3])
+        self.assertEqual(self.search('das alph'), [3])
+        self.assertEqual(self.search('test'), [2])
+        [hit] = TitleSearch.search('alph', region='DE')
+        self.assertEqual((hit.movie_id, hit.title), (3, 'Das Alphabet'))
+        self.assertEqual(self.search('alph', limit=1), self.search('alph')[:1])
+        self.assertEqual(self.search('  '), [])
+
+    def test_new_version(self):
+        self.assertEqual(self.search('gamma'), [])
+        Movie.objects.create(id=4, movie_type_id=MovieType.movie, title='Gamma', original_title='Gamma')
+        DatasetVersions.bump()
+        self.assertEqual(self.search('gamma'), [4])
+
+    def test_api(self):
+        response = self.client.get('/api/drf/search/', {'q': 'das alph'})
+        self.assertEqual(response.json()['results'], [{
+            'movie': {'id': 'tt0000003', 'title': 'Alphabet', 'year': 2010},
+            'title': 'Das Alphabet', 'region': 'DE', 'language': 'de', 'score': response.json()['results'][0]['score'],
+        }])
+        self.assertEqual(self.client.get('/api/drf/search/').status_code, 400)
+        data = execute('{ search(q: "test") { movie { id } title } }')
+        self.assertEqual(data['search'], [{'movie': {'id': 'tt0000002'}, 'title': 'Beta Test'}])
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    def test_render(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('requests_total', 'Requests.', ('route', ))
+        counter.inc('a"b')
+        counter.inc('a"b', amount=2)
+        histogram = registry.histogram('queries', 'Statements.', buckets=(1, 5))
+        for value in (0, 3, 9):
+            histogram.observe(value)
+        self.assertEqual(registry.render(), '\n'.join([
+            '# HELP queries Statements.',
+            '# TYPE queries histogram',
+            'queries_bucket{le="1"} 1',
+            'queries_bucket{le="5"} 2',
+            'queries_bucket{le="+Inf"} 3',
+            'queries_sum 12.0',
+            'queries_count 3',
+            '# HELP requests_total Requests.',
+            '# TYPE requests_total counter',
+            'requests_total{route="a\\"b"} 3',
+            '',
+        ]))
+
+
+@override_settings(IMDB_METRICS={**settings.IMDB_METRICS, 'LOG': True})
+class RequestMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_titles()
+
+    def request(self, *args, **kwargs):
+        with self.assertLogs('imdb.requests', 'INFO') as logs:
+            response = self.client.get(*args, **kwargs)
+        [line] = logs.records
+        return response, json.loads(line.getMessage())
+
+    def test_drf(self):
+        labels = ('drf', 'person-list', 'GET')
+        requests = REQUESTS.values.get((*labels, 200), 0)
+        queries = QUERIES.values.get(labels, ([], 0))[1]
+        _, line = self.request('/api/drf/persons/')
+        self.assertEqual(REQUESTS.values[(*labels, 200)], requests + 1)
+        self.assertEqual(QUERIES.values[labels][1], queries + 3)
+        self.assertEqual(
+            {key: line[key] for key in ('api', 'route', 'method', 'path', 'status', 'queries', 'duplicate_queries')},
+            {'api': 'drf', 'route': 'person-list', 'method': 'GET', 'path': '/api/drf/persons/', 'status': 200,
+             'queries': 3, 'duplicate_queries': 0},
+        )
+        self.assertGreater(line['serialization_ms'], 0)
+
+    def test_graphql(self):
+        with self.assertLogs('imdb.requests', 'INFO') as logs:
+            post_graphql(self.client, '{ movie(id: "tt0000001") { title genres } }')
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['api'], line['method']), ('graphql', 'POST'))
+        self.assertEqual(line['resolvers'].keys(), {'Query.movie', 'Movie.title', 'Movie.genres'})
+        self.assertEqual(line['resolvers']['Movie.genres']['calls'], 1)
+
+    def test_ignored(self):
+        with self.assertNoLogs('imdb.requests', 'INFO'):
+            self.client.get('/metrics')
+
+
+class MetricsEndpointTests(SimpleTestCase):
+    def test_debug_only(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        with self.settings(DEBUG=True):
+            response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('# TYPE imdb_requests_total counter', response.content.decode())
+
+    def test_enabled(self):
+        with self.settings(IMDB_METRICS={**settings.IMDB_METRICS, 'ENDPOINT': True}):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+        with self.settings(DEBUG=True, IMDB_METRICS={**settings.IMDB_METRICS, 'ENDPOINT': False}):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    @override_settings(IMDB_METRICS={**settings.IMDB_METRICS, 'ENDPOINT': True, 'ALLOWED_IPS': ('10.0.0.1', )})
+    def test_allowed_ips(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.1').status_code, 200)
+
+    @override_settings(IMDB_METRICS={**settings.IMDB_METRICS, 'ENDPOINT': True, 'TOKEN': 'secret'})
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', headers={'Authorization': 'Bearer other'}).status_code, 403)
+        self.assertEqual(self.client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code, 200)
+
+
+class IngestProfileTests(TestCase):
+    """
+    Stages count their own time and statements, and ``load_imdb --profile`` reports them per dataset and batch.
+    """
+
+    def test_nested_stages(self):
+        profile = IngestProfile()
+        with mock.patch('apps.imdb.services.ingest_profile.time.perf_counter', side_effect=[0.0, 1.0, 3.0, 10.0]):
+            with profile.active(), IngestProfile.stage('commit'), IngestProfile.stage('build'):
+                pass
+        self.assertEqual((profile.seconds['commit'], profile.seconds['build']), (8.0, 2.0))
+
+    def test_statements(self):
+        profile = IngestProfile()
+        with profile.active():
+            with IngestProfile.stage('lookup'):
+                Movie.objects.count()
+                with IngestProfile.stage('insert'):
+                    Movie.objects.count()
+            Movie.objects.count()
+        self.assertEqual({stage: count for stage, count in profile.queries.items() if count},
+                         {'lookup': 1, 'insert': 1, 'other': 1})
+        Movie.objects.count()
+        self.assertEqual(sum(profile.queries.values()), 3)
+
+    def test_inactive(self):
+        self.assertIsNone(IngestProfile.current())
+        with IngestProfile.loading('movies'), IngestProfile.stage('read'):
+            IngestProfile.batch_done('movies', 0, 10)
+
+    @quiet_progress
+    def test_load_imdb_profile(self):
+        path = synthetic_path(self, scale=100)
+        output = os.path.join(path, 'profile.json')
+        stdout = io.StringIO()
+        call_command('load_imdb', path=path, profile=True, profile_output=output, stdout=stdout)
+        with open(output) as file:
+            report = json.load(file)
+        movies = report['datasets']['movies']
+        self.assertEqual(movies['rows'], Movie.objects.count())
+        self.assertEqual(movies['batches'], len([batch for batch in report['batches'] if batch['dataset'] == 'movies']))
+        self.assertGreater(movies['queries']['insert'], 0)
+        self.assertEqual(movies['stages_ms'].keys(), {*STAGES, 'other'})
+        self.assertEqual(report['datasets'].keys(), set(LOADED_DATASETS))
+        self.assertIn(f'Profile written to {output}', stdout.getvalue())
+
+
+class BatchSizerTests(SimpleTestCase):
+    """
+    Batches move towards ``flush_seconds`` per batch, at most doubling or halving at a time, within their bounds.
+    """
+
+    def flushed(self, sizer, rows, seconds):
+        sizer.flushed(rows, seconds)
+        return sizer.rows
+
+    def test_resize(self):
+        self.assertEqual(self.flushed(BatchSizer(1000), 1000, 0.5), 1000)
+        self.assertEqual(self.flushed(BatchSizer(1000), 1000, 0.4), 1250)
+        self.assertEqual(self.flushed(BatchSizer(1000), 1000, 0.1), 2000)
+        self.assertEqual(self.flushed(BatchSizer(1000), 1000, 0.8), 625)
+        self.assertEqual(self.flushed(BatchSizer(1000), 1000, 5.0), 500)
+        # Halved at most, however few rows the batch had.
+        self.assertEqual(self.flushed(BatchSizer(1000), 10, 0.5), 500)
+
+    def test_bounds(self):
+        self.assertEqual(self.flushed(BatchSizer(MIN_BATCH_SIZE), MIN_BATCH_SIZE, 60), MIN_BATCH_SIZE)
+        self.assertEqual(self.flushed(BatchSizer(MAX_BATCH_SIZE - 1), MAX_BATCH_SIZE - 1, 0.001), MAX_BATCH_SIZE)
+        sizer = BatchSizer(1000)
+        self.assertEqual(self.flushed(sizer, 0, 1), 1000)
+        self.assertEqual(self.flushed(sizer, 1000, 0), 1000)
+
+    def test_shrink(self):
+        sizer = BatchSizer(1000)
+        sizer.shrink()
+        self.assertEqual(sizer.rows, 500)
+        # Batches never grow back past the size they were shrunk to.
+        self.assertEqual(self.flushed(sizer, 500, 0.001), 500)
+        for _ in range(5):
+            sizer.shrink()
+        self.assertEqual(sizer.rows, MIN_BATCH_SIZE)
+
+    def test_full(self):
+        sizer = BatchSizer(10, max_bytes=100)
+        self.assertFalse(sizer.full(9, 99))
+        self.assertTrue(sizer.full(10, 0))
+        self.assertTrue(sizer.full(1, 100))
@@ -0,0 +1,2 @@
+from .caching import *
+from .imdb import *
\ No newline at end of file
@@ -0,0 +1,58 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.imdb.services import DatasetVersions
+
+__all__ = ('CachedResponseMixin', )
+
+
+class CachedResponseMixin:
+    """
+    Serves the responses of ``cached_actions`` from the Django cache.
+
+    Responses are keyed by the normalized request (host, path and sorted query parameters) and the dataset version,
+    so a finished load retires every cached response at once. The key is also the weak ``ETag`` of the response, a
+    request whose ``If-None-Match`` matches it gets ``304 Not Modified`` once the response is known to exist, from
+    the cache without reading the database. Errors, like the 404 of a missing object, are neither cached nor tagged.
+    """
+    cached_actions = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    def cached_response(self, request, respond, *args, **kwargs):
+        if self.action not in self.cached_actions:
+            return respond(request, *args, **kwargs)
+        tag = self.response_tag(request)
+        key = f'imdb:response:{tag}'
+        data = cache.get(key)
+        if data is not None:
+            response = Response(data)
+        else:
+            response = respond(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(key, response.data, settings.IMDB_RESPONSE_CACHE['TIMEOUT'])
+        # Weak comparison, the browsable API and JSON renderings of a response share its tag. "*" only conditions
+        # writes, a GET is answered in full.
+        if_none_match = {etag.removeprefix('W/') for etag in parse_etags(request.headers.get('If-None-Match', ''))}
+        if f'"{tag}"' in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response['ETag'] = f'W/"{tag}"'
+        patch_vary_headers(response, ('Accept', ))
+        return response
+
+    def response_tag(self, request):
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        digest = hashlib.sha256(f'{request.get_host()}{request.path}?{query}'.encode()).hexdigest()[:32]
+        return f'{DatasetVersions.current()}-{digest}'
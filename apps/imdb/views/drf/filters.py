@@ -0,0 +1,49 @@
+import django_filters
+
+from apps.imdb.models import Movie, MovieRanking, Rating
+
+__all__ = ('MovieFilter', 'RankingFilter', 'RatingFilter')
+
+
+class MovieFilter(django_filters.FilterSet):
+    title = django_filters.CharFilter(field_name='title', lookup_expr='istartswith')
+    movie_type = django_filters.CharFilter(field_name='movie_type__code')
+    genre = django_filters.CharFilter(field_name='genres__code')
+
+    class Meta:
+        model = Movie
+        fields = {
+            'year': ['exact', 'gte', 'lte'],
+            'is_adult': ['exact'],
+        }
+
+
+class RatingFilter(django_filters.FilterSet):
+    year = django_filters.NumberFilter(field_name='movie__year')
+
+    class Meta:
+        model = Rating
+        fields = {
+            'num_votes': ['gte'],
+            'average_rating': ['gte'],
+        }
+
+
+class RankingFilter(django_filters.FilterSet):
+    """
+    Selects one leaderboard, without ``genre`` or ``decade`` the ranking across all genres or decades.
+    """
+    genre = django_filters.CharFilter(field_name='genre__code')
+    decade = django_filters.NumberFilter(field_name='decade')
+
+    class Meta:
+        model = MovieRanking
+        fields = ('genre', 'decade')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self.form.cleaned_data.get('genre'):
+            queryset = queryset.filter(genre__isnull=True)
+        if self.form.cleaned_data.get('decade') is None:
+            queryset = queryset.filter(decade__isnull=True)
+        return queryset
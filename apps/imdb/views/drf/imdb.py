@@ -0,0 +1,102 @@
+from rest_framework import mixins, viewsets
+from rest_framework.response import Response
+
+from apps.imdb.models import Movie, Person
+from apps.imdb.repositories import (
+    CrewRepository, MovieRepository, PersonRepository, RankingRepository, RatingRepository, SearchRepository,
+)
+from apps.imdb.serializers import (
+    CrewSerializer, MovieSerializer, PersonSerializer, RankingSerializer, RatingSerializer, SearchQuerySerializer,
+    SearchResultSerializer,
+)
+
+from .caching import CachedResponseMixin
+from .filters import MovieFilter, RankingFilter, RatingFilter
+
+__all__ = ('CrewViewSet', 'MovieViewSet', 'PersonViewSet', 'RankingViewSet', 'RatingViewSet', 'SearchViewSet')
+
+TCONST_REGEX = r'(?:tt)?\d+'
+NCONST_REGEX = r'(?:nm)?\d+'
+
+
+class ImdbIdLookupMixin:
+    """
+    Looks up detail routes by IMDb id (``tt0000001``), the keys are stored without their prefix.
+    """
+    parse_id = None
+
+    def get_object(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        self.kwargs[lookup_url_kwarg] = self.parse_id(self.kwargs[lookup_url_kwarg])
+        return super().get_object()
+
+
+class MovieViewSet(CachedResponseMixin, ImdbIdLookupMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = MovieRepository.list()
+    serializer_class = MovieSerializer
+    lookup_value_regex = TCONST_REGEX
+    parse_id = staticmethod(Movie.parse_tconst)
+    filterset_class = MovieFilter
+    ordering_fields = ('id', 'title')
+    cached_actions = ('retrieve', )
+
+
+class PersonViewSet(CachedResponseMixin, ImdbIdLookupMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = PersonRepository.list()
+    serializer_class = PersonSerializer
+    lookup_value_regex = NCONST_REGEX
+    parse_id = staticmethod(Person.parse_nconst)
+    ordering_fields = ('id', 'name')
+    cached_actions = ('retrieve', )
+
+
+class CrewViewSet(ImdbIdLookupMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = CrewRepository.list()
+    serializer_class = CrewSerializer
+    lookup_field = 'movie'
+    lookup_value_regex = TCONST_REGEX
+    parse_id = staticmethod(Movie.parse_tconst)
+    ordering_fields = ('movie', )
+
+
+class RatingViewSet(CachedResponseMixin, ImdbIdLookupMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = RatingRepository.list()
+    serializer_class = RatingSerializer
+    lookup_field = 'movie'
+    lookup_value_regex = TCONST_REGEX
+    parse_id = staticmethod(Movie.parse_tconst)
+    filterset_class = RatingFilter
+    ordering_fields = ('movie', 'average_rating', 'num_votes')
+    # Top rated listings
+    cached_actions = ('list', )
+
+
+class RankingViewSet(CachedResponseMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    queryset = RankingRepository.list()
+    serializer_class = RankingSerializer
+    filterset_class = RankingFilter
+    ordering_fields = ('rank', )
+    cached_actions = ('list', )
+
+
+class SearchViewSet(CachedResponseMixin, viewsets.GenericViewSet):
+    """
+    Ranked title search, ``?q=`` with its last word matched as a prefix, optionally only the alternate titles of a
+    ``region`` and/or ``language``.
+    """
+    # Model permissions are those of movies
+    queryset = MovieRepository.summaries()
+    serializer_class = SearchResultSerializer
+    cached_actions = ('list', )
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, self.search)
+
+    def search(self, request):
+        query = SearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        results = SearchRepository.search(
+            params['q'], region=params.get('region'), language=params.get('language'), limit=params['limit'],
+        )
+        return Response({'results': self.get_serializer(results, many=True).data})
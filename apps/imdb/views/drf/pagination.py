@@ -0,0 +1,73 @@
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from apps.imdb.repositories import Keyset
+
+__all__ = ('KeysetPagination', )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination seeking on the ``(ordering, pk)`` key of the last row, see ``Keyset``.
+
+    Unlike ``CursorPagination`` the whole key is compared, so pages stay one index seek deep into the table even when
+    many rows share the same ordering value.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            self.keyset = Keyset(queryset)
+        except ValueError as e:
+            raise ValidationError({'ordering': [str(e)]})
+        key, reverse = None, False
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            try:
+                key, reverse = self.keyset.decode(cursor)
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+        rows, has_more = self.keyset.page(self.get_page_size(request), key, reverse)
+        has_next = reverse or has_more
+        has_previous = has_more if reverse else key is not None
+        self.next_cursor = self.keyset.encode(rows[-1]) if rows and has_next else None
+        self.previous_cursor = self.keyset.encode(rows[0], reverse=True) if rows and has_previous else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_link(self.next_cursor),
+            'previous': self.get_link(self.previous_cursor),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
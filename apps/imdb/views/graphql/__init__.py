@@ -0,0 +1,2 @@
+from .endpoint import *
+from .imdb import *
\ No newline at end of file
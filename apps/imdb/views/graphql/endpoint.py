@@ -0,0 +1,86 @@
+import json
+
+from django.http.response import HttpResponseBadRequest
+from graphene_django.views import GraphQLView, HttpError
+from graphql import ExecutionResult, GraphQLError, OperationType, execute, get_operation_ast, validate, validate_schema
+
+from apps.imdb.metrics import RequestMetrics
+from apps.imdb.schemas import DocumentCache, PersistedQueries, QueryCostRule
+from apps.imdb.schemas.documents import documents_settings
+
+__all__ = ('IMDbGraphQLView', )
+
+
+class IMDbGraphQLView(GraphQLView):
+    """
+    GraphQL endpoint for persisted queries, parsing and validating each distinct document once.
+
+    Query documents come from the ``DocumentCache`` shared by all requests of the process, only the
+    ``QueryCostRule`` budget runs per request, its estimate is reported in the ``cost`` response extension.
+    Only queries are served, the schema has no mutations.
+    """
+    documents = DocumentCache(documents_settings()['CACHE_SIZE'])
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, show_graphiql=False):
+        try:
+            query = PersistedQueries.resolve(query, self.get_extensions(request, data))
+        except GraphQLError as e:
+            return ExecutionResult(errors=[e])
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest('Must provide query string.'))
+
+        schema = self.schema.graphql_schema
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        document, validation_errors = self.documents.get(schema, query)
+        if validation_errors:
+            return ExecutionResult(data=None, errors=validation_errors)
+
+        costs = {}
+        cost_errors = validate(schema, document, [QueryCostRule.bind(variables, costs)])
+        if operation_name in costs:
+            request.graphql_cost = costs[operation_name]
+        elif len(costs) == 1:
+            request.graphql_cost = next(iter(costs.values()))
+        if cost_errors:
+            return ExecutionResult(data=None, errors=cost_errors)
+
+        operation_ast = get_operation_ast(document, operation_name)
+        if operation_ast is not None and operation_ast.operation != OperationType.QUERY:
+            return ExecutionResult(errors=[GraphQLError(f'{operation_ast.operation.value} operations are not served.')])
+        try:
+            # Resolving is serialization here, the statements the resolvers run are not counted in it.
+            with RequestMetrics.stage('serialization'):
+                return execute(
+                    schema,
+                    document,
+                    root_value=self.get_root_value(request),
+                    context_value=self.get_context(request),
+                    variable_values=variables,
+                    operation_name=operation_name,
+                    middleware=self.get_middleware(request),
+                    execution_context_class=self.execution_context_class,
+                )
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+    @staticmethod
+    def get_extensions(request, data):
+        extensions = request.GET.get('extensions') or data.get('extensions')
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest('Extensions are invalid JSON.'))
+        return extensions
+
+    def json_encode(self, request, d, pretty=False):
+        cost = getattr(request, 'graphql_cost', None)
+        if cost is not None and isinstance(d, dict):
+            d = {**d, 'extensions': {**d.get('extensions', {}), 'cost': cost}}
+        with RequestMetrics.stage('serialization'):
+            return super().json_encode(request, d, pretty)
@@ -0,0 +1,96 @@
+import graphene
+from graphql import GraphQLError
+
+from apps.imdb.models import Movie, MovieRanking, Person
+from apps.imdb.schemas import (
+    KeysetConnectionField, Loaders, MovieConnection, MovieNode, PersonConnection, PersonNode, QueryPlanner,
+    RankingConnection, SearchResult,
+)
+from apps.imdb.services import TitleSearch
+from apps.imdb.services.title_search import MAX_RESULTS
+
+__all__ = ('IMDbQuery', )
+
+MOVIE_ORDERINGS = ('id', 'title')
+PERSON_ORDERINGS = ('id', 'name')
+CONNECTION_NODES = ('edges', 'node')
+
+
+def ordering(order_by, choices):
+    if order_by.removeprefix('-') not in choices:
+        raise GraphQLError(f'orderBy must be one of {", ".join(choices)}, optionally prefixed with "-".')
+    return order_by
+
+
+class IMDbQuery(graphene.ObjectType):
+    movie = graphene.Field(MovieNode, id=graphene.ID(required=True))
+    movies = KeysetConnectionField(
+        MovieConnection,
+        order_by=graphene.String(default_value='id'),
+        year=graphene.Int(),
+        movie_type=graphene.String(),
+        title=graphene.String(description='Title prefix, case insensitive.'),
+    )
+    person = graphene.Field(PersonNode, id=graphene.ID(required=True))
+    persons = KeysetConnectionField(PersonConnection, order_by=graphene.String(default_value='id'))
+    rankings = KeysetConnectionField(
+        RankingConnection,
+        genre=graphene.String(description='Genre code, all genres when unset.'),
+        decade=graphene.Int(description='First year of the decade, e.g. 1990, all decades when unset.'),
+    )
+    search = graphene.List(
+        graphene.NonNull(SearchResult),
+        required=True,
+        q=graphene.String(required=True, description='Title words, the last one matched as a prefix.'),
+        region=graphene.String(description='Only alternate titles of this region.'),
+        language=graphene.String(description='Only alternate titles in this language.'),
+        limit=graphene.Int(default_value=20),
+    )
+
+    @staticmethod
+    def resolve_movie(root, info, id):
+        try:
+            movie = QueryPlanner.optimize(Movie.objects.filter(pk=Movie.parse_tconst(id)), info).first()
+        except ValueError:
+            return None
+        return Loaders.of(info).register([movie])[0]
+
+    @staticmethod
+    def resolve_movies(root, info, order_by, year=None, movie_type=None, title=None, **kwargs):
+        movies = Movie.objects.order_by(ordering(order_by, MOVIE_ORDERINGS))
+        if year is not None:
+            movies = movies.filter(year=year)
+        if movie_type is not None:
+            movies = movies.filter(movie_type__code=movie_type)
+        if title:
+            movies = movies.filter(title__istartswith=title)
+        return QueryPlanner.optimize(movies, info, CONNECTION_NODES)
+
+    @staticmethod
+    def resolve_person(root, info, id):
+        try:
+            person = QueryPlanner.optimize(Person.objects.filter(pk=Person.parse_nconst(id)), info).first()
+        except ValueError:
+            return None
+        return Loaders.of(info).register([person])[0]
+
+    @staticmethod
+    def resolve_persons(root, info, order_by, **kwargs):
+        persons = Person.objects.order_by(ordering(order_by, PERSON_ORDERINGS))
+        return QueryPlanner.optimize(persons, info, CONNECTION_NODES)
+
+    @staticmethod
+    def resolve_rankings(root, info, genre=None, decade=None, **kwargs):
+        rankings = MovieRanking.objects.order_by('rank')
+        rankings = rankings.filter(genre__code=genre) if genre else rankings.filter(genre__isnull=True)
+        rankings = rankings.filter(decade=decade) if decade is not None else rankings.filter(decade__isnull=True)
+        return QueryPlanner.optimize(rankings, info, CONNECTION_NODES)
+
+    @staticmethod
+    def resolve_search(root, info, q, region=None, language=None, limit=20):
+        if not 1 <= limit <= MAX_RESULTS:
+            raise GraphQLError(f'limit must be between 1 and {MAX_RESULTS}.')
+        hits = TitleSearch.search(q, region=region, language=language, limit=limit)
+        movies = QueryPlanner.optimize(Movie.objects.filter(pk__in=[hit.movie_id for hit in hits]), info, ('movie', ))
+        movies = {movie.pk: movie for movie in Loaders.of(info).register(list(movies))}
+        return [{**hit._asdict(), 'movie': movies[hit.movie_id]} for hit in hits if hit.movie_id in movies]
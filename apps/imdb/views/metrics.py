@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views import View
+
+from apps.imdb.metrics import REGISTRY, metrics_settings
+
+__all__ = ('MetricsView', )
+
+
+class MetricsView(View):
+    """
+    The request metrics of this process in the Prometheus text format, for a scraper.
+
+    Served with ``DEBUG`` only unless ``IMDB_METRICS['ENDPOINT']`` is set, and then only to the ``ALLOWED_IPS``
+    and to requests bearing the ``TOKEN`` of the settings that have them.
+    """
+
+    def get(self, request):
+        options = metrics_settings()
+        if not (settings.DEBUG if options['ENDPOINT'] is None else options['ENDPOINT']):
+            raise Http404
+        if not self.allowed(request, options):
+            return HttpResponseForbidden()
+        return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    @staticmethod
+    def allowed(request, options):
+        if options['ALLOWED_IPS'] and request.META.get('REMOTE_ADDR') not in options['ALLOWED_IPS']:
+            return False
+        token = options['TOKEN']
+        return not token or constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
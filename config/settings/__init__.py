@@ -1,6 +1,8 @@
+from config.settings.cache import *
 from config.settings.drf import *
 from config.settings.general import *
 from config.settings.graphql import *
+from config.settings.metrics import *
 
 try:
     from config.settings.local import *
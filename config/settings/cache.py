@@ -0,0 +1,17 @@
+# Local memory by default, point it at a file or Redis backend to share cached responses between processes:
+#   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/var/tmp/imdb_cache'
+#   'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'imdb',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+IMDB_RESPONSE_CACHE = {
+    # Seconds a response is kept, responses of older dataset versions are never read again.
+    'TIMEOUT': 24 * 60 * 60,
+    # Seconds a process reuses the dataset version before reading it from the database again.
+    'VERSION_TIMEOUT': 30,
+}
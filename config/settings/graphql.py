@@ -1,3 +1,20 @@
 GRAPHENE = {
-    "SCHEMA": "django_root.schema.schema"
+    "SCHEMA": "api.graphql.schema.schema",
+    "RELAY_CONNECTION_MAX_LIMIT": 1000,
+    "MIDDLEWARE": [
+        "apps.imdb.metrics.ResolverTimingMiddleware",
+    ],
+}
+
+# Estimated objects an operation may resolve, see apps.imdb.schemas.cost.QueryCostRule.
+GRAPHQL_QUERY_COST = {
+    "BUDGET": 500000,
+    "MAX_DEPTH": 10,
+    "LIST_SIZE": 10,
+}
+
+# Parsed and validated documents kept per process, and whether clients may register persisted queries.
+GRAPHQL_DOCUMENTS = {
+    "CACHE_SIZE": 256,
+    "PERSISTED_QUERIES": True,
 }
@@ -0,0 +1,29 @@
+# Per request latency, statements and serialization time, served at /metrics, see apps.imdb.metrics.
+IMDB_METRICS = {
+    'ENABLED': True,
+    # One JSON line per request on the 'imdb.requests' logger.
+    'LOG': True,
+    # Time every GraphQL field resolution, adds a few microseconds per resolved field.
+    'RESOLVERS': True,
+    # Slowest resolvers listed in the log line of a request.
+    'LOGGED_RESOLVERS': 10,
+    'IGNORED_PATHS': ('/metrics', '/static/', '/admin/'),
+    # /metrics is only served with DEBUG unless enabled here, behind ALLOWED_IPS (REMOTE_ADDR) and/or a bearer TOKEN.
+    'ENDPOINT': None,
+    'ALLOWED_IPS': (),
+    'TOKEN': '',
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'requests': {'class': 'logging.StreamHandler', 'formatter': 'message'},
+    },
+    'loggers': {
+        'imdb.requests': {'handlers': ['requests'], 'level': 'INFO', 'propagate': False},
+    },
+}
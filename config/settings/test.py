@@ -0,0 +1,15 @@
+from config.settings import *
+
+# python manage.py test --settings=config.settings.test
+# The suite runs on SQLite, without the database and debugging middleware of the local settings. Tests of PostgreSQL
+# only paths are skipped, they run when the suite is pointed at a PostgreSQL database.
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    }
+}
+
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if not middleware.startswith('querycount.')]
+
+IMDB_METRICS = {**IMDB_METRICS, 'LOG': False}
@@ -17,11 +17,13 @@ Including another URLconf
 from django.urls import path, include
 from django.contrib import admin
 from api.drf import urls as drf_urls
-from api.graphql import schema
-from graphene_django.views import GraphQLView
+from api.graphql.schema import schema
+from apps.imdb.views.graphql import IMDbGraphQLView
+from apps.imdb.views.metrics import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/drf/', include(drf_urls)),
-    path('api/graphql/', GraphQLView.as_view(graphiql=True, schema=schema)),
+    path('api/graphql/', IMDbGraphQLView.as_view(graphiql=True, schema=schema)),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]